@@ -0,0 +1,20 @@
+import asyncio
+
+from app.infrastructure.database import async_session_maker
+from app.repositories.admin.achievement_stats_repository import AchievementStatsRepository
+
+
+async def rebuild():
+    async with async_session_maker() as db:
+        rows = await AchievementStatsRepository(db).rebuild()
+        await db.commit()
+
+    print(f"daily_achievement_stats rebuilt: {rows} row(s).")
+
+
+def main():
+    asyncio.run(rebuild())
+
+
+if __name__ == "__main__":
+    main()
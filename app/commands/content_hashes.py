@@ -0,0 +1,51 @@
+import asyncio
+import hashlib
+from sqlalchemy import select, update
+
+from app.infrastructure.database import async_session_maker
+from app.infrastructure.storage import get_storage
+from app.models.achievement import Achievement
+
+BATCH_SIZE = 200
+
+
+async def backfill():
+    # Хэши для файлов, загруженных до контентной адресации. Файлы остаются на своих местах:
+    # хэш нужен для подсказок о дубликатах, а счётчик ссылок учитывает и путь
+    storage = get_storage()
+    last_id, hashed, missing = 0, 0, 0
+
+    while True:
+        async with async_session_maker() as db:
+            rows = (await db.execute(
+                select(Achievement.id, Achievement.file_path)
+                .where(Achievement.content_hash.is_(None), Achievement.id > last_id)
+                .order_by(Achievement.id)
+                .limit(BATCH_SIZE)
+            )).all()
+            if not rows:
+                break
+
+            for id, file_path in rows:
+                digest = hashlib.sha256()
+                try:
+                    async for chunk in storage.open(file_path):
+                        digest.update(chunk)
+                except Exception as e:
+                    print(f"   achievement {id}: {file_path} not readable ({e})")
+                    missing += 1
+                    continue
+                await db.execute(update(Achievement).where(Achievement.id == id).values(content_hash=digest.hexdigest()))
+                hashed += 1
+            await db.commit()
+            last_id = rows[-1].id
+
+    print(f"content_hash backfilled: {hashed} achievement(s), {missing} missing file(s).")
+
+
+def main():
+    asyncio.run(backfill())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+import json
+from datetime import date
+
+from app.infrastructure.database import async_session_maker
+from app.infrastructure.redis_client import get_redis
+from app.repositories.admin.points_rules_repository import PointsRulesRepository
+from app.services.points_rules_service import PointsRecalculator
+
+
+async def show():
+    async with async_session_maker() as db:
+        repo = PointsRulesRepository(db)
+        version = await repo.active_version() or 0
+        rules = await repo.load(version)
+
+    print(f"Active points rules version: {version}")
+    for (level, category), points in sorted(rules.table.items()):
+        print(f"   {level:<15} {category:<15} {points}")
+
+
+async def publish(path: str, effective_from: date):
+    # Файл: {"levels": {"SCHOOL": 10, ...}, "categories": {"SCIENCE": 1.5, ...}}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    async with async_session_maker() as db:
+        version = await PointsRulesRepository(db).create_version(
+            data.get("levels", {}), data.get("categories", {}), effective_from
+        )
+        await db.commit()
+
+    print(f"Points rules version {version} published, effective from {effective_from}.")
+
+
+async def recompute(version: int = None):
+    async with async_session_maker() as db:
+        processed = await PointsRecalculator(db, await get_redis()).run(version)
+
+    print(f"Points recomputed for {processed} achievement(s); user_scores and leaderboard rebuilt.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage points rules versions")
+    subparsers = parser.add_subparsers(dest="action")
+    subparsers.add_parser("show", help="Print the active rules table")
+    publish_parser = subparsers.add_parser("publish", help="Publish a new rules version from a JSON file")
+    publish_parser.add_argument("path")
+    publish_parser.add_argument("--effective-from", type=date.fromisoformat, default=date.today())
+    recompute_parser = subparsers.add_parser("recompute", help="Re-score achievements with a rules version")
+    recompute_parser.add_argument("--version", type=int, default=None, help="Defaults to the active version")
+    args = parser.parse_args()
+
+    if args.action == "publish":
+        asyncio.run(publish(args.path, args.effective_from))
+    elif args.action == "recompute":
+        asyncio.run(recompute(args.version))
+    else:
+        asyncio.run(show())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import asyncio
+from sqlalchemy import select
+
+from app.infrastructure.database import async_session_maker
+from app.models.achievement import Achievement
+from app.services.preview_service import can_preview, generate_preview, shutdown_previews
+
+
+async def generate():
+    async with async_session_maker() as db:
+        paths = (await db.execute(select(Achievement.file_path).distinct())).scalars().all()
+
+    # Уже построенные превью пропускаются внутри generate_preview
+    created = 0
+    try:
+        for path in filter(can_preview, paths):
+            created += bool(await generate_preview(path))
+    finally:
+        shutdown_previews()
+
+    print(f"Previews ready: {created} of {len(paths)} file(s).")
+
+
+def main():
+    asyncio.run(generate())
+
+
+if __name__ == "__main__":
+    main()
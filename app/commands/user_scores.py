@@ -0,0 +1,46 @@
+import argparse
+import asyncio
+
+from app.infrastructure.database import async_session_maker
+from app.repositories.admin.user_score_repository import UserScoreRepository
+
+
+async def verify() -> int:
+    async with async_session_maker() as db:
+        drift = await UserScoreRepository(db).find_drift()
+
+    if not drift:
+        print("user_scores is consistent with achievements.")
+        return 0
+
+    print(f"Drift detected for {len(drift)} user(s):")
+    for row in drift:
+        print(f"   user_id={row.user_id}: points {row.stored_points} -> {row.actual_points}, "
+              f"approved {row.stored_count} -> {row.actual_count}")
+    return len(drift)
+
+
+async def rebuild():
+    drifted = await verify()
+
+    async with async_session_maker() as db:
+        rows = await UserScoreRepository(db).rebuild()
+        await db.commit()
+
+    print(f"user_scores rebuilt: {rows} row(s), {drifted} drifted user(s) fixed.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify the user_scores table")
+    parser.add_argument("--verify", action="store_true", help="Only report drift, do not rewrite the table")
+    args = parser.parse_args()
+
+    if args.verify:
+        drifted = asyncio.run(verify())
+        raise SystemExit(1 if drifted else 0)
+
+    asyncio.run(rebuild())
+
+
+if __name__ == "__main__":
+    main()
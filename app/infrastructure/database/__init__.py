@@ -23,7 +23,12 @@ safe_url = DATABASE_URL.replace(DB_PASSWORD, "****") if DB_PASSWORD else DATABAS
 print(f"URL: {safe_url}")
 print(f"---------------------------")
 
-engine = create_async_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
+# Пул рассчитан на параллельные запросы страниц (см. database/parallel.py): до 6 сессий на запрос дашборда
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+
+engine = create_async_engine(DATABASE_URL, echo=False, pool_pre_ping=True,
+                             pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
 async_session_maker = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
 
 class Base(DeclarativeBase):
@@ -40,5 +45,9 @@ try:
     from app.models.achievement import Achievement
     from app.models.notification import Notification
     from app.models.user_token import UserToken
+    from app.models.user_score import UserScore
+    from app.models.season_job import SeasonJob
+    from app.models.daily_achievement_stat import DailyAchievementStat
+    from app.models.points_rule import PointsRule
 except ImportError:
     pass
\ No newline at end of file
@@ -0,0 +1,17 @@
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.expression import ClauseElement
+
+
+class Explain(Executable, ClauseElement):
+    # EXPLAIN (FORMAT JSON) поверх обычного запроса: параметры остаются связанными и проходят
+    # через привязку типов, как при выполнении самого запроса
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
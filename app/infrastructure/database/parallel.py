@@ -0,0 +1,26 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, List
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.infrastructure.database import async_session_maker
+
+QUERY_BATCH_TIMEOUT = float(os.getenv("DB_QUERY_BATCH_TIMEOUT", "10"))
+
+Query = Callable[[AsyncSession], Awaitable[Any]]
+
+
+async def run_parallel(*queries: Query, timeout: float = None, session_maker: async_sessionmaker = None) -> List[Any]:
+    # Независимые читающие запросы: у каждого своя сессия из пула, ждём все разом.
+    # Возвращаемые ORM-объекты отсоединены от сессии — связи нужно грузить заранее (selectinload).
+    session_maker = session_maker or async_session_maker
+
+    async def run(query: Query):
+        async with session_maker() as session:
+            return await query(session)
+
+    return await asyncio.wait_for(
+        asyncio.gather(*(run(query) for query in queries)),
+        timeout=timeout or QUERY_BATCH_TIMEOUT
+    )
@@ -0,0 +1,9 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def dialect_insert(db: AsyncSession, model):
+    # INSERT с поддержкой on_conflict_do_update для текущей СУБД
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import stat
+import aiofiles.os
+from email.utils import formatdate, parsedate
+from typing import Optional
+from urllib.parse import quote
+from dotenv import load_dotenv
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+
+load_dotenv()
+
+# app — файл читает сам воркер; accel — nginx (X-Accel-Redirect); sendfile — Apache/lighttpd (X-Sendfile)
+FILE_DELIVERY = os.getenv("FILE_DELIVERY", "app")
+# internal-location nginx, в которую смонтирован LOCAL_STORAGE_ROOT
+ACCEL_REDIRECT_PREFIX = os.getenv("ACCEL_REDIRECT_PREFIX", "/protected/")
+
+# Имена загруженных файлов уникальны и не перезаписываются, поэтому их можно кэшировать навсегда
+MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DOCUMENT_CACHE_CONTROL = "private, no-cache"
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    # Тот же ETag, что ставит FileResponse, чтобы 304 и Range/If-Range сходились
+    base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+    return f'"{hashlib.md5(base.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+def is_not_modified(request_headers: Headers, etag: str, last_modified: str) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match главнее If-Modified-Since (RFC 9110, 13.1.3)
+        return if_none_match.strip() == "*" or etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since:
+        since, modified = parsedate(if_modified_since), parsedate(last_modified)
+        return since is not None and modified is not None and since >= modified
+    return False
+
+
+def _disposition_headers(filename: Optional[str], disposition: str) -> dict:
+    return {"Content-Disposition": f"{disposition}; filename*=UTF-8''{quote(filename)}"} if filename else {}
+
+
+async def file_response(request: Request, storage, key: str, filename: Optional[str] = None,
+                        media_type: Optional[str] = None, cache_control: str = DOCUMENT_CACHE_CONTROL,
+                        disposition: str = "attachment") -> Optional[Response]:
+    # Права проверяет вызывающий код; сюда приходит уже разрешённый ключ локального хранилища.
+    # None — файла нет на диске
+    headers = {"Cache-Control": cache_control, **_disposition_headers(filename, disposition)}
+
+    # За прокси воркер отдаёт только заголовок, а файл, Range и условные запросы обслуживает сам прокси.
+    # Наличие файла тоже проверяет прокси: лишний stat здесь не нужен
+    if FILE_DELIVERY == "accel":
+        headers["X-Accel-Redirect"] = ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(key)
+        return Response(headers=headers, media_type=media_type)
+    if FILE_DELIVERY == "sendfile":
+        headers["X-Sendfile"] = os.path.abspath(storage.path(key))
+        return Response(headers=headers, media_type=media_type)
+
+    path = storage.path(key)
+    try:
+        stat_result = await aiofiles.os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    if not stat.S_ISREG(stat_result.st_mode):
+        return None
+
+    etag = file_etag(stat_result)
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    if is_not_modified(request.headers, etag, last_modified):
+        return Response(status_code=304, headers={"ETag": etag, "Last-Modified": last_modified,
+                                                  "Cache-Control": cache_control})
+
+    # Range и If-Range FileResponse обрабатывает сам
+    return FileResponse(path, stat_result=stat_result, media_type=media_type, headers=headers)
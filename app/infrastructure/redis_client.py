@@ -0,0 +1,225 @@
+import os
+import time
+import bisect
+import fnmatch
+import structlog
+import redis.asyncio as aioredis
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = structlog.get_logger()
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+ENV = os.getenv("ENV", "development")
+
+
+class MemoryPipeline:
+    def __init__(self, store: "MemoryRedis"):
+        self.store = store
+        self.commands = []
+
+    def __getattr__(self, name):
+        method = getattr(self.store, name)
+
+        def queue(*args, **kwargs):
+            self.commands.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        results = [await method(*args, **kwargs) for method, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.commands = []
+
+
+class MemoryRedis:
+    # Внутрипроцессная замена Redis для dev/test: только используемые приложением команды
+
+    def __init__(self):
+        self.values = {}
+        self.zsets = {}
+        self.expires = {}
+
+    def _alive(self, key) -> bool:
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.values.pop(key, None)
+            self.zsets.pop(key, None)
+            self.expires.pop(key, None)
+            return False
+        return key in self.values or key in self.zsets
+
+    async def ping(self):
+        return True
+
+    def pipeline(self, transaction: bool = True):
+        return MemoryPipeline(self)
+
+    async def get(self, key):
+        return self.values.get(key) if self._alive(key) else None
+
+    async def mget(self, *keys):
+        if len(keys) == 1 and isinstance(keys[0], (list, tuple)):
+            keys = keys[0]
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key, value, ex: int = None, nx: bool = False):
+        if nx and self._alive(key):
+            return None
+        self.values[key] = str(value)
+        self.expires.pop(key, None)
+        if ex:
+            self.expires[key] = time.monotonic() + ex
+        return True
+
+    async def incrby(self, key, amount: int = 1):
+        value = int(await self.get(key) or 0) + amount
+        self.values[key] = str(value)
+        return value
+
+    async def incr(self, key, amount: int = 1):
+        return await self.incrby(key, amount)
+
+    async def decr(self, key, amount: int = 1):
+        return await self.incrby(key, -amount)
+
+    async def expire(self, key, seconds: int):
+        if not self._alive(key):
+            return False
+        self.expires[key] = time.monotonic() + seconds
+        return True
+
+    async def ttl(self, key):
+        if not self._alive(key):
+            return -2
+        expires_at = self.expires.get(key)
+        return -1 if expires_at is None else int(expires_at - time.monotonic())
+
+    async def exists(self, *keys):
+        return sum(1 for key in keys if self._alive(key))
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self.values.pop(key, None)
+            self.zsets.pop(key, None)
+            self.expires.pop(key, None)
+        return removed
+
+    async def scan_iter(self, match: str = "*", count: int = None):
+        for key in list(self.values) + list(self.zsets):
+            if self._alive(key) and fnmatch.fnmatchcase(key, match):
+                yield key
+
+    # Sorted set хранится как (scores: member -> score, ordered: отсортированный список (score, member))
+    def _zset(self, key):
+        if not self._alive(key):
+            self.zsets[key] = ({}, [])
+        return self.zsets[key]
+
+    async def zadd(self, key, mapping: dict):
+        scores, ordered = self._zset(key)
+        added = 0
+        for member, score in mapping.items():
+            member, score = str(member), float(score)
+            if member in scores:
+                ordered.pop(bisect.bisect_left(ordered, (scores[member], member)))
+            else:
+                added += 1
+            scores[member] = score
+            bisect.insort(ordered, (score, member))
+        return added
+
+    async def zrem(self, key, *members):
+        if not self._alive(key):
+            return 0
+        scores, ordered = self.zsets[key]
+        removed = 0
+        for member in map(str, members):
+            if member in scores:
+                ordered.pop(bisect.bisect_left(ordered, (scores.pop(member), member)))
+                removed += 1
+        return removed
+
+    async def zscore(self, key, member):
+        if not self._alive(key):
+            return None
+        return self.zsets[key][0].get(str(member))
+
+    async def zcard(self, key):
+        return len(self.zsets[key][0]) if self._alive(key) else 0
+
+    async def zcount(self, key, min, max):
+        if not self._alive(key):
+            return 0
+
+        def bound(value, default):
+            value = str(value)
+            if value in ("-inf", "+inf", "inf"):
+                return default, False
+            if value.startswith("("):
+                return float(value[1:]), True
+            return float(value), False
+
+        low, low_open = bound(min, float("-inf"))
+        high, high_open = bound(max, float("inf"))
+        return sum(
+            1 for score in self.zsets[key][0].values()
+            if (score > low if low_open else score >= low) and (score < high if high_open else score <= high)
+        )
+
+    async def zrevrank(self, key, member):
+        if not self._alive(key):
+            return None
+        scores, ordered = self.zsets[key]
+        member = str(member)
+        if member not in scores:
+            return None
+        return len(ordered) - 1 - bisect.bisect_left(ordered, (scores[member], member))
+
+    async def zrevrange(self, key, start: int, end: int, withscores: bool = False):
+        if not self._alive(key):
+            return []
+        ordered = self.zsets[key][1][::-1]
+        stop = len(ordered) if end == -1 else end + 1
+        items = ordered[start:stop]
+        if withscores:
+            return [(member, score) for score, member in items]
+        return [member for _, member in items]
+
+
+_client = None
+
+
+async def get_redis():
+    global _client
+    if _client is not None:
+        return _client
+
+    if REDIS_URL.startswith("memory://"):
+        _client = MemoryRedis()
+        return _client
+
+    client = aioredis.from_url(REDIS_URL, decode_responses=True)
+    if ENV == "production":
+        _client = client
+        return _client
+
+    try:
+        await client.ping()
+        _client = client
+    except Exception as e:
+        logger.warning("Redis is unavailable, using in-process fallback", error=str(e))
+        _client = MemoryRedis()
+
+    return _client
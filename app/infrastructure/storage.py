@@ -0,0 +1,224 @@
+import asyncio
+import os
+import uuid
+import aiofiles
+import aiofiles.os
+import structlog
+from typing import AsyncIterator, Iterable, Optional
+from urllib.parse import quote
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = structlog.get_logger()
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+LOCAL_STORAGE_ROOT = os.getenv("LOCAL_STORAGE_ROOT", "static")
+# Загрузки отдаёт маршрут admin.media (кэш-заголовки, X-Accel-Redirect за nginx)
+LOCAL_STORAGE_URL = os.getenv("LOCAL_STORAGE_URL", "/sirius.achievements/media")
+
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+S3_REGION = os.getenv("S3_REGION") or None
+S3_PRESIGN_TTL = int(os.getenv("S3_PRESIGN_TTL", "300"))
+
+READ_CHUNK_SIZE = 64 * 1024
+# Минимальный размер части multipart-загрузки в S3, кроме последней
+S3_PART_SIZE = 5 * 1024 * 1024
+# DeleteObjects принимает не больше 1000 ключей за запрос
+S3_DELETE_BATCH = 1000
+
+
+def _disposition(filename: str) -> str:
+    return f"attachment; filename*=UTF-8''{quote(filename)}"
+
+
+class LocalStorage:
+    # Ключ — путь относительно корня, как он хранится в achievements.file_path и users.avatar_path
+
+    def __init__(self, root: str = LOCAL_STORAGE_ROOT, base_url: str = LOCAL_STORAGE_URL):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    async def save(self, key: str, chunks: AsyncIterator[bytes], content_type: str = None):
+        # Запись во временный файл рядом с целевым и атомарное переименование
+        final_path = self.path(key)
+        directory = os.path.dirname(final_path)
+        await aiofiles.os.makedirs(directory, exist_ok=True)
+        temp_path = os.path.join(directory, f".{uuid.uuid4().hex}.part")
+
+        try:
+            async with aiofiles.open(temp_path, "wb") as buffer:
+                async for chunk in chunks:
+                    await buffer.write(chunk)
+            await aiofiles.os.replace(temp_path, final_path)
+        except BaseException:
+            try:
+                await aiofiles.os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    async def move(self, source: str, target: str):
+        await aiofiles.os.makedirs(os.path.dirname(self.path(target)), exist_ok=True)
+        await aiofiles.os.replace(self.path(source), self.path(target))
+
+    async def open(self, key: str) -> AsyncIterator[bytes]:
+        async with aiofiles.open(self.path(key), "rb") as source:
+            while chunk := await source.read(READ_CHUNK_SIZE):
+                yield chunk
+
+    async def exists(self, key: str) -> bool:
+        return bool(key) and await aiofiles.os.path.isfile(self.path(key))
+
+    async def delete(self, keys: Iterable[str]) -> int:
+        removed = 0
+        for key in filter(None, keys):
+            try:
+                await aiofiles.os.remove(self.path(key))
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("Storage delete failed", key=key, error=str(e))
+        return removed
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    async def download_url(self, key: str, filename: str) -> Optional[str]:
+        # Локальные файлы отдаёт само приложение
+        return None
+
+
+class S3Storage:
+    # S3-совместимое хранилище (AWS, MinIO). boto3 синхронный: вызовы уходят в пул потоков
+
+    def __init__(self, bucket: str = S3_BUCKET, client=None, presign_ttl: int = S3_PRESIGN_TTL):
+        if client is None:
+            import boto3
+            client = boto3.client("s3", endpoint_url=S3_ENDPOINT_URL, region_name=S3_REGION)
+        self.client = client
+        self.bucket = bucket
+        self.presign_ttl = presign_ttl
+
+    async def save(self, key: str, chunks: AsyncIterator[bytes], content_type: str = None):
+        # Части по S3_PART_SIZE уходят сразу, в памяти держится не больше одной части.
+        # Файл меньше одной части загружается обычным PutObject
+        extra = {"ContentType": content_type} if content_type else {}
+        buffer = bytearray()
+        upload_id = None
+        parts = []
+
+        try:
+            async for chunk in chunks:
+                buffer.extend(chunk)
+                if len(buffer) >= S3_PART_SIZE:
+                    if upload_id is None:
+                        upload_id = (await asyncio.to_thread(
+                            self.client.create_multipart_upload, Bucket=self.bucket, Key=key, **extra
+                        ))["UploadId"]
+                    parts.append(await self._upload_part(key, upload_id, len(parts) + 1, bytes(buffer)))
+                    buffer.clear()
+
+            if upload_id is None:
+                await asyncio.to_thread(self.client.put_object, Bucket=self.bucket, Key=key, Body=bytes(buffer), **extra)
+                return
+
+            if buffer:
+                parts.append(await self._upload_part(key, upload_id, len(parts) + 1, bytes(buffer)))
+            await asyncio.to_thread(
+                self.client.complete_multipart_upload, Bucket=self.bucket, Key=key, UploadId=upload_id,
+                MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            if upload_id is not None:
+                try:
+                    await asyncio.to_thread(
+                        self.client.abort_multipart_upload, Bucket=self.bucket, Key=key, UploadId=upload_id
+                    )
+                except Exception as e:
+                    logger.warning("S3 multipart abort failed", key=key, error=str(e))
+            raise
+
+    async def _upload_part(self, key: str, upload_id: str, number: int, body: bytes) -> dict:
+        response = await asyncio.to_thread(
+            self.client.upload_part, Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body
+        )
+        return {"ETag": response["ETag"], "PartNumber": number}
+
+    async def move(self, source: str, target: str):
+        # В S3 нет переименования: копия на стороне сервера и удаление исходного ключа
+        await asyncio.to_thread(
+            self.client.copy_object, Bucket=self.bucket, Key=target, CopySource={"Bucket": self.bucket, "Key": source}
+        )
+        await self.delete([source])
+
+    async def open(self, key: str) -> AsyncIterator[bytes]:
+        body = (await asyncio.to_thread(self.client.get_object, Bucket=self.bucket, Key=key))["Body"]
+        try:
+            while chunk := await asyncio.to_thread(body.read, READ_CHUNK_SIZE):
+                yield chunk
+        finally:
+            body.close()
+
+    async def exists(self, key: str) -> bool:
+        if not key:
+            return False
+        try:
+            await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=key)
+            return True
+        except self.client.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    async def delete(self, keys: Iterable[str]) -> int:
+        keys = [key for key in keys if key]
+        removed = 0
+        for start in range(0, len(keys), S3_DELETE_BATCH):
+            batch = keys[start:start + S3_DELETE_BATCH]
+            response = await asyncio.to_thread(
+                self.client.delete_objects, Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+            )
+            errors = response.get("Errors", [])
+            for error in errors:
+                logger.warning("Storage delete failed", key=error.get("Key"), error=error.get("Message"))
+            removed += len(batch) - len(errors)
+        return removed
+
+    def url(self, key: str, expires: int = None) -> str:
+        # Подпись считается локально, без запроса к S3
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=expires or self.presign_ttl
+        )
+
+    async def download_url(self, key: str, filename: str) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key, "ResponseContentDisposition": _disposition(filename)},
+            ExpiresIn=self.presign_ttl
+        )
+
+
+_storage = None
+
+
+def get_storage():
+    global _storage
+    if _storage is None:
+        _storage = S3Storage() if STORAGE_BACKEND == "s3" else LocalStorage()
+    return _storage
+
+
+def set_storage(storage):
+    global _storage
+    _storage = storage
+
+
+def media_url(key: Optional[str]) -> str:
+    return get_storage().url(key) if key else ""
@@ -1,65 +1,47 @@
-import os
-import redis.asyncio as aioredis
+import structlog
 from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi import Request, HTTPException
-from sqlalchemy import select, func
-from app.infrastructure.tranaslations import current_locale
-from app.infrastructure.database.connection import db_instance
+from sqlalchemy import select
+from app.infrastructure.database import async_session_maker
+from app.infrastructure.redis_client import get_redis
+from app.services.pending_counters import PendingCounters
 from app.models.user import Users
-from app.models.achievement import Achievement
-from app.models.enums import UserStatus, AchievementStatus, UserRole
+from app.models.enums import UserStatus, UserRole
 
-redis_client = aioredis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"), decode_responses=True)
-CACHE_TTL = 60
+logger = structlog.get_logger()
 
+ADMIN_PREFIX = "/sirius.achievements"
 
-class GlobalContextMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        try:
-            locale = request.session.get('locale', 'en')
-        except AssertionError:
-            locale = 'en'
-
-        token = current_locale.set(locale)
-
-        try:
-            pending_users = await redis_client.get("admin:pending_users")
-            pending_ach = await redis_client.get("admin:pending_achievements")
-
-            if pending_users is None or pending_ach is None:
-                async with db_instance.session_factory() as db:
-                    query_users = select(func.count()).select_from(Users).where(Users.status == UserStatus.PENDING)
-                    result_users = await db.execute(query_users)
-                    pending_users_val = result_users.scalar()
 
-                    query_ach = select(func.count()).select_from(Achievement).where(
-                        Achievement.status == AchievementStatus.PENDING)
-                    result_ach = await db.execute(query_ach)
-                    pending_achievements_val = result_ach.scalar()
+def renders_layout(request: Request) -> bool:
+    # Бейджи нужны только страницам с админским layout: JSON, XHR, статика и POST их не показывают
+    path = request.url.path
+    return (
+        request.method == "GET"
+        and "auth_id" in request.scope.get("session", {})
+        and path.startswith(ADMIN_PREFIX)
+        and "/api/" not in path
+        and request.headers.get('x-requested-with') != 'XMLHttpRequest'
+        and "text/html" in request.headers.get("accept", "text/html")
+    )
 
-                    await redis_client.set("admin:pending_users", pending_users_val, ex=CACHE_TTL)
-                    await redis_client.set("admin:pending_achievements", pending_achievements_val, ex=CACHE_TTL)
 
-                    pending_users = pending_users_val
-                    pending_ach = pending_achievements_val
-            else:
-                pending_users = int(pending_users)
-                pending_ach = int(pending_ach)
-
-            request.state.app_name = "Sirius Achievements"
-            request.state.pending_users_count = pending_users
-            request.state.pending_achievements_count = pending_ach
-
-        except Exception as e:
-            print(f"Middleware DB/Cache Error: {e}")
-            request.state.pending_users_count = 0
-            request.state.pending_achievements_count = 0
-
-        response = await call_next(request)
+class GlobalContextMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        # Только счётчики для бейджей: локаль по-прежнему не переключается (LocaleMiddleware не подключён)
+        request.state.app_name = "Sirius Achievements"
+        request.state.pending_users_count = 0
+        request.state.pending_achievements_count = 0
 
-        current_locale.reset(token)
+        if renders_layout(request):
+            try:
+                pending_users, pending_ach = await PendingCounters(await get_redis()).get()
+                request.state.pending_users_count = pending_users
+                request.state.pending_achievements_count = pending_ach
+            except Exception as e:
+                logger.warning("Pending counters read failed", error=str(e))
 
-        return response
+        return await call_next(request)
 
 
 async def auth(request: Request):
@@ -70,7 +52,7 @@ async def auth(request: Request):
             raise HTTPException(status_code=401, detail="Unauthorized")
         raise HTTPException(status_code=302, headers={"Location": "/sirius.achievements/login"})
 
-    async with db_instance.session_factory() as db:
+    async with async_session_maker() as db:
         stmt = select(Users).filter(Users.id == int(auth_id))
         result = await db.execute(stmt)
         user = result.scalars().first()
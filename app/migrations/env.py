@@ -13,6 +13,10 @@ from app.models.user import Users
 from app.models.user_token import UserToken
 from app.models.page import Page
 from app.models.achievement import Achievement
+from app.models.user_score import UserScore
+from app.models.season_job import SeasonJob
+from app.models.daily_achievement_stat import DailyAchievementStat
+from app.models.points_rule import PointsRule
 
 config = context.config
 
@@ -21,6 +25,13 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# Объекты, которые живут только в PostgreSQL и не описаны в моделях: autogenerate не должен их удалять
+UNMANAGED_OBJECTS = {"search_vector", "ix_achievements_search_vector", "ix_users_search_trgm"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (reflected and compare_to is None and name in UNMANAGED_OBJECTS)
+
 
 def get_url():
     import os
@@ -39,6 +50,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -48,7 +60,7 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
 
     with context.begin_transaction():
         context.run_migrations()
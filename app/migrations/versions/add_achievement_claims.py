@@ -0,0 +1,24 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_achievement_claims'
+down_revision = 'add_moderation_queue_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('achievements', sa.Column('claimed_by', sa.Integer(), nullable=True))
+    op.add_column('achievements', sa.Column('claim_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_foreign_key('fk_achievements_claimed_by_users', 'achievements', 'users', ['claimed_by'], ['id'],
+                          ondelete='SET NULL')
+    # Енумы хранятся по имени, поэтому 'PENDING'
+    op.create_index('ix_achievements_pending_claimed_by', 'achievements', ['claimed_by'], unique=False,
+                    postgresql_where=sa.text("status = 'PENDING'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_achievements_pending_claimed_by', table_name='achievements')
+    op.drop_constraint('fk_achievements_claimed_by_users', 'achievements', type_='foreignkey')
+    op.drop_column('achievements', 'claim_expires_at')
+    op.drop_column('achievements', 'claimed_by')
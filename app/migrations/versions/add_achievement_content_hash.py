@@ -0,0 +1,17 @@
+import sqlalchemy as sa
+from alembic import op
+
+revision = 'add_achievement_content_hash'
+down_revision = 'add_documents_registry_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('achievements', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_achievements_content_hash', 'achievements', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_achievements_content_hash', table_name='achievements')
+    op.drop_column('achievements', 'content_hash')
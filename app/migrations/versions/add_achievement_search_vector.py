@@ -0,0 +1,27 @@
+from alembic import op
+
+revision = 'add_achievement_search_vector'
+down_revision = 'add_points_rules'
+branch_labels = None
+depends_on = None
+
+# Копия app.models.achievement.SEARCH_VECTOR_SQL на момент миграции
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.execute(
+        f"ALTER TABLE achievements ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_achievements_search_vector ON achievements USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_achievements_search_vector")
+    op.execute("ALTER TABLE achievements DROP COLUMN IF EXISTS search_vector")
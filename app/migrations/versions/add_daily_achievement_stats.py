@@ -0,0 +1,43 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_daily_achievement_stats'
+down_revision = 'add_season_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_achievement_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('education_level', sa.String(length=50), nullable=False, server_default=''),
+        sa.Column('created_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('changed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day', 'status', 'category', 'education_level')
+    )
+
+    # Начальное заполнение: day по created_at для created_count и по дате последнего изменения для changed_count
+    op.execute("""
+        INSERT INTO daily_achievement_stats (day, status, category, education_level, created_count, changed_count)
+        SELECT day, status, category, education_level, SUM(created_count), SUM(changed_count)
+        FROM (
+            SELECT CAST(a.created_at AS DATE) AS day, CAST(a.status AS VARCHAR) AS status,
+                   CAST(a.category AS VARCHAR) AS category, COALESCE(CAST(u.education_level AS VARCHAR), '') AS education_level,
+                   COUNT(*) AS created_count, 0 AS changed_count
+            FROM achievements a JOIN users u ON u.id = a.user_id
+            GROUP BY 1, 2, 3, 4
+            UNION ALL
+            SELECT CAST(COALESCE(a.updated_at, a.created_at) AS DATE), CAST(a.status AS VARCHAR),
+                   CAST(a.category AS VARCHAR), COALESCE(CAST(u.education_level AS VARCHAR), ''),
+                   0, COUNT(*)
+            FROM achievements a JOIN users u ON u.id = a.user_id
+            GROUP BY 1, 2, 3, 4
+        ) AS stats
+        GROUP BY day, status, category, education_level
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('daily_achievement_stats')
@@ -0,0 +1,21 @@
+import sqlalchemy as sa
+from alembic import op
+
+revision = 'add_documents_registry_indexes'
+down_revision = 'add_users_trigram_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_achievements_created_at_id', 'achievements', ['created_at', 'id'], unique=False)
+    op.create_index('ix_achievements_level_created_at_id', 'achievements',
+                    ['level', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_achievements_category_created_at_id', 'achievements',
+                    ['category', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_achievements_category_created_at_id', table_name='achievements')
+    op.drop_index('ix_achievements_level_created_at_id', table_name='achievements')
+    op.drop_index('ix_achievements_created_at_id', table_name='achievements')
@@ -0,0 +1,40 @@
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.points_calculator import PRIORITY_HOURS_PER_POINT
+
+revision = 'add_moderation_priority'
+down_revision = 'add_achievement_claims'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('achievements', sa.Column('projected_points', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('achievements', sa.Column('revision_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('achievements', sa.Column('priority', sa.Float(), nullable=False, server_default='0'))
+
+    # Те же значения, что points_calculator.calculate_points и moderation_priority (с той же настройкой
+    # MODERATION_PRIORITY_HOURS_PER_POINT)
+    op.execute("""
+        UPDATE achievements SET projected_points = CASE level
+            WHEN 'MUNICIPAL' THEN 20
+            WHEN 'REGIONAL' THEN 40
+            WHEN 'FEDERAL' THEN 75
+            WHEN 'INTERNATIONAL' THEN 100
+            ELSE 10
+        END
+    """)
+    op.execute(sa.text("""
+        UPDATE achievements
+        SET priority = projected_points - EXTRACT(EPOCH FROM COALESCE(created_at, now())) / 3600 / :hours_per_point
+    """).bindparams(hours_per_point=PRIORITY_HOURS_PER_POINT))
+
+    op.create_index('ix_achievements_status_priority_id', 'achievements', ['status', 'priority', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_achievements_status_priority_id', table_name='achievements')
+    op.drop_column('achievements', 'priority')
+    op.drop_column('achievements', 'revision_count')
+    op.drop_column('achievements', 'projected_points')
@@ -0,0 +1,16 @@
+from alembic import op
+
+revision = 'add_moderation_queue_indexes'
+down_revision = 'add_daily_achievement_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_achievements_status_created_at_id', 'achievements', ['status', 'created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_users_education_level'), 'users', ['education_level'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_education_level'), table_name='users')
+    op.drop_index('ix_achievements_status_created_at_id', table_name='achievements')
@@ -0,0 +1,31 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_points_rules'
+down_revision = 'add_moderation_priority'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('points_rules',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('effective_from', sa.Date(), nullable=False),
+        sa.Column('level', sa.String(length=50), nullable=False, server_default=''),
+        sa.Column('category', sa.String(length=50), nullable=False, server_default=''),
+        sa.Column('base_points', sa.Integer(), nullable=True),
+        sa.Column('multiplier', sa.Float(), nullable=False, server_default='1'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('version', 'level', 'category', name='uq_points_rules_version_level_category')
+    )
+    op.create_index(op.f('ix_points_rules_version'), 'points_rules', ['version'], unique=False)
+
+    op.add_column('achievements', sa.Column('rules_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('achievements', 'rules_version')
+    op.drop_index(op.f('ix_points_rules_version'), table_name='points_rules')
+    op.drop_table('points_rules')
@@ -0,0 +1,15 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_season_job_snapshot'
+down_revision = 'add_achievement_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('season_jobs', sa.Column('snapshot_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('season_jobs', 'snapshot_at')
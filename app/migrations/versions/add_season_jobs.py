@@ -0,0 +1,34 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_season_jobs'
+down_revision = 'add_user_scores'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('season_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('season_name', sa.String(length=100), nullable=False),
+        sa.Column('started_by', sa.Integer(), nullable=True),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='seasonjobstatus'), nullable=False),
+        sa.Column('stage', sa.String(length=50), nullable=False, server_default='results'),
+        sa.Column('processed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('lock_key', sa.String(length=50), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['started_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('lock_key')
+    )
+    op.create_index(op.f('ix_season_jobs_id'), 'season_jobs', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_season_jobs_id'), table_name='season_jobs')
+    op.drop_table('season_jobs')
+    sa.Enum(name='seasonjobstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,33 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_user_scores'
+down_revision = '25279d38c60e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('user_scores',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total_points', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('approved_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_user_scores_total_points'), 'user_scores', ['total_points'], unique=False)
+
+    # Начальное заполнение из одобренных достижений
+    op.execute("""
+        INSERT INTO user_scores (user_id, total_points, approved_count, updated_at)
+        SELECT user_id, COALESCE(SUM(points), 0), COUNT(id), now()
+        FROM achievements
+        WHERE status = 'APPROVED'
+        GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_scores_total_points'), table_name='user_scores')
+    op.drop_table('user_scores')
@@ -0,0 +1,21 @@
+from alembic import op
+
+revision = 'add_users_trigram_search'
+down_revision = 'add_achievement_search_vector'
+branch_labels = None
+depends_on = None
+
+# Копия app.models.user.search_text_sql() на момент миграции
+SEARCH_TEXT_SQL = (
+    "lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || "
+    "coalesce(email, '') || ' ' || coalesce(phone_number, ''))"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(f"CREATE INDEX IF NOT EXISTS ix_users_search_trgm ON users USING gin (({SEARCH_TEXT_SQL}) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_users_search_trgm")
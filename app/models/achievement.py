@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text, Index, Float, DDL, event, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -15,15 +15,64 @@ class Achievement(Base):
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     file_path = Column(String, nullable=False)
+    # SHA-256 содержимого: одинаковые файлы разных достижений ссылаются на один объект в хранилище
+    content_hash = Column(String(64), nullable=True, index=True)
 
     category = Column(Enum(AchievementCategory), default=AchievementCategory.OTHER, nullable=False)
     level = Column(Enum(AchievementLevel), default=AchievementLevel.SCHOOL, nullable=False)
     points = Column(Integer, default=0)  # Баллы за достижение
+    # Баллы и приоритет считаются один раз при вставке (AchievementService.create), а не на каждой странице очереди
+    projected_points = Column(Integer, nullable=False, default=0, server_default="0")
+    revision_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Версия правил начисления, по которой посчитаны points/projected_points
+    rules_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Приоритет в очереди модерации, см. points_calculator.moderation_priority
+    priority = Column(Float, nullable=False, default=0, server_default="0")
 
     status = Column(Enum(AchievementStatus), default=AchievementStatus.PENDING)
     rejection_reason = Column(Text, nullable=True)
 
+    # Аренда документа модератором: пока она не истекла, документ не выдаётся другим
+    claimed_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    claim_expires_at = Column(DateTime(timezone=True), nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    user = relationship("Users", back_populates="achievements")
\ No newline at end of file
+    user = relationship("Users", back_populates="achievements", foreign_keys=[user_id])
+
+    __table_args__ = (
+        # Очередь модерации: WHERE status = ... ORDER BY created_at, id с курсором по (created_at, id)
+        Index("ix_achievements_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_achievements_status_priority_id", "status", "priority", "id"),
+        # Реестр документов: keyset по (created_at, id) в обе стороны
+        Index("ix_achievements_created_at_id", "created_at", "id"),
+        # Снятие прежней выдачи модератора на каждой странице очереди: WHERE claimed_by = ... AND status = 'PENDING'
+        Index("ix_achievements_pending_claimed_by", "claimed_by",
+              postgresql_where=text("status = 'PENDING'"), sqlite_where=text("status = 'PENDING'")),
+    )
+
+
+# Реестр документов с сортировкой по уровню или виду: ORDER BY level, created_at DESC, id DESC
+Index("ix_achievements_level_created_at_id", Achievement.level, Achievement.created_at.desc(), Achievement.id.desc())
+Index("ix_achievements_category_created_at_id", Achievement.category, Achievement.created_at.desc(),
+      Achievement.id.desc())
+
+
+# Полнотекстовый поиск (только PostgreSQL): генерируемая колонка search_vector с GIN-индексом.
+# В ORM-модель она не входит, чтобы SQLite в тестах и dev работал без неё; запросы обращаются к ней
+# через AchievementRepository.search_clause. Для баз из миграций её создаёт add_achievement_search_vector.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+event.listen(Achievement.__table__, "after_create", DDL(
+    f"ALTER TABLE achievements ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+).execute_if(dialect="postgresql"))
+event.listen(Achievement.__table__, "after_create", DDL(
+    "CREATE INDEX IF NOT EXISTS ix_achievements_search_vector ON achievements USING gin (search_vector)"
+).execute_if(dialect="postgresql"))
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Date
+
+from app.infrastructure.database import Base
+
+
+class DailyAchievementStat(Base):
+    # Суточный агрегат документов. Измерения хранятся именами enum, '' — уровень обучения не указан.
+    # created_count — документы, поданные в этот день и сейчас находящиеся в status;
+    # changed_count — документы, перешедшие в status в этот день и всё ещё в нём.
+    __tablename__ = "daily_achievement_stats"
+
+    day = Column(Date, primary_key=True)
+    status = Column(String(20), primary_key=True)
+    category = Column(String(50), primary_key=True)
+    education_level = Column(String(50), primary_key=True, default="")
+
+    created_count = Column(Integer, nullable=False, default=0)
+    changed_count = Column(Integer, nullable=False, default=0)
@@ -44,4 +44,10 @@ class EducationLevel(str, Enum):
     BACHELOR = "Бакалавриат"
     SPECIALIST = "Специалитет"
     MASTER = "Магистратура"
-    POSTGRADUATE = "Аспирантура"
\ No newline at end of file
+    POSTGRADUATE = "Аспирантура"
+
+class SeasonJobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
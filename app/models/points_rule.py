@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.infrastructure.database import Base
+
+
+class PointsRule(Base):
+    # Версия правил начисления — набор строк с одним version. Строка с category = '' задаёт базовые баллы
+    # уровня, строка с level = '' — множитель категории. Измерения хранятся именами enum.
+    __tablename__ = "points_rules"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, index=True)
+    effective_from = Column(Date, nullable=False)
+
+    level = Column(String(50), nullable=False, default="")
+    category = Column(String(50), nullable=False, default="")
+    base_points = Column(Integer, nullable=True)
+    multiplier = Column(Float, nullable=False, default=1.0)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("version", "level", "category", name="uq_points_rules_version_level_category"),
+    )
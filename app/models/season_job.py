@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+
+from app.infrastructure.database import Base
+from app.models.enums import SeasonJobStatus
+
+
+class SeasonJob(Base):
+    __tablename__ = "season_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    season_name = Column(String(100), nullable=False)
+    started_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    status = Column(Enum(SeasonJobStatus), default=SeasonJobStatus.PENDING, nullable=False)
+    stage = Column(String(50), nullable=False, default="results")
+    processed = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+
+    # Уникальный ключ занят, пока сезон закрывается: второй такой же джоб не вставится
+    lock_key = Column(String(50), unique=True, nullable=True)
+
+    # Момент снимка итогов: архивируются только документы, одобренные до него
+    snapshot_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    user = relationship("Users")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, DDL, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -19,7 +19,7 @@ class Users(Base):
     role = Column(Enum(UserRole), default=UserRole.GUEST)
     status = Column(Enum(UserStatus), default=UserStatus.PENDING)
 
-    education_level = Column(Enum(EducationLevel), nullable=True)
+    education_level = Column(Enum(EducationLevel), nullable=True, index=True)
     course = Column(Integer, nullable=True)
 
     is_active = Column(Boolean, default=True)
@@ -29,6 +29,26 @@ class Users(Base):
     failed_attempts = Column(Integer, default=0)
     blocked_until = Column(DateTime, nullable=True)
 
-    achievements = relationship("Achievement", back_populates="user", cascade="all, delete-orphan")
+    achievements = relationship("Achievement", back_populates="user", cascade="all, delete-orphan",
+                                foreign_keys="Achievement.user_id")
     notifications = relationship("Notification", back_populates="user", cascade="all, delete-orphan")
-    tokens = relationship("UserToken", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+    tokens = relationship("UserToken", back_populates="user", cascade="all, delete-orphan")
+    score = relationship("UserScore", back_populates="user", uselist=False, cascade="all, delete-orphan")
+
+# Поиск пользователей (только PostgreSQL): GIN-индекс pg_trgm по одному выражению из имени, фамилии,
+# почты и телефона. Запросы должны повторять выражение дословно, иначе планировщик не возьмёт индекс,
+# поэтому оно собирается одной функцией и в DDL, и в UserRepository.search_clause.
+SEARCH_TEXT_COLUMNS = ("first_name", "last_name", "email", "phone_number")
+
+
+def search_text_sql(prefix: str = "") -> str:
+    parts = " || ' ' || ".join(f"coalesce({prefix}{column}, '')" for column in SEARCH_TEXT_COLUMNS)
+    return f"lower({parts})"
+
+
+event.listen(Users.__table__, "after_create", DDL(
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+).execute_if(dialect="postgresql"))
+event.listen(Users.__table__, "after_create", DDL(
+    f"CREATE INDEX IF NOT EXISTS ix_users_search_trgm ON users USING gin (({search_text_sql()}) gin_trgm_ops)"
+).execute_if(dialect="postgresql"))
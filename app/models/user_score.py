@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+
+from app.infrastructure.database import Base
+
+
+class UserScore(Base):
+    __tablename__ = "user_scores"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_points = Column(Integer, nullable=False, default=0, index=True)
+    approved_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    user = relationship("Users", back_populates="score")
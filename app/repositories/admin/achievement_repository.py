@@ -1,26 +1,73 @@
-from sqlalchemy import select
+import json
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple, Union
+from sqlalchemy import select, update, and_, or_, tuple_, func, literal_column
 from sqlalchemy.orm import selectinload
+from app.infrastructure.database.explain import Explain
 from app.repositories.admin.base_crud_repository import BaseCrudRepository
 from app.models.achievement import Achievement
+from app.models.user import Users
+from app.models.enums import AchievementStatus
+from app.repositories.admin.achievement_stats_repository import AchievementStatsRepository
+
+
+def keyset_after(keys, after: tuple):
+    # Строки строго после курсора при ORDER BY keys; разные направления раскрываются в OR по префиксам
+    if len({descending for _, descending in keys}) == 1:
+        row, cursor = tuple_(*[column for column, _ in keys]), tuple_(*after)
+        return row < cursor if keys[0][1] else row > cursor
+
+    clauses = []
+    for index, (column, descending) in enumerate(keys):
+        equal = [keys[position][0] == after[position] for position in range(index)]
+        clauses.append(and_(*equal, column < after[index] if descending else column > after[index]))
+    return or_(*clauses)
+
+
+def prefix_tsquery(query: str) -> str:
+    # Каждое слово как префикс: поиск работает по мере ввода, а не только по целым словам
+    words = re.findall(r"\w+", query)
+    return " & ".join(f"{word}:*" for word in words)
 
 
 class AchievementRepository(BaseCrudRepository):
     def __init__(self, db):
         super().__init__(db, Achievement)
 
-    async def get_all_with_filters(
-            self,
-            search: str = "",
-            status: str = "",
-            category: str = "",
-            level: str = "",
-            sort_by: str = "newest"
-    ):
+    def search_clause(self, query: str):
+        # (условие, ранг) для поиска по названию и описанию. В PostgreSQL — GIN-индекс по search_vector
+        # с русской и английской конфигурациями, в SQLite — ilike без ранжирования
+        if self.db.get_bind().dialect.name != "postgresql":
+            pattern = f"%{query}%"
+            return or_(self.model.title.ilike(pattern), self.model.description.ilike(pattern)), None
+
+        terms = prefix_tsquery(query)
+        if not terms:
+            return literal_column("false"), None
+
+        vector = literal_column("achievements.search_vector")
+        tsquery = func.to_tsquery('russian', terms).op('||')(func.to_tsquery('english', terms))
+        return vector.op('@@')(tsquery), func.ts_rank_cd(vector, tsquery)
 
-        stmt = select(self.model).options(selectinload(self.model.user))
+    async def search(self, query: str, user_id: int = None, limit: int = 5) -> list:
+        condition, rank = self.search_clause(query)
+        stmt = select(self.model).filter(condition)
+        if user_id is not None:
+            stmt = stmt.filter(self.model.user_id == user_id)
+        if rank is not None:
+            stmt = stmt.order_by(rank.desc(), self.model.id.desc())
+        else:
+            stmt = stmt.order_by(self.model.id.desc())
+        return (await self.db.execute(stmt.limit(limit))).scalars().all()
+
+    def _filtered_stmt(self, search: str = "", status: str = "", category: str = "", level: str = ""):
+        stmt = select(self.model)
 
+        rank = None
         if search:
-            stmt = stmt.filter(self.model.title.ilike(f"%{search}%"))
+            condition, rank = self.search_clause(search)
+            stmt = stmt.filter(condition)
 
         if status and status != "all":
             stmt = stmt.filter(self.model.status == status)
@@ -31,14 +78,188 @@ class AchievementRepository(BaseCrudRepository):
         if level and level != "all":
             stmt = stmt.filter(self.model.level == level)
 
-        if sort_by == "oldest":
-            stmt = stmt.order_by(self.model.created_at.asc())
-        elif sort_by == "level":
-            stmt = stmt.order_by(self.model.level.asc())
-        elif sort_by == "category":
-            stmt = stmt.order_by(self.model.category.asc())
+        return stmt, rank
+
+    async def get_all_with_filters(
+            self,
+            search: str = "",
+            status: str = "",
+            category: str = "",
+            level: str = "",
+            sort_by: str = "newest",
+            after: Optional[tuple] = None,
+            offset: int = 0,
+            limit: int = 50
+    ):
+        stmt, rank = self._filtered_stmt(search, status, category, level)
+        stmt = stmt.options(selectinload(self.model.user))
+
+        if sort_by == "relevance" and rank is not None:
+            # ts_rank не индексируется: релевантность считается по всем совпадениям, страницы — через OFFSET
+            stmt = stmt.order_by(rank.desc(), self.model.created_at.desc(), self.model.id.desc()).offset(offset)
         else:
-            stmt = stmt.order_by(self.model.created_at.desc())
+            keys = self.document_sort_keys(sort_by)
+            if after:
+                stmt = stmt.filter(keyset_after(keys, after))
+            stmt = stmt.order_by(*[column.desc() if descending else column.asc() for column, descending in keys])
+
+        result = await self.db.execute(stmt.limit(limit))
+        return result.scalars().all()
+
+    def document_sort_keys(self, sort_by: str):
+        # Ключ keyset-пагинации реестра: колонки сортировки и id в направлении последней из них
+        keys = {
+            "oldest": [(self.model.created_at, False)],
+            "level": [(self.model.level, False), (self.model.created_at, True)],
+            "category": [(self.model.category, False), (self.model.created_at, True)],
+        }.get(sort_by, [(self.model.created_at, True)])
+        return keys + [(self.model.id, keys[-1][1])]
+
+    async def estimate_with_filters(self, search: str = "", status: str = "", category: str = "",
+                                    level: str = "") -> int:
+        # Без поиска и уровня итог берётся из суточного агрегата, иначе — оценка планировщика PostgreSQL
+        if not search and (not level or level == "all"):
+            return await AchievementStatsRepository(self.db).documents_count(
+                status if status != "all" else None, category if category != "all" else None
+            )
+
+        stmt, _ = self._filtered_stmt(search, status, category, level)
+        stmt = stmt.with_only_columns(self.model.id)
+        if self.db.get_bind().dialect.name != "postgresql":
+            return await self.db.scalar(select(func.count()).select_from(stmt.subquery())) or 0
+
+        plan = await self.db.scalar(Explain(stmt))
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def _pending_stmt(self, education_level=None, after: Optional[Tuple[Union[datetime, float], int]] = None,
+                      sort: str = "age"):
+        # Keyset по (created_at, id) или (priority, id): цена страницы не зависит от её номера
+        stmt = (
+            select(self.model)
+            .join(Users, self.model.user_id == Users.id)
+            .filter(self.model.status == AchievementStatus.PENDING)
+        )
+
+        if education_level:
+            stmt = stmt.filter(Users.education_level == education_level)
+        if sort == "priority":
+            if after:
+                stmt = stmt.filter(or_(
+                    self.model.priority < after[0],
+                    and_(self.model.priority == after[0], self.model.id > after[1])
+                ))
+            return stmt.order_by(self.model.priority.desc(), self.model.id.asc())
+
+        if after:
+            stmt = stmt.filter(tuple_(self.model.created_at, self.model.id) > tuple_(*after))
+
+        return stmt.order_by(self.model.created_at.asc(), self.model.id.asc())
+
+    async def claim_batch(self, moderator_id: int, lease: timedelta, education_level=None,
+                          after: Optional[Tuple[Union[datetime, float], int]] = None, limit: int = 10,
+                          sort: str = "age") -> Tuple[list, bool]:
+        # Без commit: транзакцией владеет вызывающий, ему же возвращается признак, что строки менялись
+        now = datetime.now(timezone.utc)
+
+        # SKIP LOCKED: параллельные модераторы не ждут друг друга и не получают одни и те же строки.
+        # Свои строки модератор получает снова вместе со свободными и просроченными
+        stmt = (
+            self._pending_stmt(education_level, after, sort)
+            .with_only_columns(self.model.id)
+            .filter(or_(self.model.claimed_by.is_(None), self.model.claimed_by == moderator_id,
+                        self.model.claim_expires_at < now))
+            .limit(limit)
+            .with_for_update(of=self.model, skip_locked=True)
+        )
+        ids = (await self.db.execute(stmt)).scalars().all()
+
+        # Прежняя выдача, не попавшая в новую пачку, возвращается в очередь: модератор ушёл дальше.
+        # Повторный заход на ту же страницу ничего не снимает
+        owned = (await self.db.execute(
+            select(self.model.id)
+            .where(self.model.claimed_by == moderator_id, self.model.status == AchievementStatus.PENDING)
+        )).scalars().all()
+        stale = set(owned) - set(ids)
+        if stale:
+            await self.db.execute(
+                update(self.model)
+                .where(self.model.id.in_(stale), self.model.claimed_by == moderator_id)
+                .values(claimed_by=None, claim_expires_at=None, updated_at=self.model.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+
+        if ids:
+            await self.db.execute(
+                update(self.model)
+                .where(self.model.id.in_(ids))
+                # Выдача в очередь — не изменение документа: updated_at задаёт день статуса для агрегатов
+                .values(claimed_by=moderator_id, claim_expires_at=now + lease, updated_at=self.model.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+        return list(ids), bool(ids or stale)
+
+    async def find_many(self, ids) -> list:
+        if not ids:
+            return []
+        stmt = (
+            select(self.model)
+            .options(selectinload(self.model.user))
+            .where(self.model.id.in_(ids))
+            .execution_options(populate_existing=True)
+        )
+        position = {id: index for index, id in enumerate(ids)}
+        return sorted((await self.db.execute(stmt)).scalars().all(), key=lambda item: position[item.id])
+
+    async def lock_files(self, content_hashes):
+        # Блокировки блобов до конца транзакции: публикация загрузки и проверка ссылок перед удалением
+        # блоба с тем же хэшем не перемежаются. В SQLite запись и так сериализована
+        if self.db.get_bind().dialect.name != "postgresql":
+            return
+        for content_hash in sorted(set(filter(None, content_hashes))):
+            await self.db.execute(select(func.pg_advisory_xact_lock(func.hashtext(content_hash))))
+
+    async def referenced_files(self, files) -> set:
+        # Счётчик ссылок на блоб — сами строки achievements: путь занят, пока есть строка с тем же
+        # хэшем и путём. Файлы без хэша (загруженные до контентной адресации) принадлежат одной строке
+        files = [(path, content_hash) for path, content_hash in files if path and content_hash]
+        if not files:
+            return set()
+        stmt = (
+            select(self.model.file_path)
+            .where(self.model.content_hash.in_({content_hash for _, content_hash in files}))
+            .where(self.model.file_path.in_({path for path, _ in files}))
+            .distinct()
+        )
+        return set((await self.db.execute(stmt)).scalars().all())
+
+    async def find_by_content_hash(self, content_hash: str, user_id: int = None, exclude_status=None) -> list:
+        stmt = select(self.model).where(self.model.content_hash == content_hash)
+        if user_id is not None:
+            stmt = stmt.where(self.model.user_id == user_id)
+        if exclude_status is not None:
+            stmt = stmt.where(self.model.status != exclude_status)
+        return (await self.db.execute(stmt.order_by(self.model.created_at, self.model.id))).scalars().all()
+
+    async def duplicates_for(self, items) -> dict:
+        # Для подсказки модератору: другие достижения с тем же файлом, по id достижения из пачки
+        hashes = {item.content_hash for item in items if item.content_hash}
+        if not hashes:
+            return {}
+        stmt = (
+            select(self.model)
+            .options(selectinload(self.model.user))
+            .where(self.model.content_hash.in_(hashes))
+            .order_by(self.model.created_at, self.model.id)
+        )
+        by_hash = {}
+        for other in (await self.db.execute(stmt)).scalars().all():
+            by_hash.setdefault(other.content_hash, []).append(other)
 
-        result = await self.db.execute(stmt)
-        return result.scalars().all()
\ No newline at end of file
+        duplicates = {}
+        for item in items:
+            others = [other for other in by_hash.get(item.content_hash, []) if other.id != item.id]
+            if others:
+                duplicates[item.id] = others
+        return duplicates
@@ -0,0 +1,206 @@
+from collections import defaultdict
+from datetime import date, datetime
+from enum import Enum
+from typing import List, Tuple
+from sqlalchemy import select, delete, insert, func, cast, literal, union_all, Date, String
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.database.upsert import dialect_insert
+from app.models.daily_achievement_stat import DailyAchievementStat
+from app.models.achievement import Achievement
+from app.models.user import Users
+from app.models.enums import AchievementStatus, AchievementCategory, EducationLevel
+
+
+def _name(enum_cls, value) -> str:
+    # В агрегате измерения хранятся именами enum: так же, как их хранят колонки Enum в achievements/users
+    if value is None or value == "":
+        return ""
+    if isinstance(value, Enum):
+        return value.name
+    if value in enum_cls.__members__:
+        return value
+    return enum_cls(value).name
+
+
+def _day(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    return value or date.today()
+
+
+class AchievementStatsRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.model = DailyAchievementStat
+
+    async def _education_level(self, user_id: int) -> str:
+        user = await self.db.get(Users, user_id)
+        return _name(EducationLevel, user.education_level) if user else ""
+
+    async def bump(self, day: date, status, category, education_level: str, created: int = 0, changed: int = 0):
+        # Без commit: изменение попадает в транзакцию вызывающего кода
+        if not created and not changed:
+            return
+
+        stmt = dialect_insert(self.db, self.model).values(
+            day=day,
+            status=_name(AchievementStatus, status),
+            category=_name(AchievementCategory, category),
+            education_level=education_level,
+            created_count=created,
+            changed_count=changed
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.day, self.model.status, self.model.category, self.model.education_level],
+            set_={
+                "created_count": self.model.created_count + created,
+                "changed_count": self.model.changed_count + changed
+            }
+        )
+        await self.db.execute(stmt)
+
+    async def _apply(self, created_day: date, status_day: date, status, category, education_level: str, delta: int):
+        if created_day == status_day:
+            await self.bump(created_day, status, category, education_level, created=delta, changed=delta)
+        else:
+            await self.bump(created_day, status, category, education_level, created=delta)
+            await self.bump(status_day, status, category, education_level, changed=delta)
+
+    async def record_created(self, user_id: int, category, status=AchievementStatus.PENDING, created_at=None):
+        day = _day(created_at)
+        await self._apply(day, day, status, category, await self._education_level(user_id), 1)
+
+    async def record_transition(self, achievement: Achievement, old_status, new_status, old_category=None):
+        # Вызывать до изменения updated_at: по нему определяется день, в который документ попал в old_status
+        old_category = old_category or achievement.category
+        if _name(AchievementStatus, old_status) == _name(AchievementStatus, new_status) and \
+                _name(AchievementCategory, old_category) == _name(AchievementCategory, achievement.category):
+            return
+
+        education_level = await self._education_level(achievement.user_id)
+        created_day = _day(achievement.created_at)
+        old_status_day = _day(achievement.updated_at or achievement.created_at)
+
+        await self._apply(created_day, old_status_day, old_status, old_category, education_level, -1)
+        await self._apply(created_day, date.today(), new_status, achievement.category, education_level, 1)
+
+    async def record_transitions(self, changes) -> None:
+        # changes: (created_at, updated_at, category, education_level, old_status, new_status).
+        # Дельты складываются по ключу агрегата, так что на пачку решений приходится по одному upsert на ключ
+        deltas = defaultdict(lambda: [0, 0])
+        today = date.today()
+        for created_at, updated_at, category, education_level, old_status, new_status in changes:
+            if _name(AchievementStatus, old_status) == _name(AchievementStatus, new_status):
+                continue
+            education_level = _name(EducationLevel, education_level)
+            category = _name(AchievementCategory, category)
+            created_day = _day(created_at)
+            for status, status_day, delta in ((old_status, _day(updated_at or created_at), -1),
+                                              (new_status, today, 1)):
+                status = _name(AchievementStatus, status)
+                deltas[(created_day, status, category, education_level)][0] += delta
+                deltas[(status_day, status, category, education_level)][1] += delta
+
+        for (day, status, category, education_level), (created, changed) in deltas.items():
+            await self.bump(day, status, category, education_level, created=created, changed=changed)
+
+    async def record_deleted(self, achievement: Achievement):
+        await self._apply(
+            _day(achievement.created_at),
+            _day(achievement.updated_at or achievement.created_at),
+            achievement.status,
+            achievement.category,
+            await self._education_level(achievement.user_id),
+            -1
+        )
+
+    def _date(self, column):
+        # SQLite не умеет CAST(... AS DATE): там дата берётся функцией date()
+        if self.db.get_bind().dialect.name == "sqlite":
+            return func.date(column)
+        return cast(column, Date)
+
+    async def rebuild(self) -> int:
+        education_level = func.coalesce(cast(Users.education_level, String), "")
+        dimensions = (cast(Achievement.status, String), cast(Achievement.category, String), education_level)
+
+        created_day = self._date(Achievement.created_at)
+        changed_day = self._date(func.coalesce(Achievement.updated_at, Achievement.created_at))
+        by_created = (
+            select(created_day.label("day"), *dimensions, func.count().label("created_count"),
+                   literal(0).label("changed_count"))
+            .join(Users, Users.id == Achievement.user_id)
+            .group_by(created_day, *dimensions)
+        )
+        by_changed = (
+            select(changed_day.label("day"), *dimensions, literal(0).label("created_count"),
+                   func.count().label("changed_count"))
+            .join(Users, Users.id == Achievement.user_id)
+            .group_by(changed_day, *dimensions)
+        )
+        stats = union_all(by_created, by_changed).subquery()
+        day, status, category, edu = stats.c[0], stats.c[1], stats.c[2], stats.c[3]
+
+        await self.db.execute(delete(self.model))
+        result = await self.db.execute(
+            insert(self.model).from_select(
+                ["day", "status", "category", "education_level", "created_count", "changed_count"],
+                select(day, status, category, edu, func.sum(stats.c.created_count), func.sum(stats.c.changed_count))
+                .group_by(day, status, category, edu)
+            )
+        )
+        return result.rowcount or 0
+
+    async def totals(self, since: date):
+        created_since = self.model.day >= since
+        stmt = select(
+            func.coalesce(func.sum(self.model.created_count).filter(
+                created_since, self.model.status == AchievementStatus.PENDING.name), 0).label('pending'),
+            func.coalesce(func.sum(self.model.changed_count).filter(
+                created_since, self.model.status == AchievementStatus.APPROVED.name), 0).label('approved'),
+            func.coalesce(func.sum(self.model.created_count).filter(created_since), 0).label('total')
+        )
+        return (await self.db.execute(stmt)).first()
+
+    async def daily_created(self, since: date) -> List[Tuple[date, int]]:
+        stmt = (
+            select(self.model.day, func.sum(self.model.created_count).label('cnt'))
+            .filter(self.model.day >= since)
+            .group_by(self.model.day)
+            .having(func.sum(self.model.created_count) > 0)
+            .order_by(self.model.day)
+        )
+        return (await self.db.execute(stmt)).all()
+
+    async def cohorts(self, since: date) -> list:
+        stmt = (
+            select(
+                self.model.education_level,
+                func.sum(self.model.created_count).label('total_docs'),
+                func.coalesce(func.sum(self.model.created_count).filter(
+                    self.model.status == AchievementStatus.PENDING.name), 0).label('pending_docs')
+            )
+            .filter(self.model.day >= since, self.model.education_level != "")
+            .group_by(self.model.education_level)
+            .having(func.sum(self.model.created_count) > 0)
+            .order_by(func.sum(self.model.created_count).desc())
+        )
+        return (await self.db.execute(stmt)).all()
+
+    async def pending_count(self, education_level=None) -> int:
+        stmt = select(func.coalesce(func.sum(self.model.created_count), 0)).filter(
+            self.model.status == AchievementStatus.PENDING.name
+        )
+        if education_level:
+            stmt = stmt.filter(self.model.education_level == _name(EducationLevel, education_level))
+        return (await self.db.execute(stmt)).scalar() or 0
+
+    async def documents_count(self, status=None, category=None) -> int:
+        # created_count по статусу — сколько документов сейчас в этом статусе (см. record_transition)
+        stmt = select(func.coalesce(func.sum(self.model.created_count), 0))
+        if status:
+            stmt = stmt.filter(self.model.status == _name(AchievementStatus, status))
+        if category:
+            stmt = stmt.filter(self.model.category == _name(AchievementCategory, category))
+        return (await self.db.execute(stmt)).scalar() or 0
@@ -0,0 +1,48 @@
+from datetime import date
+from typing import Dict, Optional
+from sqlalchemy import select, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.points_rule import PointsRule
+from app.models.enums import AchievementLevel, AchievementCategory
+from app.services.points_calculator import PointsRules, DEFAULT_RULES, enum_name
+
+
+class PointsRulesRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.model = PointsRule
+
+    async def active_version(self, on: date = None) -> Optional[int]:
+        stmt = select(func.max(self.model.version)).filter(self.model.effective_from <= (on or date.today()))
+        return (await self.db.execute(stmt)).scalar()
+
+    async def latest_version(self) -> int:
+        return (await self.db.execute(select(func.max(self.model.version)))).scalar() or 0
+
+    async def load(self, version: Optional[int]) -> PointsRules:
+        if not version:
+            return DEFAULT_RULES
+
+        rows = (await self.db.execute(select(self.model).filter(self.model.version == version))).scalars().all()
+        level_points = {row.level: row.base_points for row in rows if row.level and row.base_points is not None}
+        multipliers = {row.category: row.multiplier for row in rows if row.category and not row.level}
+        return PointsRules(version, level_points, multipliers)
+
+    async def create_version(self, level_points: Dict[str, int], category_multipliers: Dict[str, float],
+                             effective_from: date = None) -> int:
+        # Без commit: версия публикуется в транзакции вызывающего кода
+        version = await self.latest_version() + 1
+        effective_from = effective_from or date.today()
+
+        rows = [
+            {"version": version, "effective_from": effective_from, "level": enum_name(AchievementLevel, level),
+             "category": "", "base_points": int(points), "multiplier": 1.0}
+            for level, points in level_points.items()
+        ] + [
+            {"version": version, "effective_from": effective_from, "level": "",
+             "category": enum_name(AchievementCategory, category), "base_points": None, "multiplier": float(multiplier)}
+            for category, multiplier in category_multipliers.items()
+        ]
+        await self.db.execute(insert(self.model).values(rows))
+        return version
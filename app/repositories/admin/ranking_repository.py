@@ -0,0 +1,37 @@
+from datetime import datetime
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.achievement import Achievement
+from app.models.enums import AchievementStatus
+
+
+class RankingRepository:
+    # Место за период: RANK() по (баллы desc, документы desc) по одобренному с заданной даты, равные делят
+    # место. Место за всё время отдаёт LeaderboardService. Окно считается в подзапросе, внешний
+    # WHERE user_id = :id возвращает одну строку.
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _window(dense: bool):
+        return func.dense_rank() if dense else func.rank()
+
+    async def period_rank(self, user_id: int, since: datetime, dense: bool = False) -> int:
+        totals = (
+            select(
+                Achievement.user_id.label("user_id"),
+                func.sum(Achievement.points).label("points"),
+                func.count(Achievement.id).label("approved_count")
+            )
+            .filter(Achievement.status == AchievementStatus.APPROVED, Achievement.updated_at >= since)
+            .group_by(Achievement.user_id)
+            .subquery()
+        )
+        ranked = select(
+            totals.c.user_id,
+            self._window(dense).over(order_by=(totals.c.points.desc(), totals.c.approved_count.desc())).label("rank")
+        ).subquery()
+        stmt = select(ranked.c.rank).where(ranked.c.user_id == user_id)
+        return (await self.db.execute(stmt)).scalar() or 0
@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import select, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.season_job import SeasonJob
+from app.models.enums import SeasonJobStatus
+
+
+class SeasonJobRepository:
+    LOCK_KEY = "season"
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.model = SeasonJob
+
+    async def find(self, id: int) -> Optional[SeasonJob]:
+        return await self.db.get(self.model, id)
+
+    async def find_active(self) -> Optional[SeasonJob]:
+        stmt = select(self.model).filter(self.model.lock_key == self.LOCK_KEY)
+        return (await self.db.execute(stmt)).scalars().first()
+
+    async def create(self, season_name: str, started_by: int) -> Optional[SeasonJob]:
+        # Возвращает None, если другой сезон уже закрывается (lock_key занят)
+        job = self.model(
+            season_name=season_name,
+            started_by=started_by,
+            status=SeasonJobStatus.PENDING,
+            stage="results",
+            lock_key=self.LOCK_KEY
+        )
+        self.db.add(job)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            return None
+
+        await self.db.refresh(job)
+        return job
+
+    async def find_stale(self, older_than: datetime) -> List[SeasonJob]:
+        stmt = select(self.model).filter(
+            self.model.lock_key.isnot(None),
+            self.model.status.in_([SeasonJobStatus.PENDING, SeasonJobStatus.RUNNING]),
+            self.model.updated_at < older_than
+        )
+        return (await self.db.execute(stmt)).scalars().all()
+
+    async def claim(self, job: SeasonJob) -> bool:
+        # Оптимистичный захват: выигрывает тот, кто первым сдвинул updated_at
+        stmt = (
+            update(self.model)
+            .where(self.model.id == job.id, self.model.updated_at == job.updated_at)
+            .values(status=SeasonJobStatus.RUNNING, updated_at=func.now())
+        )
+        result = await self.db.execute(stmt)
+        await self.db.commit()
+        return result.rowcount == 1
@@ -1,9 +1,15 @@
-from app.models.user import Users
+from app.models.user import Users, search_text_sql
 from app.repositories.admin.crud_repository import CrudRepository
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, desc, asc
+from sqlalchemy import select, or_, desc, asc, func, literal, literal_column
 from app.schemas.admin.users import UserCreate
 
+
+def like_pattern(query: str) -> str:
+    escaped = query.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    return f"%{escaped}%"
+
+
 class UserRepository(CrudRepository):
     def __init__(self, db: AsyncSession):
         super().__init__(db, Users)
@@ -13,20 +19,32 @@ class UserRepository(CrudRepository):
         result = await self.db.execute(stmt)
         return result.scalars().first()
 
+    def search_clause(self, query: str):
+        # (условие, ранг) для поиска по имени, фамилии, почте и телефону. В PostgreSQL оба условия —
+        # подстрока и word_similarity (<%) — обслуживает GIN-индекс ix_users_search_trgm, в SQLite — без ранга
+        term = query.strip().lower()
+        text = literal_column(search_text_sql("users."))
+        condition = text.like(like_pattern(term), escape="/")
+        if self.db.get_bind().dialect.name != "postgresql":
+            return condition, None
+
+        return or_(condition, literal(term).op('<%')(text)), func.word_similarity(term, text)
+
+    async def suggest(self, query: str, limit: int = 5) -> list:
+        condition, rank = self.search_clause(query)
+        stmt = select(self.model).filter(condition)
+        if rank is not None:
+            stmt = stmt.order_by(rank.desc(), self.model.id.desc())
+        else:
+            stmt = stmt.order_by(self.model.id.desc())
+        return (await self.db.execute(stmt.limit(limit))).scalars().all()
+
     async def get(self, filters: dict = None, sort_by: str = 'id', sort_order: str = 'desc'):
         stmt = select(self.model)
 
         if filters is not None:
             if 'query' in filters and filters['query'] != '':
-                like_term = f"%{filters['query']}%"
-                stmt = stmt.filter(
-                    or_(
-                        self.model.first_name.ilike(like_term),
-                        self.model.last_name.ilike(like_term),
-                        self.model.email.ilike(like_term),
-                        self.model.phone_number.ilike(like_term),
-                    )
-                )
+                stmt = stmt.filter(self.search_clause(filters['query'])[0])
             if 'role' in filters and filters['role']:
                 stmt = stmt.filter(self.model.role == filters['role'])
             if 'status' in filters and filters['status']:
@@ -0,0 +1,150 @@
+from typing import Optional
+from sqlalchemy import select, update, delete, insert, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.database.upsert import dialect_insert
+from app.models.user_score import UserScore
+from app.models.user import Users
+from app.models.achievement import Achievement
+from app.models.enums import AchievementStatus, UserRole, UserStatus
+
+
+def _is_approved(status) -> bool:
+    status_val = status.value if hasattr(status, 'value') else status
+    return status_val in (AchievementStatus.APPROVED.value, AchievementStatus.APPROVED.name)
+
+
+class UserScoreRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.model = UserScore
+
+    async def find(self, user_id: int) -> Optional[UserScore]:
+        return await self.db.get(self.model, user_id)
+
+    def leaderboard_stmt(self, education_level: str = None, course: int = None):
+        stmt = (
+            select(
+                Users,
+                func.coalesce(self.model.total_points, 0).label("total_points"),
+                func.coalesce(self.model.approved_count, 0).label("achievements_count")
+            )
+            .outerjoin(self.model, self.model.user_id == Users.id)
+            .filter(Users.role == UserRole.STUDENT, Users.status == UserStatus.ACTIVE)
+        )
+
+        if education_level and education_level != 'all':
+            stmt = stmt.filter(Users.education_level == education_level)
+        if course:
+            stmt = stmt.filter(Users.course == course)
+
+        return stmt
+
+    def _sort_columns(self):
+        return (
+            func.coalesce(self.model.total_points, 0),
+            func.coalesce(self.model.approved_count, 0),
+            Users.id
+        )
+
+    def ordered_stmt(self, education_level: str = None, course: int = None):
+        points, count, user_id = self._sort_columns()
+        return self.leaderboard_stmt(education_level, course).order_by(points.desc(), count.desc(), user_id.asc())
+
+    async def apply_delta(self, user_id: int, points_delta: int, count_delta: int):
+        # Без commit: изменение попадает в транзакцию вызывающего кода
+        if not points_delta and not count_delta:
+            return
+
+        stmt = dialect_insert(self.db, self.model).values(
+            user_id=user_id,
+            total_points=points_delta,
+            approved_count=count_delta,
+            updated_at=func.now()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.user_id],
+            set_={
+                "total_points": self.model.total_points + points_delta,
+                "approved_count": self.model.approved_count + count_delta,
+                "updated_at": func.now()
+            }
+        )
+        await self.db.execute(stmt)
+
+    async def apply_transition(self, user_id: int, old_status, old_points: int, new_status, new_points: int):
+        was_approved = _is_approved(old_status)
+        is_approved = _is_approved(new_status)
+
+        points_delta = 0
+        if is_approved:
+            points_delta += new_points or 0
+        if was_approved:
+            points_delta -= old_points or 0
+        count_delta = int(is_approved) - int(was_approved)
+
+        await self.apply_delta(user_id, points_delta, count_delta)
+
+    async def apply_transitions(self, changes):
+        # changes: (user_id, old_status, old_points, new_status, new_points); по одному upsert на студента
+        deltas = {}
+        for user_id, old_status, old_points, new_status, new_points in changes:
+            was_approved, is_approved = _is_approved(old_status), _is_approved(new_status)
+            points_delta = (new_points or 0 if is_approved else 0) - (old_points or 0 if was_approved else 0)
+            total = deltas.setdefault(user_id, [0, 0])
+            total[0] += points_delta
+            total[1] += int(is_approved) - int(was_approved)
+
+        for user_id, (points_delta, count_delta) in deltas.items():
+            await self.apply_delta(user_id, points_delta, count_delta)
+
+    async def reset_all(self):
+        await self.db.execute(
+            update(self.model).values(total_points=0, approved_count=0, updated_at=func.now())
+        )
+
+    def _actual_totals_stmt(self):
+        return (
+            select(
+                Achievement.user_id.label("user_id"),
+                func.coalesce(func.sum(Achievement.points), 0).label("total_points"),
+                func.count(Achievement.id).label("approved_count")
+            )
+            .filter(Achievement.status == AchievementStatus.APPROVED)
+            .group_by(Achievement.user_id)
+        )
+
+    async def rebuild(self) -> int:
+        totals = self._actual_totals_stmt().subquery()
+
+        await self.db.execute(delete(self.model))
+        result = await self.db.execute(
+            insert(self.model).from_select(
+                ["user_id", "total_points", "approved_count", "updated_at"],
+                select(totals.c.user_id, totals.c.total_points, totals.c.approved_count, func.now())
+            )
+        )
+        return result.rowcount or 0
+
+    async def find_drift(self) -> list:
+        totals = self._actual_totals_stmt().subquery()
+
+        # FULL OUTER JOIN: расхождения с обеих сторон (нет строки в user_scores / лишняя строка)
+        stored_points = func.coalesce(self.model.total_points, 0)
+        stored_count = func.coalesce(self.model.approved_count, 0)
+        actual_points = func.coalesce(totals.c.total_points, 0)
+        actual_count = func.coalesce(totals.c.approved_count, 0)
+
+        stmt = (
+            select(
+                func.coalesce(self.model.user_id, totals.c.user_id).label("user_id"),
+                stored_points.label("stored_points"),
+                actual_points.label("actual_points"),
+                stored_count.label("stored_count"),
+                actual_count.label("actual_count")
+            )
+            .select_from(self.model.__table__.join(totals, self.model.user_id == totals.c.user_id, full=True))
+            .filter((stored_points != actual_points) | (stored_count != actual_count))
+            .order_by("user_id")
+        )
+        return (await self.db.execute(stmt)).all()
@@ -1,17 +1,24 @@
 from fastapi import APIRouter, Request, Depends, Form, UploadFile, Query, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, case
+from sqlalchemy import select, func, case
 import math
-import os
 
 from app.security.csrf import validate_csrf
-from app.routers.admin.admin import guard_router, templates, get_db
+from app.routers.admin.admin import guard_router, templates, get_db, get_leaderboard
 from app.models.achievement import Achievement
 from app.models.user import Users
 from app.models.enums import AchievementStatus, AchievementCategory, AchievementLevel, UserRole
 from app.services.admin.achievement_service import AchievementService
 from app.repositories.admin.achievement_repository import AchievementRepository
+from app.repositories.admin.user_score_repository import UserScoreRepository
+from app.repositories.admin.achievement_stats_repository import AchievementStatsRepository
+from app.services.leaderboard_service import LeaderboardService
+from app.services.dashboard_cache import invalidate_dashboard
+from app.services.pending_counters import adjust_pending, is_pending
+from app.services.autocomplete_service import AutocompleteService, get_autocomplete
+from app.services.points_calculator import moderation_priority
+from app.services.preview_service import schedule_preview
 
 router = guard_router
 
@@ -22,15 +29,15 @@ def get_service(db: AsyncSession = Depends(get_db)):
 
 @router.get('/api/my-achievements/search', response_class=JSONResponse)
 async def api_my_achievements_search(request: Request, q: str = Query(..., min_length=1),
-                                     db: AsyncSession = Depends(get_db)):
+                                     db: AsyncSession = Depends(get_db),
+                                     autocomplete: AutocompleteService = Depends(get_autocomplete)):
     user_id = request.session.get('auth_id')
-    stmt = select(Achievement).filter(
-        Achievement.user_id == user_id,
-        or_(Achievement.title.ilike(f"%{q}%"), Achievement.description.ilike(f"%{q}%"))
-    ).limit(5)
 
-    result = await db.execute(stmt)
-    return [{"value": d.title, "text": d.title} for d in result.scalars().all()]
+    async def load(db: AsyncSession, limit: int):
+        documents = await AchievementRepository(db).search(q, user_id=user_id, limit=limit)
+        return [{"value": d.title, "text": d.title} for d in documents]
+
+    return await autocomplete.lookup(f"my:{user_id}", q, load, limit=5)
 
 
 @router.get('/achievements', response_class=HTMLResponse, name='admin.achievements.index')
@@ -53,7 +60,7 @@ async def index(
     stmt = select(Achievement).filter(Achievement.user_id == user_id)
 
     if query:
-        stmt = stmt.filter(or_(Achievement.title.ilike(f"%{query}%"), Achievement.description.ilike(f"%{query}%")))
+        stmt = stmt.filter(AchievementRepository(db).search_clause(query)[0])
     if status and status != 'all':
         stmt = stmt.filter(Achievement.status == status)
     if category and category != 'all':
@@ -117,16 +124,25 @@ async def store(
 ):
     user_id = request.session.get('auth_id')
     try:
-        file_path = await service.save_file(file)
-        await service.create({
-            "user_id": user_id,
-            "title": title,
-            "description": description,
-            "file_path": file_path,
-            "category": category,
-            "level": level,
-            "status": AchievementStatus.PENDING
-        })
+        staging, file_path, content_hash = await service.stage_file(file)
+        try:
+            await service.ensure_new_file(user_id, content_hash)
+            await service.create({
+                "user_id": user_id,
+                "title": title,
+                "description": description,
+                "file_path": file_path,
+                "content_hash": content_hash,
+                "category": category,
+                "level": level,
+                "status": AchievementStatus.PENDING
+            }, staging=staging)
+        except Exception:
+            await service.discard_file(staging, file_path, content_hash)
+            raise
+        schedule_preview(file_path)
+        await invalidate_dashboard()
+        await adjust_pending(achievements=1)
         return RedirectResponse(
             url="/sirius.achievements/achievements?toast_msg=Достижение отправлено на проверку&toast_type=success",
             status_code=302)
@@ -155,20 +171,33 @@ async def revise(
             status_code=302)
 
     try:
-        new_file_path = await service.save_file(file)
-
-        old_file_full_path = os.path.join(service.upload_dir, achievement.file_path)
-        if os.path.exists(old_file_full_path):
-            try:
-                os.remove(old_file_full_path)
-            except OSError:
-                pass
-
-        await service.repo.update(id, {
-            "file_path": new_file_path,
-            "status": AchievementStatus.PENDING,
-            "rejection_reason": None
-        })
+        staging, new_file_path, content_hash = await service.stage_file(file)
+        previous_file = (achievement.file_path, achievement.content_hash)
+        revision_count = (achievement.revision_count or 0) + 1
+        try:
+            if content_hash == achievement.content_hash:
+                raise ValueError("загружен тот же файл, что был отправлен на доработку")
+
+            await AchievementStatsRepository(service.repo.db).record_transition(
+                achievement, achievement.status, AchievementStatus.PENDING
+            )
+            await service.publish_file(staging, new_file_path, content_hash)
+            await service.repo.update(id, {
+                "file_path": new_file_path,
+                "content_hash": content_hash,
+                "status": AchievementStatus.PENDING,
+                "rejection_reason": None,
+                "revision_count": revision_count,
+                "priority": moderation_priority(achievement.projected_points, revision_count, achievement.created_at)
+            })
+        except Exception:
+            await service.discard_file(staging, new_file_path, content_hash)
+            raise
+        # Старый файл удаляется после того, как строка ссылается на новый
+        await service.release_files([previous_file])
+        schedule_preview(new_file_path)
+        await invalidate_dashboard()
+        await adjust_pending(achievements=1)
 
         return RedirectResponse(
             url="/sirius.achievements/achievements?toast_msg=Исправленный документ отправлен на модерацию&toast_type=success",
@@ -182,7 +211,8 @@ async def revise(
 
 
 @router.post('/achievements/{id}/delete', name='admin.achievements.delete', dependencies=[Depends(validate_csrf)])
-async def delete(id: int, request: Request, service: AchievementService = Depends(get_service)):
+async def delete(id: int, request: Request, service: AchievementService = Depends(get_service),
+                 board: LeaderboardService = Depends(get_leaderboard)):
     user_id = request.session.get('auth_id')
     user_role = request.session.get('auth_role')
 
@@ -203,7 +233,17 @@ async def delete(id: int, request: Request, service: AchievementService = Depend
             status_code=302
         )
 
+    await UserScoreRepository(service.repo.db).apply_transition(
+        achievement.user_id, achievement.status, achievement.points, None, 0
+    )
+    was_pending = is_pending(achievement.status)
+    await AchievementStatsRepository(service.repo.db).record_deleted(achievement)
     await service.repo.delete(id)
+    await service.release_files([(achievement.file_path, achievement.content_hash)])
+    await board.sync_user(achievement.user_id)
+    await invalidate_dashboard()
+    if was_pending:
+        await adjust_pending(achievements=-1)
 
     return RedirectResponse(
         url="/sirius.achievements/achievements?toast_msg=Достижение удалено&toast_type=success",
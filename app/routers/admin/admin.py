@@ -1,8 +1,13 @@
 from fastapi import APIRouter, Request, Depends
 from fastapi.templating import Jinja2Templates
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.infrastructure.database import async_session_maker
+from app.infrastructure.redis_client import get_redis
 from datetime import timedelta
 from app.security.csrf import validate_csrf
+from app.infrastructure.storage import media_url
+from app.services.preview_service import can_preview, preview_key
+from app.services.leaderboard_service import LeaderboardService
 
 templates = Jinja2Templates(directory="templates/admin")
 
@@ -13,11 +18,23 @@ def msk_format(value):
     return msk_time.strftime("%d.%m.%Y %H:%M")
 
 templates.env.filters["msk"] = msk_format
+templates.env.filters["media_url"] = media_url
+
+
+def preview_url(file_path):
+    # Превью может быть ещё не готово: шаблоны откатываются на оригинал через onerror
+    return media_url(preview_key(file_path)) if can_preview(file_path) else ""
+
+templates.env.filters["preview_url"] = preview_url
 
 async def get_db():
     async with async_session_maker() as session:
         yield session
 
+
+async def get_leaderboard(db: AsyncSession = Depends(get_db)):
+    return LeaderboardService(db, await get_redis())
+
 guard_router = APIRouter(prefix="/sirius.achievements", tags=["Admin Protected"])
 
 public_router = APIRouter(prefix="/sirius.achievements", tags=["Admin Public"])
@@ -6,6 +6,7 @@ import time
 from app.routers.admin.deps import get_current_user
 from app.security.csrf import validate_csrf
 from app.services.auth_service import AuthService, UserBlockedException
+from app.services.pending_counters import adjust_pending
 from app.routers.admin.admin import templates, get_db
 from app.repositories.admin.user_repository import UserRepository
 from app.repositories.admin.user_token_repository import UserTokenRepository
@@ -118,6 +119,7 @@ async def register(
         )
 
         user = await service.register_user(user_data)
+        await adjust_pending(users=1)
 
         request.session['auth_id'] = user.id
         request.session['auth_name'] = f"{user.first_name} {user.last_name}"
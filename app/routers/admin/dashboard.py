@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Request, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, Request, Depends, HTTPException
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc, literal_column
 from sqlalchemy.orm import selectinload
@@ -8,14 +8,43 @@ import json
 
 from app.security.csrf import validate_csrf
 from app.routers.admin.admin import guard_router, templates, get_db
+from app.infrastructure.database.parallel import run_parallel
+from app.infrastructure.redis_client import get_redis
+from app.services.dashboard_cache import DashboardCache
+from app.services.autocomplete_service import AutocompleteService
+from app.services.leaderboard_service import LeaderboardService
 from app.models.user import Users
 from app.models.achievement import Achievement
-from app.models.enums import AchievementStatus, UserRole, UserStatus
+from app.repositories.admin.user_score_repository import UserScoreRepository
+from app.repositories.admin.ranking_repository import RankingRepository
+from app.repositories.admin.achievement_stats_repository import AchievementStatsRepository
+from app.models.enums import AchievementStatus, UserRole, UserStatus, EducationLevel
 from app.routers.admin.deps import get_current_user
 
 router = guard_router
 
 
+def user_to_dict(user: Users) -> dict:
+    return {
+        "id": user.id,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "education_level": user.education_level.value if user.education_level else None
+    }
+
+
+def achievement_to_dict(achievement: Achievement) -> dict:
+    return {
+        "id": achievement.id,
+        "title": achievement.title,
+        "category": achievement.category.value if achievement.category else None,
+        "status": achievement.status.value if hasattr(achievement.status, 'value') else achievement.status,
+        "points": achievement.points or 0,
+        "created_at": achievement.created_at,
+        "user": user_to_dict(achievement.user) if 'user' in achievement.__dict__ and achievement.user else None
+    }
+
+
 @router.get('/dashboard', response_class=HTMLResponse, name='admin.dashboard.index')
 async def index(request: Request, period: str = 'all', db: AsyncSession = Depends(get_db)):
     user = await get_current_user(request, db)
@@ -56,105 +85,123 @@ async def index(request: Request, period: str = 'all', db: AsyncSession = Depend
         date_trunc = 'month'
         date_fmt = '%m.%Y'
 
-    stats = {}
+    is_admin = current_role in admin_roles
+    # Админская статистика общая для всех модераторов (запросы не фильтруются по потоку), студенческая — своя
+    scope = 'admin' if is_admin else f"student:{user.id}"
 
-    if current_role in admin_roles:
-        new_users = (await db.execute(
-            select(func.count()).filter(Users.role == UserRole.STUDENT, Users.created_at >= start_date))).scalar()
+    period_key = period if period in ('day', 'week', 'month') else 'all'
 
-        ach_stats = (await db.execute(
-            select(
-                func.count().filter(Achievement.status == AchievementStatus.PENDING,
-                                    Achievement.created_at >= start_date).label('pending'),
-                func.count().filter(Achievement.status == AchievementStatus.APPROVED,
-                                    Achievement.updated_at >= start_date).label('approved'),
-                func.count().filter(Achievement.created_at >= start_date).label('total')
-            )
-        )).first()
-
-        top_students_stmt = (
-            select(Users, func.sum(Achievement.points).label('points'))
-            .join(Achievement, Users.id == Achievement.user_id)
-            .filter(
-                Achievement.status == AchievementStatus.APPROVED,
-                Achievement.updated_at >= start_date
-            )
-            .group_by(Users.id)
-            .order_by(desc('points'))
-            .limit(5)
-        )
-        top_students = (await db.execute(top_students_stmt)).all()
-
-        recent_docs_stmt = (
-            select(Achievement)
-            .options(selectinload(Achievement.user))
-            .join(Users)
-            .filter(Achievement.created_at >= start_date)
-            .order_by(Achievement.created_at.desc())
-            .limit(5)
-        )
-        recent_docs = (await db.execute(recent_docs_stmt)).scalars().all()
-
-        chart_query = (
-            select(
-                func.date_trunc(date_trunc, Achievement.created_at).label('d_date'),
-                func.count().label('cnt')
+    cache = DashboardCache(await get_redis())
+    stats = await cache.get(scope, period_key)
+
+    if stats is None:
+        if is_admin:
+            new_users_stmt = select(func.count()).filter(Users.role == UserRole.STUDENT, Users.created_at >= start_date)
+
+            top_students_stmt = (
+                select(Users, func.sum(Achievement.points).label('points'))
+                .join(Achievement, Users.id == Achievement.user_id)
+                .filter(
+                    Achievement.status == AchievementStatus.APPROVED,
+                    Achievement.updated_at >= start_date
+                )
+                .group_by(Users.id)
+                .order_by(desc('points'))
+                .limit(5)
             )
-            .filter(Achievement.created_at >= start_date)
-            .group_by(literal_column('d_date'))
-            .order_by(literal_column('d_date'))
-        )
-        chart_res = (await db.execute(chart_query)).all()
-
-        c_labels = [row.d_date.strftime(date_fmt) for row in chart_res] if chart_res else []
-        c_data = [row.cnt for row in chart_res] if chart_res else []
-
-        cohorts_stmt = (
-            select(
-                Users.education_level,
-                func.count(Achievement.id).label('total_docs'),
-                func.count(Achievement.id).filter(Achievement.status == AchievementStatus.PENDING).label('pending_docs')
+
+            recent_docs_stmt = (
+                select(Achievement)
+                .options(selectinload(Achievement.user))
+                .join(Users)
+                .filter(Achievement.created_at >= start_date)
+                .order_by(Achievement.created_at.desc())
+                .limit(5)
             )
-            .join(Achievement, Users.id == Achievement.user_id)
-            .filter(Achievement.created_at >= start_date, Users.education_level.isnot(None))
-            .group_by(Users.education_level)
-            .order_by(desc('total_docs'))
-        )
-        cohorts_data = (await db.execute(cohorts_stmt)).all()
-
-        processed_cohorts = []
-        for c in cohorts_data:
-            ed_level_val = c.education_level.value if hasattr(c.education_level, 'value') else c.education_level
-            processed_cohorts.append({
-                "name": ed_level_val,
-                "total": c.total_docs,
-                "pending": c.pending_docs
-            })
-
-        stats = {
-            'new_users': new_users,
-            'pending_docs': ach_stats.pending,
-            'approved_docs': ach_stats.approved,
-            'total_docs': ach_stats.total,
-            'top_students': top_students,
-            'recent_docs': recent_docs,
-            'chart_labels': json.dumps(c_labels),
-            'chart_data': json.dumps(c_data),
-            'cohorts': processed_cohorts
-        }
-
-    else:
-        my_points = (await db.execute(
-            select(func.coalesce(func.sum(Achievement.points), 0))
-            .filter(
-                Achievement.user_id == user.id,
-                Achievement.status == AchievementStatus.APPROVED,
-                Achievement.updated_at >= start_date
+
+            if period == 'day':
+                # Почасовой график за сутки строится по сырым данным: суточный агрегат его не покрывает
+                chart_query = (
+                    select(
+                        func.date_trunc(date_trunc, Achievement.created_at).label('d_date'),
+                        func.count().label('cnt')
+                    )
+                    .filter(Achievement.created_at >= start_date)
+                    .group_by(literal_column('d_date'))
+                    .order_by(literal_column('d_date'))
+                )
+
+                async def load_chart(session):
+                    return [(row.d_date, row.cnt) for row in (await session.execute(chart_query)).all()]
+            else:
+                async def load_chart(session):
+                    return await AchievementStatsRepository(session).daily_created(start_date.date())
+
+            # Запросы независимы: каждый идёт в своей сессии, время ответа — самый долгий, а не сумма
+            new_users, ach_stats, top_students, recent_docs, chart_res, cohorts_data = await run_parallel(
+                lambda session: session.scalar(new_users_stmt),
+                lambda session: AchievementStatsRepository(session).totals(start_date.date()),
+                lambda session: session.execute(top_students_stmt),
+                lambda session: session.scalars(recent_docs_stmt),
+                load_chart,
+                lambda session: AchievementStatsRepository(session).cohorts(start_date.date())
             )
-        )).scalar()
+            top_students = top_students.all()
+            recent_docs = recent_docs.all()
+
+            chart_points = {}
+            for d_date, cnt in chart_res:
+                label = d_date.strftime(date_fmt)
+                chart_points[label] = chart_points.get(label, 0) + cnt
+            c_labels = list(chart_points.keys())
+            c_data = list(chart_points.values())
+
+            processed_cohorts = []
+            for c in cohorts_data:
+                ed_level_val = EducationLevel[c.education_level].value if c.education_level in EducationLevel.__members__ \
+                    else c.education_level
+                processed_cohorts.append({
+                    "name": ed_level_val,
+                    "total": c.total_docs,
+                    "pending": c.pending_docs
+                })
+
+            stats = {
+                'new_users': new_users,
+                'pending_docs': ach_stats.pending,
+                'approved_docs': ach_stats.approved,
+                'total_docs': ach_stats.total,
+                'top_students': [[user_to_dict(u), int(points or 0)] for u, points in top_students],
+                'recent_docs': [achievement_to_dict(doc) for doc in recent_docs],
+                'chart_labels': json.dumps(c_labels),
+                'chart_data': json.dumps(c_data),
+                'cohorts': processed_cohorts
+            }
+
+        else:
+            if period == 'all':
+                # За всё время баллы берутся из user_scores, без агрегации по achievements
+                async def load_points(session):
+                    my_score = await UserScoreRepository(session).find(user.id)
+                    return my_score.total_points if my_score else 0
 
-        doc_stats = (await db.execute(
-            select(
+                async def load_rank(session):
+                    return await LeaderboardService(session, await get_redis()).rank(user.id)
+            else:
+                async def load_points(session):
+                    return await session.scalar(
+                        select(func.coalesce(func.sum(Achievement.points), 0))
+                        .filter(
+                            Achievement.user_id == user.id,
+                            Achievement.status == AchievementStatus.APPROVED,
+                            Achievement.updated_at >= start_date
+                        )
+                    )
+
+                async def load_rank(session):
+                    return await RankingRepository(session).period_rank(user.id, start_date)
+
+            doc_stats_stmt = select(
                 func.count().filter(Achievement.user_id == user.id, Achievement.created_at >= start_date).label(
                     'total'),
                 func.count().filter(Achievement.user_id == user.id, Achievement.status == AchievementStatus.PENDING,
@@ -164,60 +211,76 @@ async def index(request: Request, period: str = 'all', db: AsyncSession = Depend
                 func.count().filter(Achievement.user_id == user.id, Achievement.status == AchievementStatus.REJECTED,
                                     Achievement.updated_at >= start_date).label('rejected')
             )
-        )).first()
 
-        subquery_points = (
-            select(Achievement.user_id, func.sum(Achievement.points).label('total_points'))
-            .filter(
-                Achievement.status == AchievementStatus.APPROVED,
-                Achievement.updated_at >= start_date
+            recent_docs_stmt = (
+                select(Achievement)
+                .filter(Achievement.user_id == user.id, Achievement.created_at >= start_date)
+                .order_by(Achievement.created_at.desc())
+                .limit(5)
             )
-            .group_by(Achievement.user_id)
-            .subquery()
-        )
-
-        if my_points > 0:
-            rank_stmt = select(func.count()).filter(subquery_points.c.total_points > my_points)
-            better_than_me = (await db.execute(rank_stmt)).scalar() or 0
-            my_rank = better_than_me + 1
-        else:
-            my_rank = 0
-
-        recent_docs = (await db.execute(
-            select(Achievement)
-            .filter(Achievement.user_id == user.id, Achievement.created_at >= start_date)
-            .order_by(Achievement.created_at.desc())
-            .limit(5)
-        )).scalars().all()
-
-        cat_stats = (await db.execute(
-            select(Achievement.category, func.sum(Achievement.points))
-            .filter(
-                Achievement.user_id == user.id,
-                Achievement.status == AchievementStatus.APPROVED,
-                Achievement.updated_at >= start_date
+
+            cat_stats_stmt = (
+                select(Achievement.category, func.sum(Achievement.points))
+                .filter(
+                    Achievement.user_id == user.id,
+                    Achievement.status == AchievementStatus.APPROVED,
+                    Achievement.updated_at >= start_date
+                )
+                .group_by(Achievement.category)
             )
-            .group_by(Achievement.category)
-        )).all()
-
-        c_labels = [row[0].value if hasattr(row[0], 'value') else row[0] for row in cat_stats if row[0]]
-        c_data = [row[1] for row in cat_stats if row[0]]
-
-        stats = {
-            'my_points': my_points,
-            'rank': my_rank,
-            'total_docs': doc_stats.total,
-            'pending_docs': doc_stats.pending,
-            'approved_docs': doc_stats.approved,
-            'rejected_docs': doc_stats.rejected,
-            'recent_docs': recent_docs,
-            'chart_labels': json.dumps(c_labels),
-            'chart_data': json.dumps(c_data)
-        }
+
+            my_points, my_rank, doc_stats, recent_docs, cat_stats = await run_parallel(
+                load_points,
+                load_rank,
+                lambda session: session.execute(doc_stats_stmt),
+                lambda session: session.scalars(recent_docs_stmt),
+                lambda session: session.execute(cat_stats_stmt)
+            )
+            doc_stats = doc_stats.first()
+            recent_docs = recent_docs.all()
+            cat_stats = cat_stats.all()
+
+            if my_points <= 0:
+                my_rank = 0
+
+            c_labels = [row[0].value if hasattr(row[0], 'value') else row[0] for row in cat_stats if row[0]]
+            c_data = [row[1] for row in cat_stats if row[0]]
+
+            stats = {
+                'my_points': my_points,
+                'rank': my_rank,
+                'total_docs': doc_stats.total,
+                'pending_docs': doc_stats.pending,
+                'approved_docs': doc_stats.approved,
+                'rejected_docs': doc_stats.rejected,
+                'recent_docs': [achievement_to_dict(doc) for doc in recent_docs],
+                'chart_labels': json.dumps(c_labels),
+                'chart_data': json.dumps(c_data)
+            }
+
+        await cache.set(scope, period_key, stats)
 
     return templates.TemplateResponse('dashboard/index.html', {
         'request': request,
         'user': user,
         'stats': stats,
         'period': period
-    })
\ No newline at end of file
+    })
+
+
+@router.get('/api/dashboard/cache-stats', name='admin.dashboard.cache_stats')
+async def cache_stats(request: Request, db: AsyncSession = Depends(get_db)):
+    user = await get_current_user(request, db)
+    if not user or user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return JSONResponse(await DashboardCache(await get_redis()).counters())
+
+
+@router.get('/api/autocomplete/stats', name='admin.autocomplete.stats')
+async def autocomplete_stats(request: Request, db: AsyncSession = Depends(get_db)):
+    user = await get_current_user(request, db)
+    if not user or user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return JSONResponse(await AutocompleteService(await get_redis()).counters())
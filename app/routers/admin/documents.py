@@ -1,16 +1,20 @@
-import os
+from datetime import datetime
 from fastapi import APIRouter, Depends, Request, HTTPException, Query
-from fastapi.responses import RedirectResponse, HTMLResponse, FileResponse, JSONResponse
+from fastapi.responses import RedirectResponse, HTMLResponse, JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
-from app.infrastructure.database import get_db
+from app.infrastructure.database import get_db, async_session_maker
 from app.services.admin.achievement_service import AchievementService
 from app.repositories.admin.achievement_repository import AchievementRepository
+from app.services.autocomplete_service import AutocompleteService, get_autocomplete
+from app.infrastructure.storage import get_storage
+from app.infrastructure.file_delivery import file_response
+from app.services.document_export import document_filename, iter_documents, stream_documents_zip
 from app.routers.admin.admin import templates
 from app.routers.admin.deps import get_current_user
 from app.security.csrf import validate_csrf
 from app.models.achievement import Achievement
+from app.models.enums import AchievementLevel, AchievementCategory
 
 router = APIRouter(
     prefix="/sirius.achievements/documents",
@@ -22,27 +26,69 @@ router = APIRouter(
 async def api_documents_search(
         request: Request,
         q: str = Query(..., min_length=1),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_db),
+        autocomplete: AutocompleteService = Depends(get_autocomplete)
 ):
-    user = await get_current_user(request, db)
-    if not user:
+    user_id = request.session.get('auth_id')
+    if not user_id:
         raise HTTPException(status_code=401, detail="Не авторизован")
 
-    allowed_roles = ['admin', 'moderator', 'super_admin', 'ADMIN', 'MODERATOR', 'SUPER_ADMIN']
-    user_role_str = str(user.role.value) if hasattr(user.role, 'value') else str(user.role)
-
-    if user_role_str not in allowed_roles:
+    if not await autocomplete.is_staff(db, user_id):
         raise HTTPException(status_code=403, detail="Недостаточно прав")
 
-    stmt = select(Achievement).filter(
-        or_(
-            Achievement.title.ilike(f"%{q}%"),
-            Achievement.description.ilike(f"%{q}%")
-        )
-    ).limit(5)
+    async def load(db: AsyncSession, limit: int):
+        documents = await AchievementRepository(db).search(q, limit=limit)
+        return [{"value": d.title, "text": d.title} for d in documents]
+
+    return await autocomplete.lookup("documents", q, load, limit=5)
+
+
+DOCUMENTS_PAGE_SIZE = 25
+ALLOWED_ROLES = ['admin', 'moderator', 'super_admin', 'ADMIN', 'MODERATOR', 'SUPER_ADMIN']
+
+
+def format_document_cursor(item: Achievement, sort_by: str, offset: int = 0) -> str:
+    # Курсор — значения ключа сортировки последней строки; для релевантности — смещение
+    if sort_by == "relevance":
+        return str(offset)
+    parts = {"level": [item.level.name], "category": [item.category.name]}.get(sort_by, [])
+    return "~".join(parts + [item.created_at.isoformat(), str(item.id)])
+
+
+def parse_document_cursor(value: str, sort_by: str):
+    try:
+        if sort_by == "relevance":
+            return max(int(value), 0)
+        parts = value.split("~")
+        keys = []
+        if sort_by == "level":
+            keys.append(AchievementLevel[parts.pop(0)])
+        elif sort_by == "category":
+            keys.append(AchievementCategory[parts.pop(0)])
+        created_at, achievement_id = parts
+        return tuple(keys + [datetime.fromisoformat(created_at), int(achievement_id)])
+    except (AttributeError, KeyError, IndexError, ValueError):
+        return None
+
 
-    result = await db.execute(stmt)
-    return [{"value": d.title, "text": d.title} for d in result.scalars().all()]
+async def load_documents_page(db: AsyncSession, filters: dict, sort_by: str, after: str = None):
+    # Без поиска «по релевантности» означает «новые», как и в AchievementRepository
+    if sort_by == "relevance" and not filters["search"]:
+        sort_by = "newest"
+    cursor = parse_document_cursor(after, sort_by) if after else None
+    offset = (cursor or 0) if sort_by == "relevance" else 0
+
+    achievements = await AchievementRepository(db).get_all_with_filters(
+        **filters,
+        sort_by=sort_by,
+        after=None if sort_by == "relevance" else cursor,
+        offset=offset,
+        limit=DOCUMENTS_PAGE_SIZE
+    )
+    next_cursor = None
+    if len(achievements) == DOCUMENTS_PAGE_SIZE:
+        next_cursor = format_document_cursor(achievements[-1], sort_by, offset + DOCUMENTS_PAGE_SIZE)
+    return achievements, next_cursor
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -60,30 +106,27 @@ async def index(
     if not user:
         return RedirectResponse(url="/")
 
-    allowed_roles = [
-        'admin', 'moderator', 'super_admin',
-        'ADMIN', 'MODERATOR', 'SUPER_ADMIN'
-    ]
-
     user_role_str = str(user.role.value) if hasattr(user.role, 'value') else str(user.role)
 
-    if user_role_str not in allowed_roles:
+    if user_role_str not in ALLOWED_ROLES:
         return RedirectResponse(url="/sirius.achievements/dashboard")
 
     repo = AchievementRepository(db)
+    filters = {"search": query, "status": status, "category": category, "level": level}
 
-    achievements = await repo.get_all_with_filters(
-        search=query,
-        status=status,
-        category=category,
-        level=level,
-        sort_by=sort_by
-    )
+    achievements, next_cursor = await load_documents_page(db, filters, sort_by)
+    # Приблизительный итог: агрегат или оценка планировщика вместо COUNT(*) по всему реестру
+    total_estimate = await repo.estimate_with_filters(**filters)
 
     return templates.TemplateResponse("documents/index.html", {
         "request": request,
         "user": user,
         "achievements": achievements,
+        "total_estimate": max(total_estimate, len(achievements)),
+        "next_url": _page_url(request, filters, sort_by, next_cursor),
+        "export_url": str(request.url_for("admin.documents.export").include_query_params(
+            query=query, status=status, category=category, level=level, sort_by=sort_by
+        )),
         "query": query,
         "status": status,
         "category": category,
@@ -95,6 +138,85 @@ async def index(
     })
 
 
+def _page_url(request: Request, filters: dict, sort_by: str, cursor: str = None):
+    if not cursor:
+        return None
+    return str(request.url_for("admin.documents.page").include_query_params(
+        query=filters["search"], status=filters["status"], category=filters["category"], level=filters["level"],
+        sort_by=sort_by, after=cursor
+    ))
+
+
+@router.get("/api/documents", response_class=JSONResponse, name="admin.documents.page")
+async def api_documents_page(
+        request: Request,
+        query: str = "",
+        status: str = "",
+        category: str = "",
+        level: str = "",
+        sort_by: str = "newest",
+        after: str = Query(None),
+        db: AsyncSession = Depends(get_db)
+):
+    user = await get_current_user(request, db)
+    if not user:
+        raise HTTPException(status_code=401, detail="Не авторизован")
+
+    user_role_str = str(user.role.value) if hasattr(user.role, 'value') else str(user.role)
+    if user_role_str not in ALLOWED_ROLES:
+        raise HTTPException(status_code=403, detail="Недостаточно прав")
+
+    filters = {"search": query, "status": status, "category": category, "level": level}
+    achievements, next_cursor = await load_documents_page(db, filters, sort_by, after)
+
+    rows = templates.get_template("documents/_rows.html").render(achievements=achievements, request=request)
+    return {
+        "items": [{
+            "id": item.id,
+            "title": item.title,
+            "category": item.category.name,
+            "level": item.level.name,
+            "status": item.status.name,
+            "user_id": item.user_id,
+            "created_at": item.created_at.isoformat()
+        } for item in achievements],
+        "html": rows,
+        "next_url": _page_url(request, filters, sort_by, next_cursor)
+    }
+
+
+@router.get("/export", name="admin.documents.export")
+async def export_documents(
+        request: Request,
+        query: str = "",
+        status: str = "",
+        category: str = "",
+        level: str = "",
+        sort_by: str = "newest",
+        manifest: bool = True,
+        db: AsyncSession = Depends(get_db)
+):
+    user = await get_current_user(request, db)
+    if not user:
+        raise HTTPException(status_code=401, detail="Не авторизован")
+
+    user_role_str = str(user.role.value) if hasattr(user.role, 'value') else str(user.role)
+    if user_role_str not in ALLOWED_ROLES:
+        raise HTTPException(status_code=403, detail="Недостаточно прав для скачивания")
+
+    # Сессия из get_db закрывается до начала тела ответа, поэтому пачки документов
+    # читаются через собственные короткие сессии
+    filters = {"search": query, "status": status, "category": category, "level": level}
+    archive = stream_documents_zip(
+        iter_documents(async_session_maker, filters, sort_by), get_storage(), manifest=manifest
+    )
+    filename = f"documents_{datetime.now():%Y%m%d_%H%M}.zip"
+    return StreamingResponse(archive, media_type="application/zip", headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "no-store"
+    })
+
+
 @router.post("/{id}/delete")
 async def delete(
         id: int,
@@ -135,12 +257,7 @@ async def download_document(
         raise HTTPException(status_code=401, detail="Не авторизован")
 
     user_role_str = str(user.role.value) if hasattr(user.role, 'value') else str(user.role)
-
-    allowed_roles = [
-        'admin', 'moderator', 'super_admin',
-        'ADMIN', 'MODERATOR', 'SUPER_ADMIN'
-    ]
-    if user_role_str not in allowed_roles:
+    if user_role_str not in ALLOWED_ROLES:
         raise HTTPException(status_code=403, detail="Недостаточно прав для скачивания")
 
     repo = AchievementRepository(db)
@@ -149,16 +266,18 @@ async def download_document(
     if not document or not document.file_path:
         raise HTTPException(status_code=404, detail="Документ не найден")
 
-    file_full_path = os.path.join("static", document.file_path)
+    filename = document_filename(document)
 
-    if not os.path.exists(file_full_path):
-        raise HTTPException(status_code=404, detail="Файл физически отсутствует на сервере")
-
-    ext = os.path.splitext(file_full_path)[1]
-    filename = f"document_{id}_user_{document.user_id}{ext}"
+    # Из объектного хранилища файл отдаётся по подписанной ссылке, минуя воркер
+    storage = get_storage()
+    url = await storage.download_url(document.file_path, filename)
+    if url:
+        return RedirectResponse(url=url, status_code=302)
 
-    return FileResponse(
-        path=file_full_path,
-        filename=filename,
-        media_type='application/octet-stream'
-    )
\ No newline at end of file
+    # Локальный файл: за nginx воркер отвечает только заголовком X-Accel-Redirect,
+    # без прокси — FileResponse с Range, ETag и 304
+    response = await file_response(request, storage, document.file_path, filename=filename,
+                                   media_type='application/octet-stream')
+    if response is None:
+        raise HTTPException(status_code=404, detail="Файл физически отсутствует на сервере")
+    return response
@@ -1,26 +1,38 @@
-from fastapi import APIRouter, Request, Depends, Query, Form
-from fastapi.responses import HTMLResponse, RedirectResponse, Response
+from fastapi import APIRouter, Request, Depends, Query, Form, HTTPException
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse, JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, update
+from sqlalchemy import func
 import csv
 import io
 
 from app.security.csrf import validate_csrf
-from app.routers.admin.admin import guard_router, templates, get_db
+from app.routers.admin.admin import guard_router, templates, get_db, get_leaderboard
+from app.infrastructure.database import async_session_maker
 from app.models.user import Users
-from app.models.achievement import Achievement
-from app.models.season_result import SeasonResult
-from app.models.enums import UserRole, UserStatus, AchievementStatus, EducationLevel
+from app.models.season_job import SeasonJob
+from app.models.user_score import UserScore
+from app.repositories.admin.user_score_repository import UserScoreRepository
+from app.repositories.admin.season_job_repository import SeasonJobRepository
+from app.services.leaderboard_service import LeaderboardService
+from app.services.season_service import start_season_job
+from app.models.enums import UserRole, EducationLevel, SeasonJobStatus
 
 router = guard_router
 
+PODIUM_SIZE = 3
+PER_PAGE = 50
+AROUND_RADIUS = 3
+EXPORT_CHUNK_SIZE = 1000
+
 
 @router.get('/leaderboard', response_class=HTMLResponse, name='admin.leaderboard.index')
 async def index(
         request: Request,
         education_level: str = Query(None),
         course: int = Query(None),
-        db: AsyncSession = Depends(get_db)
+        page: int = Query(1, ge=1),
+        db: AsyncSession = Depends(get_db),
+        board: LeaderboardService = Depends(get_leaderboard)
 ):
     user_id = request.session.get('auth_id')
     user = await db.get(Users, user_id)
@@ -35,37 +47,43 @@ async def index(
         if course is None:
             course = 0
 
-    stmt = (
-        select(
-            Users,
-            func.coalesce(func.sum(Achievement.points), 0).label("total_points"),
-            func.count(Achievement.id).label("achievements_count")
-        )
-        .outerjoin(Achievement, (Users.id == Achievement.user_id) & (Achievement.status == AchievementStatus.APPROVED))
-        .filter(Users.role == UserRole.STUDENT, Users.status == UserStatus.ACTIVE)
-    )
-
-    if education_level != 'all':
-        stmt = stmt.filter(Users.education_level == education_level)
-    if course != 0:
-        stmt = stmt.filter(Users.course == course)
-
-    stmt = stmt.group_by(Users.id).order_by(desc("total_points"), desc("achievements_count"))
-
-    result = await db.execute(stmt)
-    leaderboard = result.all()
-
-    my_rank = 0
-    my_points = 0
-    for idx, (u, pts, cnt) in enumerate(leaderboard, 1):
-        if u.id == user_id:
-            my_rank = idx
-            my_points = pts
-            break
+    # Страницы, места и размер лиги — из одного источника, sorted set рейтинга: O(log n) на запрос
+    podium = await board.with_users(await board.top(PODIUM_SIZE, education_level, course))
+    total_count = await board.size(education_level, course)
+
+    start = PODIUM_SIZE + (page - 1) * PER_PAGE
+    rows = await board.with_users(await board.window(start, start + PER_PAGE - 1, education_level, course))
+    start_position = start + 1
+    ranks = [row[3] for row in rows]
+
+    prev_url = next_url = None
+    if page > 1:
+        prev_params = {'education_level': education_level, 'course': course}
+        if page > 2:
+            prev_params['page'] = page - 1
+        prev_url = request.url_for('admin.leaderboard.index').include_query_params(**prev_params)
+    if start + PER_PAGE < total_count:
+        next_url = request.url_for('admin.leaderboard.index').include_query_params(
+            education_level=education_level, course=course, page=page + 1)
+
+    my_score = await board.score(user_id, education_level, course)
+    my_rank = await board.count_above(*my_score, education_level, course) + 1 if my_score else 0
+    my_points = my_score[0] if my_score else 0
+
+    around_me = []
+    if my_score and user_id not in [row[0].id for row in podium + rows]:
+        around_me = await board.with_users(await board.around(user_id, AROUND_RADIUS, education_level, course))
 
     return templates.TemplateResponse('leaderboard/index.html', {
         'request': request,
-        'leaderboard': leaderboard,
+        'podium': podium,
+        'leaderboard': rows,
+        'start_position': start_position,
+        'ranks': ranks,
+        'total_count': total_count,
+        'prev_url': prev_url,
+        'next_url': next_url,
+        'around_me': around_me,
         'user': user,
         'my_rank': my_rank,
         'my_points': my_points,
@@ -75,38 +93,56 @@ async def index(
     })
 
 
-@router.get('/leaderboard/export', name='admin.leaderboard.export')
-async def export_leaderboard(request: Request, db: AsyncSession = Depends(get_db)):
-    user = await db.get(Users, request.session.get('auth_id'))
-    if user.role not in [UserRole.SUPER_ADMIN, UserRole.MODERATOR]:
-        return RedirectResponse(url='/sirius.achievements/leaderboard')
+async def stream_leaderboard_csv(education_level: str = None, course: int = None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=';')
 
-    stmt = (
-        select(
-            Users,
-            func.coalesce(func.sum(Achievement.points), 0).label("total_points"),
-            func.count(Achievement.id).label("achievements_count")
-        )
-        .outerjoin(Achievement, (Users.id == Achievement.user_id) & (Achievement.status == AchievementStatus.APPROVED))
-        .filter(Users.role == UserRole.STUDENT, Users.status == UserStatus.ACTIVE)
-        .group_by(Users.id)
-        .order_by(desc("total_points"))
-    )
-    result = await db.execute(stmt)
-    leaderboard = result.all()
+    def flush() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return chunk
 
-    output = io.StringIO()
-    writer = csv.writer(output, delimiter=';')
+    buffer.write('\ufeff')
     writer.writerow(['Место', 'Имя', 'Фамилия', 'Email', 'Уровень обучения', 'Курс', 'Сумма баллов', 'Документов'])
+    yield flush()
+
+    # Своя сессия: сессия из get_db закрывается до того, как начнёт отдаваться тело ответа
+    async with async_session_maker() as db:
+        # Место — RANK() по (баллы, документы), как на странице рейтинга
+        points = func.coalesce(UserScore.total_points, 0)
+        count = func.coalesce(UserScore.approved_count, 0)
+        stmt = (
+            UserScoreRepository(db).ordered_stmt(education_level, course)
+            .with_only_columns(
+                func.rank().over(order_by=(points.desc(), count.desc())),
+                Users.first_name, Users.last_name, Users.email, Users.education_level, Users.course, points, count
+            )
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        result = await db.stream(stmt)
+
+        async for partition in result.partitions():
+            for place, first_name, last_name, email, education_level_val, course_val, pts, cnt in partition:
+                ed_val = education_level_val.value if hasattr(education_level_val, 'value') else (education_level_val or '')
+                course_str = f"{course_val} курс" if course_val else ''
+                writer.writerow([place, first_name, last_name, email, ed_val, course_str, int(pts), cnt])
+            yield flush()
 
-    for idx, (u, pts, cnt) in enumerate(leaderboard, 1):
-        ed_val = u.education_level.value if hasattr(u.education_level, 'value') else (u.education_level or '')
-        course_str = f"{u.course} курс" if u.course else ''
-        writer.writerow([idx, u.first_name, u.last_name, u.email, ed_val, course_str, int(pts), cnt])
 
-    output.seek(0)
-    return Response(
-        content='\ufeff' + output.getvalue(),
+@router.get('/leaderboard/export', name='admin.leaderboard.export')
+async def export_leaderboard(
+        request: Request,
+        education_level: str = Query(None),
+        course: int = Query(None),
+        db: AsyncSession = Depends(get_db)
+):
+    user = await db.get(Users, request.session.get('auth_id'))
+    if user.role not in [UserRole.SUPER_ADMIN, UserRole.MODERATOR]:
+        return RedirectResponse(url='/sirius.achievements/leaderboard')
+
+    return StreamingResponse(
+        stream_leaderboard_csv(education_level, course),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=leaderboard_export.csv"}
     )
@@ -122,27 +158,76 @@ async def end_season(
     if user.role != UserRole.SUPER_ADMIN:
         return RedirectResponse(url="/sirius.achievements/leaderboard?toast_msg=Только супер-админ может завершать сезон&toast_type=error", status_code=302)
 
-    stmt = (
-        select(Users.id, func.coalesce(func.sum(Achievement.points), 0).label("total_points"))
-        .join(Achievement, (Users.id == Achievement.user_id) & (Achievement.status == AchievementStatus.APPROVED))
-        .filter(Users.role == UserRole.STUDENT, Users.status == UserStatus.ACTIVE)
-        .group_by(Users.id)
-        .order_by(desc("total_points"))
-    )
-    result = await db.execute(stmt)
-    leaderboard = result.all()
-
-    for idx, (uid, pts) in enumerate(leaderboard, 1):
-        if pts > 0:
-            history = SeasonResult(user_id=uid, season_name=season_name, points=int(pts), rank=idx)
-            db.add(history)
-
-    update_stmt = (
-        update(Achievement)
-        .where(Achievement.status == AchievementStatus.APPROVED)
-        .values(status=AchievementStatus.ARCHIVED)
-    )
-    await db.execute(update_stmt)
-    await db.commit()
+    jobs = SeasonJobRepository(db)
+    job = await jobs.create(season_name, user.id)
+    if not job:
+        active = await jobs.find_active()
+        url = request.url_for('admin.leaderboard.season_job', id=active.id) if active else request.url_for('admin.leaderboard.index')
+        return RedirectResponse(url=url.include_query_params(
+            toast_msg="Сезон уже закрывается другим администратором", toast_type="error"), status_code=302)
+
+    start_season_job(job.id)
+
+    return RedirectResponse(url=request.url_for('admin.leaderboard.season_job', id=job.id).include_query_params(
+        toast_msg="Закрытие сезона запущено", toast_type="success"), status_code=302)
+
+
+def serialize_season_job(job: SeasonJob) -> dict:
+    return {
+        "id": job.id,
+        "season_name": job.season_name,
+        "status": job.status.value if hasattr(job.status, 'value') else job.status,
+        "stage": job.stage,
+        "processed": job.processed,
+        "total": job.total,
+        "error": job.error,
+        "finished_at": job.finished_at.strftime("%H:%M %d.%m.%Y") if job.finished_at else None
+    }
+
+
+@router.get('/leaderboard/season-jobs/{id}', response_class=HTMLResponse, name='admin.leaderboard.season_job')
+async def season_job_page(id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    user = await db.get(Users, request.session.get('auth_id'))
+    if user.role not in [UserRole.SUPER_ADMIN, UserRole.MODERATOR]:
+        return RedirectResponse(url='/sirius.achievements/leaderboard', status_code=302)
+
+    job = await SeasonJobRepository(db).find(id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Season job not found")
+
+    return templates.TemplateResponse('leaderboard/season_job.html', {
+        'request': request,
+        'user': user,
+        'job': serialize_season_job(job)
+    })
+
+
+@router.get('/leaderboard/season-jobs/{id}/status', name='admin.leaderboard.season_job_status')
+async def season_job_status(id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    user = await db.get(Users, request.session.get('auth_id'))
+    if user.role not in [UserRole.SUPER_ADMIN, UserRole.MODERATOR]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    job = await SeasonJobRepository(db).find(id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Season job not found")
+
+    return JSONResponse(serialize_season_job(job))
+
+
+@router.post('/leaderboard/season-jobs/{id}/resume', name='admin.leaderboard.season_job_resume',
+             dependencies=[Depends(validate_csrf)])
+async def resume_season_job(id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    user = await db.get(Users, request.session.get('auth_id'))
+    if user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    jobs = SeasonJobRepository(db)
+    job = await jobs.find(id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Season job not found")
+
+    if job.status == SeasonJobStatus.FAILED and await jobs.claim(job):
+        start_season_job(job.id)
 
-    return RedirectResponse(url="/sirius.achievements/leaderboard?toast_msg=Сезон успешно завершен! Рейтинг обнулен.&toast_type=success", status_code=302)
\ No newline at end of file
+    return RedirectResponse(url=request.url_for('admin.leaderboard.season_job', id=id), status_code=302)
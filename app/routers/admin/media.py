@@ -0,0 +1,34 @@
+import mimetypes
+import posixpath
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import RedirectResponse
+
+from app.infrastructure.file_delivery import MEDIA_CACHE_CONTROL, file_response
+from app.infrastructure.storage import LocalStorage, get_storage
+
+router = APIRouter(
+    prefix="/sirius.achievements/media",
+    tags=["admin.media"]
+)
+
+MEDIA_ROOT = "uploads/"
+
+
+@router.get("/{key:path}", name="admin.media.show")
+async def show_media(key: str, request: Request):
+    # Аватары и превью загрузок: ключ должен оставаться внутри uploads/
+    key = posixpath.normpath(key)
+    if not key.startswith(MEDIA_ROOT) or key.startswith("/"):
+        raise HTTPException(status_code=404, detail="Файл не найден")
+
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        return RedirectResponse(url=storage.url(key), status_code=302)
+
+    media_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+    response = await file_response(
+        request, storage, key, media_type=media_type, cache_control=MEDIA_CACHE_CONTROL
+    )
+    if response is None:
+        raise HTTPException(status_code=404, detail="Файл не найден")
+    return response
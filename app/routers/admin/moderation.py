@@ -1,21 +1,28 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, Form, Query
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
-import math
+from datetime import datetime
 
 from app.security.csrf import validate_csrf
-from app.routers.admin.admin import guard_router, templates, get_db
+from app.routers.admin.admin import guard_router, templates, get_db, get_leaderboard
 from app.repositories.admin.user_repository import UserRepository
 from app.repositories.admin.achievement_repository import AchievementRepository
+from app.repositories.admin.user_score_repository import UserScoreRepository
+from app.repositories.admin.achievement_stats_repository import AchievementStatsRepository
+from app.services.leaderboard_service import LeaderboardService
+from app.services.dashboard_cache import invalidate_dashboard
+from app.services.pending_counters import adjust_pending, is_pending, is_user_pending
+from app.services.moderation_service import BulkModerationService, MODERATION_LEASE, claimed_by_other
 from app.services.admin.user_service import UserService
 from app.services.admin.achievement_service import AchievementService
-from app.services.points_calculator import calculate_points
+from app.services.points_rules_service import load_points_rules
 from app.models.user import Users
 from app.models.achievement import Achievement
 from app.models.notification import Notification
 from app.models.enums import UserStatus, AchievementStatus, UserRole
+from app.schemas.admin.achievements import BulkModerationRequest
 
 router = guard_router
 
@@ -84,7 +91,8 @@ async def approve_user(
         id: int,
         request: Request,
         service: UserService = Depends(get_user_service),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_db),
+        board: LeaderboardService = Depends(get_leaderboard)
 ):
     current_user = await check_moderator(request, db)
     target_user = await db.get(Users, id)
@@ -93,10 +101,15 @@ async def approve_user(
         return RedirectResponse(url=request.url_for('admin.moderation.users').include_query_params(
             toast_msg="У вас нет доступа к этому потоку", toast_type="error"), status_code=302)
 
+    was_pending = is_user_pending(target_user.status)
     await service.repository.update(id, {
         "status": UserStatus.ACTIVE,
         "role": UserRole.STUDENT
     })
+    await board.sync_user(id)
+    await invalidate_dashboard()
+    if was_pending:
+        await adjust_pending(users=-1)
     return RedirectResponse(
         url=request.url_for('admin.moderation.users').include_query_params(toast_msg="Пользователь одобрен",
                                                                            toast_type="success"),
@@ -110,7 +123,8 @@ async def reject_user(
         id: int,
         request: Request,
         service: UserService = Depends(get_user_service),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_db),
+        board: LeaderboardService = Depends(get_leaderboard)
 ):
     current_user = await check_moderator(request, db)
     target_user = await db.get(Users, id)
@@ -119,7 +133,12 @@ async def reject_user(
         return RedirectResponse(url=request.url_for('admin.moderation.users').include_query_params(
             toast_msg="У вас нет доступа к этому потоку", toast_type="error"), status_code=302)
 
+    was_pending = is_user_pending(target_user.status)
     await service.repository.update(id, {"status": UserStatus.REJECTED})
+    await board.sync_user(id)
+    await invalidate_dashboard()
+    if was_pending:
+        await adjust_pending(users=-1)
     return RedirectResponse(
         url=request.url_for('admin.moderation.users').include_query_params(toast_msg="Пользователь отклонен",
                                                                            toast_type="success"),
@@ -127,51 +146,106 @@ async def reject_user(
     )
 
 
-@router.get('/moderation/achievements', response_class=HTMLResponse, name='admin.moderation.achievements')
-async def achievements_list(request: Request, page: int = Query(1, ge=1), db: AsyncSession = Depends(get_db)):
-    user = await check_moderator(request, db)
+QUEUE_SORTS = ("age", "priority")
 
-    limit = 10
-    offset = (page - 1) * limit
 
-    stmt = select(Achievement).join(Users, Achievement.user_id == Users.id).options(selectinload(Achievement.user)) \
-        .filter(Achievement.status == AchievementStatus.PENDING)
+def format_queue_cursor(item: Achievement, sort: str) -> str:
+    if sort == "priority":
+        return f"{item.priority!r}_{item.id}"
+    return f"{item.created_at.isoformat()}_{item.id}"
 
-    if user.role == UserRole.MODERATOR and user.education_level:
-        mod_ed = user.education_level.value if hasattr(user.education_level, 'value') else user.education_level
-        stmt = stmt.filter(Users.education_level == mod_ed)
 
-    stmt = stmt.order_by(Achievement.created_at.asc())
+def parse_queue_cursor(value: str, sort: str = "age"):
+    try:
+        key, achievement_id = value.rsplit("_", 1)
+        key = float(key) if sort == "priority" else datetime.fromisoformat(key)
+        return key, int(achievement_id)
+    except (AttributeError, ValueError):
+        return None
 
-    total_pending = (await db.execute(select(func.count()).select_from(stmt.subquery()))).scalar() or 0
-    achievements = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
 
-    for item in achievements:
-        if item.level and item.category:
-            item.projected_points = calculate_points(item.level.value, item.category.value)
-        else:
-            item.projected_points = 0
+@router.get('/moderation/achievements', response_class=HTMLResponse, name='admin.moderation.achievements')
+async def achievements_list(request: Request, after: str = Query(None), sort: str = Query("age"),
+                            db: AsyncSession = Depends(get_db)):
+    user = await check_moderator(request, db)
+
+    limit = 10
+    sort = sort if sort in QUEUE_SORTS else "age"
+    zone = user.education_level if user.role == UserRole.MODERATOR else None
+
+    cursor = parse_queue_cursor(after, sort) if after else None
+    # Каждый модератор получает свою пачку: строки, выданные другим, пропускаются до истечения аренды
+    repo = AchievementRepository(db)
+    claimed, changed = await repo.claim_batch(user.id, MODERATION_LEASE, zone, cursor, limit, sort)
+    if changed:
+        await db.commit()
+    achievements = await repo.find_many(claimed)
+    has_next = len(achievements) == limit
+    # Тот же файл уже присылали: одним запросом по индексу content_hash для всей пачки
+    duplicates = await repo.duplicates_for(achievements)
+
+    # Приблизительный остаток из суточного агрегата вместо COUNT(*) по очереди на каждой странице
+    total_pending = await AchievementStatsRepository(db).pending_count(zone)
+
+    queue_url = request.url_for('admin.moderation.achievements')
+    next_url = None
+    if has_next:
+        next_url = queue_url.include_query_params(sort=sort, after=format_queue_cursor(achievements[-1], sort))
 
     return templates.TemplateResponse('moderation/achievements.html', {
         'request': request,
         'achievements': achievements,
+        'duplicates': duplicates,
         'total_pending': total_pending,
         'stats': {"pending": total_pending, "approved": 0},
-        'page': page,
-        'total_pages': math.ceil(total_pending / limit) if total_pending > 0 else 1,
+        'next_url': next_url,
+        'lease_minutes': int(MODERATION_LEASE.total_seconds() // 60),
+        'first_url': queue_url.include_query_params(sort=sort) if cursor else None,
+        'sort': sort,
+        'sort_urls': {key: queue_url.include_query_params(sort=key) for key in QUEUE_SORTS},
         'user': user
     })
 
 
+@router.post('/moderation/achievements/bulk', response_class=JSONResponse, name='admin.moderation.achievements.bulk',
+             dependencies=[Depends(validate_csrf)])
+async def bulk_update_achievements(
+        request: Request, payload: BulkModerationRequest,
+        db: AsyncSession = Depends(get_db),
+        board: LeaderboardService = Depends(get_leaderboard)
+):
+    current_user = await check_moderator(request, db)
+
+    results = await BulkModerationService(db).apply(current_user, payload.items)
+    await db.commit()
+
+    applied = [item for item in results if item["ok"]]
+    for user_id in {item["user_id"] for item in applied}:
+        await board.sync_user(user_id)
+    if applied:
+        await invalidate_dashboard()
+        await adjust_pending(achievements=-sum(1 for item in applied if is_pending(item["previous_status"])))
+
+    return JSONResponse({"applied": len(applied), "results": results})
+
+
 @router.post('/moderation/achievements/{id}', name='admin.moderation.achievements.update',
              dependencies=[Depends(validate_csrf)])
 async def update_achievement_status(
         id: int, request: Request, status: str = Form(...), rejection_reason: str = Form(None),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_db),
+        board: LeaderboardService = Depends(get_leaderboard)
 ):
     current_user = await check_moderator(request, db)
 
-    stmt = select(Achievement).options(selectinload(Achievement.user)).where(Achievement.id == id)
+    # Блокировка строки до commit: параллельное решение по тому же документу ждёт и видит новый статус,
+    # иначе оба применили бы разницу к user_scores и суточному агрегату
+    stmt = (
+        select(Achievement)
+        .options(selectinload(Achievement.user))
+        .where(Achievement.id == id)
+        .with_for_update(of=Achievement)
+    )
     achievement = (await db.execute(stmt)).scalars().first()
 
     if not achievement:
@@ -181,7 +255,19 @@ async def update_achievement_status(
         return RedirectResponse(url=request.url_for('admin.moderation.achievements').include_query_params(
             toast_msg="Вы не можете проверять чужой поток", toast_type="error"), status_code=302)
 
+    if claimed_by_other(achievement.claimed_by, achievement.claim_expires_at, current_user.id):
+        return RedirectResponse(url=request.url_for('admin.moderation.achievements').include_query_params(
+            toast_msg="Документ уже проверяет другой модератор", toast_type="error"), status_code=302)
+
+    if achievement.status == status:
+        await db.rollback()
+        return RedirectResponse(url=request.url_for('admin.moderation.achievements').include_query_params(
+            toast_msg="Это решение по документу уже принято", toast_type="error"), status_code=302)
+
+    old_status, old_points = achievement.status, achievement.points
     achievement.status = status
+    achievement.claimed_by = None
+    achievement.claim_expires_at = None
 
     if status == 'rejected' or status == AchievementStatus.REJECTED:
         achievement.rejection_reason = rejection_reason
@@ -194,8 +280,10 @@ async def update_achievement_status(
         notif_message = f"Документ '{achievement.title}' отправлен на доработку. Примечание: {rejection_reason}"
 
     elif status == 'approved' or status == AchievementStatus.APPROVED:
-        points = calculate_points(achievement.level.value, achievement.category.value)
+        rules = await load_points_rules(db)
+        points = rules.points(achievement.level, achievement.category)
         achievement.points = points
+        achievement.rules_version = rules.version
         achievement.rejection_reason = None
         notif_message = f"Документ '{achievement.title}' одобрен! Начислено {points} баллов."
 
@@ -206,7 +294,16 @@ async def update_achievement_status(
         is_read=False
     )
     db.add(notification)
+
+    await UserScoreRepository(db).apply_transition(
+        achievement.user_id, old_status, old_points, achievement.status, achievement.points
+    )
+    await AchievementStatsRepository(db).record_transition(achievement, old_status, achievement.status)
     await db.commit()
+    await board.sync_user(achievement.user_id)
+    await invalidate_dashboard()
+    if is_pending(old_status):
+        await adjust_pending(achievements=-1)
 
     return RedirectResponse(
         url=request.url_for('admin.moderation.achievements').include_query_params(toast_msg="Решение сохранено",
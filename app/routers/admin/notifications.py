@@ -5,13 +5,14 @@ from sqlalchemy import select, func, update
 
 from app.security.csrf import validate_csrf
 from app.routers.admin.admin import guard_router, get_db
+from app.infrastructure.database.parallel import run_parallel
 from app.models.notification import Notification
 
 router = guard_router
 
 
 @router.get('/api/notifications/unread-count')
-async def get_unread_count(request: Request, db: AsyncSession = Depends(get_db)):
+async def get_unread_count(request: Request):
     user_id = request.session.get('auth_id')
     if not user_id:
         return JSONResponse({"count": 0, "notifications": []})
@@ -20,14 +21,17 @@ async def get_unread_count(request: Request, db: AsyncSession = Depends(get_db))
         Notification.user_id == user_id,
         Notification.is_read == False
     )
-    count = (await db.execute(count_stmt)).scalar() or 0
-
     items_stmt = select(Notification) \
         .filter(Notification.user_id == user_id) \
         .order_by(Notification.created_at.desc()) \
         .limit(5)
 
-    items = (await db.execute(items_stmt)).scalars().all()
+    count, items = await run_parallel(
+        lambda session: session.scalar(count_stmt),
+        lambda session: session.scalars(items_stmt)
+    )
+    count = count or 0
+    items = items.all()
 
     data = [{
         "id": n.id,
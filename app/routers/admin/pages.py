@@ -10,6 +10,8 @@ from app.models.user import Users
 from app.models.enums import UserRole, AchievementStatus
 from app.services.admin.achievement_service import AchievementService
 from app.repositories.admin.achievement_repository import AchievementRepository
+from app.repositories.admin.user_repository import UserRepository
+from app.services.autocomplete_service import AutocompleteService, get_autocomplete
 from app.infrastructure.tranaslations import TranslationManager
 from app.security.csrf import validate_csrf
 
@@ -36,23 +38,29 @@ async def check_access(request: Request, db: AsyncSession):
 
 @router.get('/pages/search', response_class=JSONResponse, name='admin.pages.search_api')
 async def search_documents(request: Request, query: str, status: Optional[str] = None,
-                           db: AsyncSession = Depends(get_db)):
-    await check_access(request, db)
+                           db: AsyncSession = Depends(get_db),
+                           autocomplete: AutocompleteService = Depends(get_autocomplete)):
+    if not await autocomplete.is_staff(db, request.session.get('auth_id')):
+        raise HTTPException(status_code=403, detail="Access denied")
 
     if not query: return []
 
-    stmt = select(Achievement).options(selectinload(Achievement.user)).join(Users)
+    async def load(db: AsyncSession, limit: int):
+        stmt = select(Achievement).options(selectinload(Achievement.user)).join(Users)
 
-    stmt = stmt.filter(or_(Achievement.title.ilike(f"%{query}%"), Users.first_name.ilike(f"%{query}%"),
-                           Users.last_name.ilike(f"%{query}%"), Users.email.ilike(f"%{query}%")))
-    if status: stmt = stmt.filter(Achievement.status == status)
-    stmt = stmt.limit(10)
+        condition, rank = AchievementRepository(db).search_clause(query)
+        stmt = stmt.filter(or_(condition, UserRepository(db).search_clause(query)[0]))
+        if status: stmt = stmt.filter(Achievement.status == status)
+        if rank is not None: stmt = stmt.order_by(rank.desc())
+        stmt = stmt.limit(limit)
 
-    result = await db.execute(stmt)
-    documents = result.scalars().all()
+        result = await db.execute(stmt)
+        documents = result.scalars().all()
+
+        return [{"id": doc.user_id, "title": doc.title, "user": f"{doc.user.first_name} {doc.user.last_name}",
+                 "status": doc.status.value} for doc in documents]
 
-    return [{"id": doc.user_id, "title": doc.title, "user": f"{doc.user.first_name} {doc.user.last_name}",
-             "status": doc.status.value} for doc in documents]
+    return await autocomplete.lookup(f"pages:{status or 'all'}", query, load, limit=10)
 
 
 @router.get('/pages', response_class=HTMLResponse, name="admin.pages.index")
@@ -62,8 +70,9 @@ async def index(request: Request, query: Optional[str] = "", status: Optional[st
 
     stmt = select(Achievement).options(selectinload(Achievement.user)).join(Users)
 
-    if query: stmt = stmt.filter(or_(Achievement.title.ilike(f"%{query}%"), Users.first_name.ilike(f"%{query}%"),
-                                     Users.last_name.ilike(f"%{query}%")))
+    search = or_(AchievementRepository(db).search_clause(query)[0],
+                 UserRepository(db).search_clause(query)[0]) if query else None
+    if query: stmt = stmt.filter(search)
     if status: stmt = stmt.filter(Achievement.status == status)
 
     if hasattr(Achievement, sort):
@@ -78,9 +87,7 @@ async def index(request: Request, query: Optional[str] = "", status: Optional[st
     documents = result.scalars().all()
 
     count_stmt = select(func.count()).select_from(Achievement).join(Users)
-    if query: count_stmt = count_stmt.filter(
-        or_(Achievement.title.ilike(f"%{query}%"), Users.first_name.ilike(f"%{query}%"),
-            Users.last_name.ilike(f"%{query}%")))
+    if query: count_stmt = count_stmt.filter(search)
     if status: count_stmt = count_stmt.filter(Achievement.status == status)
 
     res_count = await db.execute(count_stmt)
@@ -6,13 +6,23 @@ import math
 import time
 
 from app.security.csrf import validate_csrf
-from app.routers.admin.admin import guard_router, templates, get_db
+from app.routers.admin.admin import guard_router, templates, get_db, get_leaderboard
+from app.infrastructure.database.parallel import run_parallel
 from app.models.user import Users
 from app.models.achievement import Achievement
 from app.models.season_result import SeasonResult  # <--- Импорт новой таблицы
 from app.models.enums import UserRole, UserStatus, AchievementStatus, EducationLevel
 from app.services.admin.user_service import UserService
+from app.services.admin.achievement_service import AchievementService
+from app.repositories.admin.achievement_repository import AchievementRepository
 from app.repositories.admin.user_repository import UserRepository
+from app.repositories.admin.user_score_repository import UserScoreRepository
+from app.repositories.admin.achievement_stats_repository import AchievementStatsRepository
+from app.services.leaderboard_service import LeaderboardService
+from app.services.dashboard_cache import invalidate_dashboard
+from app.services.pending_counters import adjust_pending, is_pending, is_user_pending
+from app.services.autocomplete_service import AutocompleteService, get_autocomplete, forget_autocomplete_role
+from app.services.upload_service import remove_upload
 from app.routers.admin.deps import get_current_user
 
 router = guard_router
@@ -42,17 +52,16 @@ ROLE_HIERARCHY = {
 
 
 @router.get('/api/users/search', response_class=JSONResponse)
-async def api_users_search(request: Request, q: str = Query(..., min_length=1), db: AsyncSession = Depends(get_db)):
-    await check_admin_rights(request, db)
-    stmt = select(Users).filter(
-        or_(
-            Users.first_name.ilike(f"%{q}%"),
-            Users.last_name.ilike(f"%{q}%"),
-            Users.email.ilike(f"%{q}%")
-        )
-    ).limit(5)
-    users = (await db.execute(stmt)).scalars().all()
-    return [{"value": u.email, "text": f"{u.first_name} {u.last_name} ({u.email})"} for u in users]
+async def api_users_search(request: Request, q: str = Query(..., min_length=1), db: AsyncSession = Depends(get_db),
+                           autocomplete: AutocompleteService = Depends(get_autocomplete)):
+    if not await autocomplete.is_staff(db, request.session.get('auth_id')):
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    async def load(db: AsyncSession, limit: int):
+        users = await UserRepository(db).suggest(q, limit=limit)
+        return [{"value": u.email, "text": f"{u.first_name} {u.last_name} ({u.email})"} for u in users]
+
+    return await autocomplete.lookup("users", q, load, limit=5)
 
 
 @router.get('/users', response_class=HTMLResponse, name='admin.users.index')
@@ -75,8 +84,7 @@ async def index(
     stmt = select(Users)
 
     if query:
-        stmt = stmt.filter(or_(Users.first_name.ilike(f"%{query}%"), Users.last_name.ilike(f"%{query}%"),
-                               Users.email.ilike(f"%{query}%")))
+        stmt = stmt.filter(UserRepository(db).search_clause(query)[0])
     if role and role != 'all':
         stmt = stmt.filter(Users.role == role)
     if status and status != 'all':
@@ -113,7 +121,8 @@ async def index(
 
 
 @router.get('/users/{id}', response_class=HTMLResponse, name='admin.users.show')
-async def show_user(id: int, request: Request, db: AsyncSession = Depends(get_db)):
+async def show_user(id: int, request: Request, db: AsyncSession = Depends(get_db),
+                    board: LeaderboardService = Depends(get_leaderboard)):
     current_user = await check_admin_rights(request, db)
 
     target_user_obj = await db.get(Users, id)
@@ -125,34 +134,29 @@ async def show_user(id: int, request: Request, db: AsyncSession = Depends(get_db
         Achievement.user_id == id,
         Achievement.status != AchievementStatus.ARCHIVED
     ).order_by(Achievement.created_at.desc())
-    achievements = (await db.execute(achievements_stmt)).scalars().all()
 
     # Загрузка истории прошлых сезонов
     history_stmt = select(SeasonResult).filter(SeasonResult.user_id == id).order_by(SeasonResult.created_at.desc())
-    season_history = (await db.execute(history_stmt)).scalars().all()
+
+    queries = [
+        lambda session: session.scalars(achievements_stmt),
+        lambda session: session.scalars(history_stmt)
+    ]
+    is_ranked = target_user_obj.role == UserRole.STUDENT and target_user_obj.status == UserStatus.ACTIVE
+    if is_ranked:
+        queries.append(lambda session: UserScoreRepository(session).find(id))
+
+    results = await run_parallel(*queries)
+    achievements = results[0].all()
+    season_history = results[1].all()
 
     total_docs = len(achievements)
     rank = None
     total_points = 0
 
-    if target_user_obj.role == UserRole.STUDENT and target_user_obj.status == UserStatus.ACTIVE:
-        leaderboard_stmt = (
-            select(
-                Users.id,
-                func.coalesce(func.sum(Achievement.points), 0).label("total_points")
-            )
-            .outerjoin(Achievement,
-                       (Users.id == Achievement.user_id) & (Achievement.status == AchievementStatus.APPROVED))
-            .filter(Users.role == UserRole.STUDENT, Users.status == UserStatus.ACTIVE)
-            .group_by(Users.id)
-            .order_by(desc("total_points"))
-        )
-        results = (await db.execute(leaderboard_stmt)).all()
-        for idx, (uid, pts) in enumerate(results, 1):
-            if uid == id:
-                rank = idx
-                total_points = pts
-                break
+    if is_ranked:
+        rank = await board.rank(id) or None
+        total_points = results[2].total_points if results[2] else 0
 
     return templates.TemplateResponse('users/show.html', {
         'request': request,
@@ -176,7 +180,8 @@ async def update_user_role(
         role: UserRole = Form(...),
         education_level: str = Form(None),
         service: UserService = Depends(get_service),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_db),
+        board: LeaderboardService = Depends(get_leaderboard)
 ):
     current_user = await check_admin_rights(request, db)
 
@@ -212,6 +217,9 @@ async def update_user_role(
         update_data["education_level"] = None
 
     await service.repository.update(id, update_data)
+    await board.sync_user(id)
+    await invalidate_dashboard()
+    await forget_autocomplete_role(id)
 
     return RedirectResponse(
         url=f"/sirius.achievements/users/{id}?toast_msg=Роль и права обновлены&toast_type=success",
@@ -224,7 +232,8 @@ async def delete_user(
         id: int,
         request: Request,
         service: UserService = Depends(get_service),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_db),
+        board: LeaderboardService = Depends(get_leaderboard)
 ):
     current_user = await check_admin_rights(request, db)
 
@@ -245,6 +254,24 @@ async def delete_user(
                 status_code=302
             )
 
+    stats = AchievementStatsRepository(db)
+    pending_achievements = 0
+    files = []
+    for achievement in (await db.execute(select(Achievement).filter(Achievement.user_id == id))).scalars().all():
+        await stats.record_deleted(achievement)
+        pending_achievements += is_pending(achievement.status)
+        files.append((achievement.file_path, achievement.content_hash))
+
+    was_pending = bool(target_user) and is_user_pending(target_user.status)
     await service.repository.delete(id)
+    # Файлы пользователя удаляются одним пакетом после удаления записей; общие с другими
+    # достижениями блобы остаются
+    await AchievementService(AchievementRepository(db)).release_files(files)
+    if target_user:
+        await remove_upload(target_user.avatar_path)
+    await board.sync_user(id)
+    await invalidate_dashboard()
+    await forget_autocomplete_role(id)
+    await adjust_pending(users=-int(was_pending), achievements=-pending_achievements)
     return RedirectResponse(url="/sirius.achievements/users?toast_msg=Пользователь удален&toast_type=success",
                             status_code=302)
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from app.models.enums import AchievementStatus
 
@@ -19,4 +19,13 @@ class AchievementOut(AchievementBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ModerationDecision(BaseModel):
+    id: int
+    status: AchievementStatus
+    reason: Optional[str] = None
+
+
+class BulkModerationRequest(BaseModel):
+    items: List[ModerationDecision] = Field(min_length=1, max_length=500)
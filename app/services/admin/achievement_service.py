@@ -1,9 +1,19 @@
-import os
-import uuid
-import shutil
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Tuple
 from fastapi import UploadFile
 from app.services.admin.base_crud_service import BaseCrudService
 from app.repositories.admin.achievement_repository import AchievementRepository
+from app.repositories.admin.user_score_repository import UserScoreRepository
+from app.repositories.admin.achievement_stats_repository import AchievementStatsRepository
+from app.services.leaderboard_service import LeaderboardService
+from app.services.dashboard_cache import invalidate_dashboard
+from app.services.pending_counters import adjust_pending, is_pending
+from app.services.points_rules_service import load_points_rules
+from app.services.points_calculator import moderation_priority
+from app.services.upload_service import stage_blob, publish_blob, remove_upload
+from app.services.preview_service import preview_key
+from app.infrastructure.redis_client import get_redis
+from app.models.enums import AchievementStatus
 
 MAX_DOC_SIZE = 10 * 1024 * 1024
 
@@ -13,50 +23,54 @@ class AchievementService(BaseCrudService):
         super().__init__(repo)
         self.repo = repo
 
-    async def save_file(self, file: UploadFile) -> str:
-        ALLOWED_SIGNATURES = {
-            "application/pdf": b'\x25\x50\x44\x46',
-            "image/jpeg": b'\xFF\xD8\xFF',
-            "image/png": b'\x89\x50\x4E\x47\x0D\x0A\x1A\x0A'
+    async def create(self, data: dict, staging: Optional[str] = None):
+        # Баллы по действующей версии правил и приоритет в очереди фиксируются при вставке
+        rules = await load_points_rules(self.repo.db)
+        projected_points = rules.points(data.get("level"), data.get("category"))
+        data = {
+            "projected_points": projected_points,
+            "rules_version": rules.version,
+            "priority": moderation_priority(projected_points, data.get("revision_count", 0),
+                                            data.get("created_at") or datetime.now(timezone.utc)),
+            **data
         }
-
-        header = await file.read(8)
-        await file.seek(0)
-
-        is_valid = False
-        detected_ext = ""
-
-        for mime, signature in ALLOWED_SIGNATURES.items():
-            if header.startswith(signature):
-                is_valid = True
-                if mime == "application/pdf":
-                    detected_ext = "pdf"
-                elif mime == "image/png":
-                    detected_ext = "png"
-                else:
-                    detected_ext = "jpg"
-                break
-
-        if not is_valid:
-            raise ValueError("Недопустимый формат файла. Файл не соответствует заявленному типу (проверка подписи).")
-
-        file.file.seek(0, 2)
-        file_size = file.file.tell()
-        file.file.seek(0)
-
-        if file_size > MAX_DOC_SIZE:
-            raise ValueError(f"Файл слишком большой. Лимит: {MAX_DOC_SIZE // (1024 * 1024)} МБ.")
-
-        upload_dir = "static/uploads/achievements"
-        os.makedirs(upload_dir, exist_ok=True)
-
-        unique_name = f"{uuid.uuid4()}.{detected_ext}"
-        file_path = os.path.join(upload_dir, unique_name)
-
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        return f"uploads/achievements/{unique_name}"
+        await AchievementStatsRepository(self.repo.db).record_created(
+            data["user_id"], data.get("category"), data.get("status", AchievementStatus.PENDING)
+        )
+        if staging:
+            await self.publish_file(staging, data["file_path"], data["content_hash"])
+        return await super().create(data)
+
+    async def stage_file(self, file: UploadFile) -> Tuple[str, str, str]:
+        return await stage_blob(file, "uploads/achievements", MAX_DOC_SIZE)
+
+    async def publish_file(self, staging: str, file_path: str, content_hash: str):
+        # Вызывается в транзакции, которая запишет ссылку на блоб: release_files того же хэша ждёт её
+        # commit и видит новую строку, а если успел удалить блоб — файл кладётся заново
+        await self.repo.lock_files([content_hash])
+        await publish_blob(staging, file_path)
+
+    async def discard_file(self, staging: str, file_path: str, content_hash: str):
+        # Загрузка не дошла до строки: временная копия удаляется, блоб — если на него никто не ссылается
+        await self.repo.db.rollback()
+        await remove_upload(staging)
+        await self.release_files([(file_path, content_hash)])
+
+    async def ensure_new_file(self, user_id: int, content_hash: str):
+        # Тот же файл тем же студентом второй раз на проверку не уходит
+        existing = await self.repo.find_by_content_hash(content_hash, user_id, exclude_status=AchievementStatus.REJECTED)
+        if existing:
+            raise ValueError(f"Этот файл уже загружен в достижение «{existing[0].title}».")
+
+    async def release_files(self, files: Iterable[Tuple[Optional[str], Optional[str]]]):
+        # Вызывается после commit удаления или замены строк: блоб удаляется, когда на него не осталось
+        # ссылок. Проверка и удаление идут под блокировкой хэша, см. publish_file
+        files = list(files)
+        await self.repo.lock_files([content_hash for _, content_hash in files])
+        referenced = await self.repo.referenced_files(files)
+        released = [path for path, _ in files if path and path not in referenced]
+        await remove_upload(*released, *[preview_key(path) for path in released])
+        await self.repo.db.commit()
 
     async def delete(self, id: int, user_id: int, user_role: str):
         item = await self.repo.find(id)
@@ -69,12 +83,12 @@ class AchievementService(BaseCrudService):
         if not is_owner and not is_staff:
             raise ValueError("У вас нет прав на удаление этого файла")
 
-        if item.file_path:
-            full_path = os.path.join("static", item.file_path)
-            if os.path.exists(full_path):
-                try:
-                    os.remove(full_path)
-                except OSError:
-                    pass
-
-        await self.repo.delete(id)
\ No newline at end of file
+        await UserScoreRepository(self.repo.db).apply_transition(item.user_id, item.status, item.points, None, 0)
+        was_pending = is_pending(item.status)
+        await AchievementStatsRepository(self.repo.db).record_deleted(item)
+        await self.repo.delete(id)
+        await self.release_files([(item.file_path, item.content_hash)])
+        await LeaderboardService(self.repo.db, await get_redis()).sync_user(item.user_id)
+        await invalidate_dashboard()
+        if was_pending:
+            await adjust_pending(achievements=-1)
\ No newline at end of file
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import os
+import time
+import structlog
+from typing import Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.database import async_session_maker
+from app.infrastructure.redis_client import get_redis
+from app.models.user import Users
+from app.models.enums import UserRole
+
+logger = structlog.get_logger()
+
+AUTOCOMPLETE_CACHE_TTL = int(os.getenv("AUTOCOMPLETE_CACHE_TTL", "30"))
+AUTOCOMPLETE_ROLE_TTL = int(os.getenv("AUTOCOMPLETE_ROLE_TTL", "300"))
+
+STAFF_ROLES = (UserRole.MODERATOR.name, UserRole.SUPER_ADMIN.name)
+
+# Загрузчик получает свою сессию: его результат могут ждать и другие запросы
+Loader = Callable[[AsyncSession, int], Awaitable[List[dict]]]
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class AutocompleteService:
+    # Запись кэша — готовый список подсказок. Ключ — область (эндпоинт и права), размер списка
+    # и нормализованный запрос; записи живут несколько секунд
+    PREFIX = "autocomplete"
+    STATS_PREFIX = "autocomplete:stats"
+    OUTCOMES = ("hit", "coalesced", "miss")
+
+    # Одинаковые запросы, пришедшие в воркер одновременно, ждут один и тот же поход в базу
+    _inflight: Dict[str, asyncio.Task] = {}
+
+    def __init__(self, redis, ttl: int = AUTOCOMPLETE_CACHE_TTL, session_factory=async_session_maker):
+        self.redis = redis
+        self.ttl = ttl
+        self.session_factory = session_factory
+
+    def _key(self, scope: str, query: str, limit: int) -> str:
+        return f"{self.PREFIX}:{scope}:{limit}:{query}"
+
+    async def lookup(self, scope: str, query: str, loader: Loader, limit: int = 5) -> List[dict]:
+        started = time.perf_counter()
+        outcome, items = await self._lookup(self._key(scope, normalize_query(query), limit), loader, limit)
+        await self._record(outcome, time.perf_counter() - started)
+        return items
+
+    async def _lookup(self, key: str, loader: Loader, limit: int):
+        cached = await self._read(key)
+        if cached is not None:
+            return "hit", cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            return "coalesced", await asyncio.shield(task)
+
+        task = asyncio.ensure_future(self._load(key, loader, limit))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: отмена запроса-инициатора не обрывает загрузку для тех, кто к ней присоединился
+        return "miss", await asyncio.shield(task)
+
+    async def _load(self, key: str, loader: Loader, limit: int) -> List[dict]:
+        # Не сессия запроса-инициатора: она закрывается вместе с его ответом, а результат ещё ждут другие
+        async with self.session_factory() as db:
+            items = await loader(db, limit)
+        await self._write(key, items)
+        return items
+
+    async def _read(self, key: str) -> Optional[List[dict]]:
+        try:
+            raw = await self.redis.get(key)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning("Autocomplete cache read failed", error=str(e))
+            return None
+
+    async def _write(self, key: str, items: List[dict]):
+        try:
+            await self.redis.set(key, json.dumps(items, ensure_ascii=False), ex=self.ttl)
+        except Exception as e:
+            logger.warning("Autocomplete cache write failed", error=str(e))
+
+    async def _record(self, outcome: str, elapsed: float):
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.incr(f"{self.STATS_PREFIX}:{outcome}")
+                pipe.incrby(f"{self.STATS_PREFIX}:{outcome}:us", int(elapsed * 1_000_000))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Autocomplete metrics update failed", error=str(e))
+
+    async def counters(self) -> dict:
+        keys = [f"{self.STATS_PREFIX}:{outcome}{suffix}" for outcome in self.OUTCOMES for suffix in ("", ":us")]
+        values = [int(value or 0) for value in await self.redis.mget(*keys)]
+
+        outcomes = {}
+        for index, outcome in enumerate(self.OUTCOMES):
+            count, micros = values[2 * index], values[2 * index + 1]
+            outcomes[outcome] = {"count": count, "avg_ms": round(micros / count / 1000, 3) if count else 0.0}
+
+        total = sum(item["count"] for item in outcomes.values())
+        served = total - outcomes["miss"]["count"]
+        return {
+            "requests": total,
+            "hit_rate": round(served / total, 4) if total else 0.0,
+            "avg_ms": round(sum(values[1::2]) / total / 1000, 3) if total else 0.0,
+            "outcomes": outcomes,
+            "ttl": self.ttl
+        }
+
+    @classmethod
+    def _role_key(cls, user_id: int) -> str:
+        return f"{cls.PREFIX}:role:{user_id}"
+
+    async def is_staff(self, db: AsyncSession, user_id: Optional[int]) -> bool:
+        # Роль кэшируется, чтобы подсказки на каждое нажатие не ходили в users; смена роли сбрасывает запись
+        if not user_id:
+            return False
+        try:
+            role = await self.redis.get(self._role_key(user_id))
+        except Exception as e:
+            logger.warning("Autocomplete role cache read failed", error=str(e))
+            role = None
+
+        if role is None:
+            role = await db.scalar(select(Users.role).where(Users.id == user_id))
+            role = role.name if role is not None else ""
+            try:
+                await self.redis.set(self._role_key(user_id), role, ex=AUTOCOMPLETE_ROLE_TTL)
+            except Exception as e:
+                logger.warning("Autocomplete role cache write failed", error=str(e))
+
+        return role in STAFF_ROLES
+
+
+async def get_autocomplete() -> AutocompleteService:
+    return AutocompleteService(await get_redis())
+
+
+async def forget_autocomplete_role(user_id: int):
+    try:
+        await (await get_redis()).delete(AutocompleteService._role_key(user_id))
+    except Exception as e:
+        logger.warning("Autocomplete role cache invalidation failed", user_id=user_id, error=str(e))
@@ -0,0 +1,82 @@
+import json
+import os
+import structlog
+from datetime import datetime
+from typing import Optional
+
+from app.infrastructure.redis_client import get_redis
+
+logger = structlog.get_logger()
+
+DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "300"))
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class DashboardCache:
+    # Ключ содержит номер версии: любое изменение документов/пользователей увеличивает версию,
+    # старые записи становятся недостижимы и досрочно истекают по TTL
+    PREFIX = "dashboard"
+    VERSION_KEY = "dashboard:version"
+    HITS_KEY = "dashboard:hits"
+    MISSES_KEY = "dashboard:misses"
+
+    def __init__(self, redis, ttl: int = DASHBOARD_CACHE_TTL):
+        self.redis = redis
+        self.ttl = ttl
+
+    async def _key(self, scope: str, period: str) -> str:
+        version = await self.redis.get(self.VERSION_KEY) or 0
+        return f"{self.PREFIX}:v{version}:{scope}:{period}"
+
+    async def get(self, scope: str, period: str) -> Optional[dict]:
+        try:
+            raw = await self.redis.get(await self._key(scope, period))
+            await self.redis.incr(self.HITS_KEY if raw else self.MISSES_KEY)
+        except Exception as e:
+            logger.warning("Dashboard cache read failed", error=str(e))
+            return None
+
+        if not raw:
+            return None
+
+        stats = json.loads(raw)
+        for doc in stats.get('recent_docs', []):
+            doc['created_at'] = datetime.fromisoformat(doc['created_at']) if doc.get('created_at') else None
+        return stats
+
+    async def set(self, scope: str, period: str, stats: dict):
+        try:
+            await self.redis.set(
+                await self._key(scope, period),
+                json.dumps(stats, ensure_ascii=False, default=_encode),
+                ex=self.ttl
+            )
+        except Exception as e:
+            logger.warning("Dashboard cache write failed", error=str(e))
+
+    async def invalidate(self):
+        try:
+            await self.redis.incr(self.VERSION_KEY)
+        except Exception as e:
+            logger.warning("Dashboard cache invalidation failed", error=str(e))
+
+    async def counters(self) -> dict:
+        hits, misses, version = await self.redis.mget(self.HITS_KEY, self.MISSES_KEY, self.VERSION_KEY)
+        hits, misses = int(hits or 0), int(misses or 0)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "version": int(version or 0),
+            "ttl": self.ttl
+        }
+
+
+async def invalidate_dashboard():
+    await DashboardCache(await get_redis()).invalidate()
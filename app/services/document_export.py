@@ -0,0 +1,135 @@
+import csv
+import os
+import tempfile
+import zipfile
+import structlog
+from contextlib import aclosing
+from typing import AsyncIterator, List
+
+from app.models.achievement import Achievement
+from app.repositories.admin.achievement_repository import AchievementRepository
+
+logger = structlog.get_logger()
+
+EXPORT_BATCH_SIZE = 200
+MANIFEST_NAME = "manifest.csv"
+MANIFEST_FIELDS = ["id", "file", "user_id", "student", "email", "title", "category", "level", "status",
+                   "created_at", "note"]
+# Манифест копится во временном файле и на диск уходит только после этого порога
+MANIFEST_SPOOL_SIZE = 1024 * 1024
+
+
+def document_filename(document: Achievement) -> str:
+    ext = os.path.splitext(document.file_path)[1]
+    return f"document_{document.id}_user_{document.user_id}{ext}"
+
+
+async def iter_documents(session_factory, filters: dict, sort_by: str = "newest",
+                         batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[List[Achievement]]:
+    # Пачки по keyset-ключу реестра. Сессия открывается на каждую пачку, чтобы медленный клиент
+    # не держал соединение из пула, пока качает архив
+    if sort_by == "relevance":
+        sort_by = "newest"
+    after = None
+    while True:
+        async with session_factory() as db:
+            repo = AchievementRepository(db)
+            batch = await repo.get_all_with_filters(**filters, sort_by=sort_by, after=after, limit=batch_size)
+            keys = repo.document_sort_keys(sort_by)
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        after = tuple(getattr(batch[-1], column.key) for column, _ in keys)
+
+
+class _ZipSink:
+    # Поток без seek: zipfile пишет размеры в data descriptor после каждой записи,
+    # а центральный каталог — в конце. Записанное сразу забирается генератором
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data) -> int:
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts.clear()
+        return data
+
+
+def _manifest_row(document: Achievement, name: str, note: str = "") -> list:
+    user = document.user
+    return [
+        document.id, name, document.user_id,
+        f"{user.last_name} {user.first_name}" if user else "", user.email if user else "",
+        document.title, document.category.value if document.category else "",
+        document.level.value if document.level else "", document.status.value if document.status else "",
+        document.created_at.isoformat() if document.created_at else "", note
+    ]
+
+
+async def stream_documents_zip(batches: AsyncIterator[List[Achievement]], storage,
+                               manifest: bool = True) -> AsyncIterator[bytes]:
+    # Архив собирается на лету: в памяти одна пачка строк и один кусок файла. Документы уже сжаты
+    # (PDF, JPG, PNG), поэтому записи хранятся без сжатия и не грузят процессор
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+    spool = tempfile.SpooledTemporaryFile(max_size=MANIFEST_SPOOL_SIZE, mode="w+", newline="", encoding="utf-8")
+    writer = csv.writer(spool)
+    writer.writerow(MANIFEST_FIELDS)
+    exported = missing = 0
+
+    try:
+        async for batch in batches:
+            for document in batch:
+                if not document.file_path:
+                    writer.writerow(_manifest_row(document, "", "нет файла"))
+                    missing += 1
+                    continue
+
+                name = document_filename(document)
+                async with aclosing(storage.open(document.file_path)) as chunks:
+                    # Первый кусок читается до открытия записи: отсутствующий файл не оставляет в архиве пустышку
+                    try:
+                        first = await anext(chunks, b"")
+                    except Exception as e:
+                        logger.warning("Export source missing", key=document.file_path, error=str(e))
+                        writer.writerow(_manifest_row(document, "", "файл отсутствует в хранилище"))
+                        missing += 1
+                        continue
+
+                    info = zipfile.ZipInfo(name, date_time=document.created_at.timetuple()[:6])
+                    info.compress_type = zipfile.ZIP_STORED
+                    with archive.open(info, mode="w") as entry:
+                        entry.write(first)
+                        yield sink.drain()
+                        async for chunk in chunks:
+                            entry.write(chunk)
+                            yield sink.drain()
+
+                writer.writerow(_manifest_row(document, name))
+                exported += 1
+                if data := sink.drain():
+                    yield data
+
+        if manifest:
+            spool.seek(0)
+            with archive.open(MANIFEST_NAME, mode="w") as entry:
+                # BOM, чтобы Excel открыл кириллицу без выбора кодировки
+                entry.write("\ufeff".encode("utf-8"))
+                while text := spool.read(64 * 1024):
+                    entry.write(text.encode("utf-8"))
+                    yield sink.drain()
+
+        archive.close()
+        yield sink.drain()
+        logger.info("Documents exported", exported=exported, missing=missing)
+    finally:
+        spool.close()
+
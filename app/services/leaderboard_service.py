@@ -0,0 +1,202 @@
+import json
+import structlog
+from collections import defaultdict
+from typing import List, Optional, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import Users
+from app.models.user_score import UserScore
+from app.models.enums import UserRole, UserStatus
+from app.repositories.admin.user_score_repository import UserScoreRepository
+
+logger = structlog.get_logger()
+
+# Баллы и число одобренных документов упаковываются в один score: points * COUNT_BASE + count,
+# поэтому при равных баллах выше оказывается студент с большим числом документов.
+COUNT_BASE = 1_000_000
+
+
+def encode_score(points: int, count: int) -> int:
+    return int(points or 0) * COUNT_BASE + min(int(count or 0), COUNT_BASE - 1)
+
+
+def decode_score(score) -> Tuple[int, int]:
+    points, count = divmod(int(float(score)), COUNT_BASE)
+    return points, count
+
+
+def _enum_value(value):
+    return value.value if hasattr(value, 'value') else value
+
+
+class LeaderboardService:
+    PREFIX = "leaderboard"
+    READY_KEY = "leaderboard:ready"
+
+    def __init__(self, db: AsyncSession, redis):
+        self.db = db
+        self.redis = redis
+
+    @classmethod
+    def cohort_key(cls, education_level: str = None, course: int = None) -> str:
+        education_level = _enum_value(education_level)
+        if education_level and education_level != 'all' and course:
+            return f"{cls.PREFIX}:edu:{education_level}:course:{course}"
+        if education_level and education_level != 'all':
+            return f"{cls.PREFIX}:edu:{education_level}"
+        if course:
+            return f"{cls.PREFIX}:course:{course}"
+        return f"{cls.PREFIX}:global"
+
+    @classmethod
+    def cohort_keys(cls, education_level=None, course: int = None) -> List[str]:
+        keys = [cls.cohort_key()]
+        if education_level:
+            keys.append(cls.cohort_key(education_level))
+        if course:
+            keys.append(cls.cohort_key(course=course))
+        if education_level and course:
+            keys.append(cls.cohort_key(education_level, course))
+        return keys
+
+    @classmethod
+    def _member_key(cls, user_id: int) -> str:
+        return f"{cls.PREFIX}:member:{user_id}"
+
+    async def ensure_built(self):
+        if not await self.redis.exists(self.READY_KEY):
+            await self.rebuild()
+
+    async def rebuild(self):
+        stmt = UserScoreRepository(self.db).leaderboard_stmt().with_only_columns(
+            Users.id,
+            Users.education_level,
+            Users.course,
+            func.coalesce(UserScore.total_points, 0),
+            func.coalesce(UserScore.approved_count, 0)
+        )
+
+        mappings = defaultdict(dict)
+        memberships = {}
+        for user_id, education_level, course, points, count in (await self.db.execute(stmt)).all():
+            keys = self.cohort_keys(education_level, course)
+            for key in keys:
+                mappings[key][str(user_id)] = encode_score(points, count)
+            memberships[self._member_key(user_id)] = json.dumps(keys, ensure_ascii=False)
+
+        old_keys = [key async for key in self.redis.scan_iter(match=f"{self.PREFIX}:*")]
+
+        # MULTI/EXEC: читатели видят либо старый, либо полностью перестроенный рейтинг
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if old_keys:
+                pipe.delete(*old_keys)
+            for key, mapping in mappings.items():
+                pipe.zadd(key, mapping)
+            for key, value in memberships.items():
+                pipe.set(key, value)
+            pipe.set(self.READY_KEY, 1)
+            await pipe.execute()
+
+        logger.info("Leaderboard rebuilt", students=len(memberships), cohorts=len(mappings))
+
+    async def invalidate(self):
+        await self.redis.delete(self.READY_KEY)
+
+    async def sync_user(self, user_id: int):
+        try:
+            if not await self.redis.exists(self.READY_KEY):
+                # Рейтинга ещё нет: он будет собран целиком при первом чтении
+                return
+
+            stmt = (
+                select(Users, UserScore)
+                .outerjoin(UserScore, UserScore.user_id == Users.id)
+                .filter(Users.id == user_id)
+            )
+            row = (await self.db.execute(stmt)).first()
+
+            old_keys = json.loads(await self.redis.get(self._member_key(user_id)) or "[]")
+
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for key in old_keys:
+                    pipe.zrem(key, str(user_id))
+                pipe.delete(self._member_key(user_id))
+
+                if row and row[0].role == UserRole.STUDENT and row[0].status == UserStatus.ACTIVE:
+                    user, score = row
+                    keys = self.cohort_keys(user.education_level, user.course)
+                    member_score = encode_score(score.total_points, score.approved_count) if score else 0
+                    for key in keys:
+                        pipe.zadd(key, {str(user_id): member_score})
+                    pipe.set(self._member_key(user_id), json.dumps(keys, ensure_ascii=False))
+
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Leaderboard sync failed", user_id=user_id, error=str(e))
+            try:
+                await self.invalidate()
+            except Exception:
+                pass
+
+    async def rank(self, user_id: int, education_level: str = None, course: int = None) -> int:
+        # То же правило, что RankingRepository.rank: RANK() по (баллы, документы), равные делят место
+        score = await self.score(user_id, education_level, course)
+        if score is None:
+            return 0
+        return await self.count_above(*score, education_level, course) + 1
+
+    async def score(self, user_id: int, education_level: str = None, course: int = None) -> Optional[Tuple[int, int]]:
+        await self.ensure_built()
+        value = await self.redis.zscore(self.cohort_key(education_level, course), str(user_id))
+        return decode_score(value) if value is not None else None
+
+    async def size(self, education_level: str = None, course: int = None) -> int:
+        await self.ensure_built()
+        return await self.redis.zcard(self.cohort_key(education_level, course))
+
+    async def count_above(self, points: int, count: int, education_level: str = None, course: int = None) -> int:
+        # Сколько студентов лиги строго выше пары (points, count): ZCOUNT по упакованному score
+        await self.ensure_built()
+        return await self.redis.zcount(
+            self.cohort_key(education_level, course), f"({encode_score(points, count)}", "+inf"
+        )
+
+    async def window(self, start: int, stop: int, education_level: str = None,
+                     course: int = None) -> List[Tuple[int, int, int, int]]:
+        # Позиции [start, stop] (с нуля) как (user_id, points, count, место). Место — RANK(): ZCOUNT нужен
+        # только для первой строки, дальше равные делят место предыдущей, остальные занимают свою позицию
+        await self.ensure_built()
+        rows = await self.redis.zrevrange(self.cohort_key(education_level, course), start, stop, withscores=True)
+
+        ranked = []
+        for index, (member, value) in enumerate(rows):
+            points, count = decode_score(value)
+            if not ranked:
+                rank = await self.count_above(points, count, education_level, course) + 1
+            elif ranked[-1][1:3] == (points, count):
+                rank = ranked[-1][3]
+            else:
+                rank = start + index + 1
+            ranked.append((int(member), points, count, rank))
+        return ranked
+
+    async def top(self, limit: int, education_level: str = None, course: int = None) -> List[Tuple[int, int, int, int]]:
+        return await self.window(0, limit - 1, education_level, course)
+
+    async def around(self, user_id: int, radius: int, education_level: str = None,
+                     course: int = None) -> List[Tuple[int, int, int, int]]:
+        await self.ensure_built()
+        position = await self.redis.zrevrank(self.cohort_key(education_level, course), str(user_id))
+        if position is None:
+            return []
+        return await self.window(max(position - radius, 0), position + radius, education_level, course)
+
+    async def with_users(self, rows: List[Tuple[int, int, int, int]]) -> list:
+        # (Users, points, count, место): имена и аватары одним запросом по первичному ключу
+        if not rows:
+            return []
+        users = {user.id: user for user in (await self.db.scalars(
+            select(Users).where(Users.id.in_([row[0] for row in rows]))
+        )).all()}
+        return [(users[user_id], *rest) for user_id, *rest in rows if user_id in users]
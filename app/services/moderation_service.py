@@ -0,0 +1,145 @@
+import os
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import List
+from sqlalchemy import select, update, insert, case, literal, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import Users
+from app.models.achievement import Achievement
+from app.models.notification import Notification
+from app.models.enums import AchievementStatus, UserRole
+from app.repositories.admin.user_score_repository import UserScoreRepository
+from app.repositories.admin.achievement_stats_repository import AchievementStatsRepository
+from app.services.points_rules_service import load_points_rules
+
+DECISION_STATUSES = (AchievementStatus.APPROVED, AchievementStatus.REJECTED, AchievementStatus.REVISION)
+
+# Сколько документ остаётся за модератором, открывшим его в очереди; брошенная выдача освобождается сама
+MODERATION_LEASE = timedelta(minutes=int(os.getenv("MODERATION_LEASE_MINUTES", "15")))
+
+
+def claimed_by_other(claimed_by, claim_expires_at, moderator_id: int) -> bool:
+    if not claimed_by or claimed_by == moderator_id or claim_expires_at is None:
+        return False
+    if claim_expires_at.tzinfo is None:
+        claim_expires_at = claim_expires_at.replace(tzinfo=timezone.utc)
+    return claim_expires_at > datetime.now(timezone.utc)
+
+
+def decision_message(status: AchievementStatus, title: str, points: int, reason: str = None) -> str:
+    if status == AchievementStatus.REJECTED:
+        return f"Окончательный отказ по документу '{title}'. Причина: {reason}"
+    if status == AchievementStatus.REVISION:
+        return f"Документ '{title}' отправлен на доработку. Примечание: {reason}"
+    return f"Документ '{title}' одобрен! Начислено {points} баллов."
+
+
+class BulkModerationService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def apply(self, moderator: Users, decisions) -> List[dict]:
+        results = {}
+        accepted = {}
+        seen = Counter(decision.id for decision in decisions)
+        for decision in decisions:
+            if seen[decision.id] > 1:
+                results[decision.id] = {"id": decision.id, "ok": False, "error": "duplicate"}
+            elif decision.status not in DECISION_STATUSES:
+                results[decision.id] = {"id": decision.id, "ok": False, "error": "invalid_status"}
+            else:
+                results[decision.id] = None
+                accepted[decision.id] = decision
+
+        # Один запрос на всю пачку: текущее состояние документов и поток их владельцев для проверки зоны.
+        # FOR UPDATE до конца транзакции: параллельное решение по тому же документу ждёт и читает уже
+        # новый статус, а не применяет разницу баллов и агрегатов второй раз. Порядок по id — без взаимоблокировок
+        rows = {}
+        if accepted:
+            stmt = (
+                select(Achievement.id, Achievement.user_id, Achievement.title, Achievement.status,
+                       Achievement.points, Achievement.level, Achievement.category, Achievement.created_at,
+                       Achievement.updated_at, Achievement.claimed_by, Achievement.claim_expires_at,
+                       Users.education_level)
+                .join(Users, Users.id == Achievement.user_id)
+                .filter(Achievement.id.in_(accepted))
+                .order_by(Achievement.id)
+                .with_for_update(of=Achievement)
+            )
+            rows = {row.id: row for row in (await self.db.execute(stmt)).all()}
+
+        rules = await load_points_rules(self.db)
+        changes = {}
+        for achievement_id, decision in accepted.items():
+            row = rows.get(achievement_id)
+            if row is None:
+                results[achievement_id] = {"id": achievement_id, "ok": False, "error": "not_found"}
+            elif not self._in_zone(moderator, row.education_level):
+                results[achievement_id] = {"id": achievement_id, "ok": False, "error": "forbidden"}
+            elif claimed_by_other(row.claimed_by, row.claim_expires_at, moderator.id):
+                results[achievement_id] = {"id": achievement_id, "ok": False, "error": "claimed"}
+            elif row.status == decision.status:
+                # То же решение уже принято (например, другим модератором): повторное уведомление не нужно
+                results[achievement_id] = {"id": achievement_id, "ok": False, "error": "unchanged"}
+            else:
+                points = rules.points(row.level, row.category) if decision.status == AchievementStatus.APPROVED else 0
+                reason = None if decision.status == AchievementStatus.APPROVED else decision.reason
+                changes[achievement_id] = (row, decision.status, points, reason)
+                results[achievement_id] = {"id": achievement_id, "ok": True, "user_id": row.user_id,
+                                           "previous_status": row.status.value, "status": decision.status.value,
+                                           "points": points}
+
+        if changes:
+            await self._write(changes, rules.version)
+
+        return list(results.values())
+
+    @staticmethod
+    def _in_zone(moderator: Users, education_level) -> bool:
+        if moderator.role == UserRole.SUPER_ADMIN or not moderator.education_level:
+            return True
+        return moderator.education_level == education_level
+
+    async def _write(self, changes: dict, rules_version: int):
+        ids = list(changes)
+        status_type = Achievement.status.type
+
+        # Агрегаты считаются по старому состоянию, поэтому до UPDATE: updated_at ещё указывает на день старого статуса
+        await AchievementStatsRepository(self.db).record_transitions(
+            (row.created_at, row.updated_at, row.category, row.education_level, row.status, status)
+            for row, status, points, reason in changes.values()
+        )
+        await UserScoreRepository(self.db).apply_transitions(
+            (row.user_id, row.status, row.points, status, points)
+            for row, status, points, reason in changes.values()
+        )
+
+        # Один UPDATE на пачку: значения по id раскладываются через CASE
+        await self.db.execute(
+            update(Achievement)
+            .where(Achievement.id.in_(ids))
+            .values(
+                status=case({id: literal(status, status_type) for id, (_, status, _, _) in changes.items()},
+                            value=Achievement.id),
+                points=case({id: points for id, (_, _, points, _) in changes.items()}, value=Achievement.id),
+                rejection_reason=case({id: reason for id, (_, _, _, reason) in changes.items()},
+                                      value=Achievement.id),
+                rules_version=rules_version,
+                claimed_by=None,
+                claim_expires_at=None,
+                updated_at=func.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        # Уведомления одним многострочным INSERT ... VALUES
+        await self.db.execute(insert(Notification).values([
+            {
+                "user_id": row.user_id,
+                "title": "Статус заявки обновлен",
+                "message": decision_message(status, row.title, points, reason),
+                "is_read": False
+            }
+            for row, status, points, reason in changes.values()
+        ]))
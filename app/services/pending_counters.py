@@ -0,0 +1,96 @@
+import asyncio
+import os
+import structlog
+from sqlalchemy import select, func
+
+from app.infrastructure.database import async_session_maker
+from app.infrastructure.redis_client import get_redis
+from app.models.user import Users
+from app.models.achievement import Achievement
+from app.models.enums import UserStatus, AchievementStatus
+
+logger = structlog.get_logger()
+
+# Счётчики поддерживаются INCR/DECR; полный пересчёт раз в TTL исправляет возможный дрейф
+PENDING_COUNTERS_TTL = int(os.getenv("PENDING_COUNTERS_TTL", "3600"))
+RECOUNT_LOCK_TTL = 10
+
+
+class PendingCounters:
+    USERS_KEY = "admin:pending_users"
+    ACHIEVEMENTS_KEY = "admin:pending_achievements"
+    LOCK_KEY = "admin:pending_counters:lock"
+
+    def __init__(self, redis, ttl: int = PENDING_COUNTERS_TTL, session_maker=None):
+        self.redis = redis
+        self.ttl = ttl
+        self.session_maker = session_maker or async_session_maker
+
+    async def get(self, wait: float = 0.5):
+        users, achievements = await self.redis.mget(self.USERS_KEY, self.ACHIEVEMENTS_KEY)
+        if users is not None and achievements is not None:
+            return int(users), int(achievements)
+
+        # Single-flight: пересчитывает тот, кто взял блокировку, остальные коротко ждут его результат
+        if await self.redis.set(self.LOCK_KEY, 1, ex=RECOUNT_LOCK_TTL, nx=True):
+            try:
+                return await self.recount()
+            finally:
+                await self.redis.delete(self.LOCK_KEY)
+
+        for _ in range(int(wait / 0.05)):
+            await asyncio.sleep(0.05)
+            users, achievements = await self.redis.mget(self.USERS_KEY, self.ACHIEVEMENTS_KEY)
+            if users is not None and achievements is not None:
+                return int(users), int(achievements)
+        return int(users or 0), int(achievements or 0)
+
+    async def recount(self):
+        async with self.session_maker() as db:
+            users = await db.scalar(select(func.count()).select_from(Users).where(Users.status == UserStatus.PENDING))
+            achievements = await db.scalar(
+                select(func.count()).select_from(Achievement).where(Achievement.status == AchievementStatus.PENDING)
+            )
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self.USERS_KEY, users, ex=self.ttl)
+            pipe.set(self.ACHIEVEMENTS_KEY, achievements, ex=self.ttl)
+            await pipe.execute()
+        return users, achievements
+
+    async def adjust(self, users: int = 0, achievements: int = 0):
+        # INCRBY и TTL в одной транзакции: если ключ успел истечь, INCRBY создаёт его заново без TTL
+        # со значением, равным дельте. Такой ключ сразу удаляется — счётчик соберёт пересчёт
+        deltas = [(key, delta) for key, delta in ((self.USERS_KEY, users), (self.ACHIEVEMENTS_KEY, achievements))
+                  if delta]
+        if not deltas:
+            return
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for key, delta in deltas:
+                pipe.incrby(key, delta)
+                pipe.ttl(key)
+            results = await pipe.execute()
+
+        recreated = [key for (key, _), ttl in zip(deltas, results[1::2]) if ttl == -1]
+        if recreated:
+            await self.redis.delete(*recreated)
+
+    async def reset(self):
+        await self.redis.delete(self.USERS_KEY, self.ACHIEVEMENTS_KEY)
+
+
+async def adjust_pending(users: int = 0, achievements: int = 0):
+    try:
+        await PendingCounters(await get_redis()).adjust(users, achievements)
+    except Exception as e:
+        logger.warning("Pending counters update failed", error=str(e))
+
+
+def is_pending(status) -> bool:
+    status_val = status.value if hasattr(status, 'value') else status
+    return status_val in (AchievementStatus.PENDING.value, AchievementStatus.PENDING.name)
+
+
+def is_user_pending(status) -> bool:
+    status_val = status.value if hasattr(status, 'value') else status
+    return status_val in (UserStatus.PENDING.value, UserStatus.PENDING.name)
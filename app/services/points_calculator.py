@@ -1,14 +1,76 @@
+import os
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Tuple
+
 from app.models.enums import AchievementLevel, AchievementCategory
 
+# Доработанный документ поднимается в очереди: студент уже ждал одну проверку
+PRIORITY_REVISION_WEIGHT = int(os.getenv("MODERATION_PRIORITY_REVISION_WEIGHT", "15"))
+# Сколько часов ожидания дают документу один балл приоритета
+PRIORITY_HOURS_PER_POINT = float(os.getenv("MODERATION_PRIORITY_HOURS_PER_POINT", "1"))
+
+# Правила по умолчанию (версия 0): действуют, пока в points_rules нет ни одной версии
+DEFAULT_LEVEL_POINTS = {
+    AchievementLevel.SCHOOL.name: 10,  # Школьный
+    AchievementLevel.MUNICIPAL.name: 20,  # Муниципальный
+    AchievementLevel.REGIONAL.name: 40,  # Региональный
+    AchievementLevel.FEDERAL.name: 75,  # Всероссийский
+    AchievementLevel.INTERNATIONAL.name: 100  # Международный
+}
+
+
+def enum_name(enum_cls, value) -> str:
+    if isinstance(value, Enum):
+        return value.name
+    if value in enum_cls.__members__:
+        return value
+    try:
+        return enum_cls(value).name
+    except ValueError:
+        return value
+
+
+class PointsRules:
+    # Скомпилированная версия правил: таблица (уровень, категория) -> баллы без обращений к БД
+    def __init__(self, version: int, level_points: Dict[str, int], category_multipliers: Dict[str, float] = None):
+        self.version = version
+        category_multipliers = category_multipliers or {}
+        self.table: Dict[Tuple[str, str], int] = {
+            (level.name, category.name): round(
+                level_points.get(level.name, DEFAULT_LEVEL_POINTS[level.name])
+                * category_multipliers.get(category.name, 1.0)
+            )
+            for level in AchievementLevel
+            for category in AchievementCategory
+        }
+
+    def points(self, level, category) -> int:
+        key = (enum_name(AchievementLevel, level), enum_name(AchievementCategory, category))
+        return self.table.get(key, DEFAULT_LEVEL_POINTS[AchievementLevel.SCHOOL.name])
+
+
+DEFAULT_RULES = PointsRules(0, DEFAULT_LEVEL_POINTS)
+_current = DEFAULT_RULES
+
+
+def current_rules() -> PointsRules:
+    return _current
+
+
+def use_rules(rules: PointsRules):
+    global _current
+    _current = rules
+
 
 def calculate_points(level: str, category: str) -> int:
-    level_points = {
-        AchievementLevel.SCHOOL.value: 10,  # Школьный
-        AchievementLevel.MUNICIPAL.value: 20,  # Муниципальный
-        AchievementLevel.REGIONAL.value: 40,  # Региональный
-        AchievementLevel.FEDERAL.value: 75,  # Всероссийский
-        AchievementLevel.INTERNATIONAL.value: 100  # Международный
-    }
-
-    points = level_points.get(level, 10)
-    return points
\ No newline at end of file
+    # Синхронный расчёт по последней загруженной версии, см. points_rules_service.load_points_rules
+    return _current.points(level, category)
+
+
+def moderation_priority(projected_points: int, revision_count: int, created_at: datetime) -> float:
+    # Текущий приоритет = баллы + бонус за доработки + часы ожидания / PRIORITY_HOURS_PER_POINT.
+    # Часы ожидания = now - created_at, а now одинаково для всех строк, поэтому для сортировки хватает
+    # "- created_at": значение не меняется со временем, его можно хранить и индексировать
+    age_points = created_at.timestamp() / 3600 / PRIORITY_HOURS_PER_POINT
+    return (projected_points or 0) + PRIORITY_REVISION_WEIGHT * (revision_count or 0) - age_points
@@ -0,0 +1,110 @@
+import os
+import time
+import structlog
+from sqlalchemy import select, update, case, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.achievement import Achievement
+from app.models.enums import AchievementStatus, AchievementLevel, AchievementCategory
+from app.repositories.admin.points_rules_repository import PointsRulesRepository
+from app.repositories.admin.user_score_repository import UserScoreRepository
+from app.services.points_calculator import PointsRules, DEFAULT_RULES, use_rules
+from app.services.leaderboard_service import LeaderboardService
+from app.services.dashboard_cache import DashboardCache
+
+logger = structlog.get_logger()
+
+RECOMPUTE_CHUNK_SIZE = 1000
+# Как часто процесс перепроверяет, какая версия правил действует сегодня
+RULES_VERSION_TTL = int(os.getenv("POINTS_RULES_VERSION_TTL", "60"))
+
+# Скомпилированные версии неизменяемы, поэтому кэшируются навсегда; проверяется только номер активной версии
+_compiled = {}
+_active = {"version": None, "checked_at": 0.0}
+
+# Пересчитываются документы, баллы которых ещё имеют значение: одобренные и ждущие проверки
+RESCORED_STATUSES = (AchievementStatus.APPROVED, AchievementStatus.PENDING, AchievementStatus.REVISION)
+
+
+async def load_points_rules(db: AsyncSession) -> PointsRules:
+    repo = PointsRulesRepository(db)
+    if _active["version"] is None or time.monotonic() - _active["checked_at"] > RULES_VERSION_TTL:
+        _active["version"] = await repo.active_version() or 0
+        _active["checked_at"] = time.monotonic()
+
+    version = _active["version"]
+    if version not in _compiled:
+        _compiled[version] = await repo.load(version)
+
+    use_rules(_compiled[version])
+    return _compiled[version]
+
+
+def reset_points_rules_cache():
+    _compiled.clear()
+    _active.update(version=None, checked_at=0.0)
+    use_rules(DEFAULT_RULES)
+
+
+class PointsRecalculator:
+    def __init__(self, db: AsyncSession, redis, chunk_size: int = RECOMPUTE_CHUNK_SIZE):
+        self.db = db
+        self.redis = redis
+        self.chunk_size = chunk_size
+
+    def _points_case(self, rules: PointsRules):
+        return case(
+            *[
+                (and_(Achievement.level == level, Achievement.category == category),
+                 rules.points(level, category))
+                for level in AchievementLevel
+                for category in AchievementCategory
+            ],
+            else_=Achievement.projected_points
+        )
+
+    async def run(self, version: int = None) -> int:
+        repo = PointsRulesRepository(self.db)
+        version = version if version is not None else (await repo.active_version() or 0)
+        rules = await repo.load(version)
+        new_points = self._points_case(rules)
+
+        processed = 0
+        while True:
+            # Чанки по rules_version: прерванный пересчёт продолжается с необработанных строк
+            ids = (await self.db.execute(
+                select(Achievement.id)
+                .filter(Achievement.status.in_(RESCORED_STATUSES), Achievement.rules_version != version)
+                .order_by(Achievement.id)
+                .limit(self.chunk_size)
+            )).scalars().all()
+            if not ids:
+                break
+
+            await self.db.execute(
+                update(Achievement)
+                .where(Achievement.id.in_(ids))
+                .values(
+                    points=case((Achievement.status == AchievementStatus.APPROVED, new_points),
+                                else_=Achievement.points),
+                    priority=Achievement.priority + new_points - Achievement.projected_points,
+                    projected_points=new_points,
+                    rules_version=version,
+                    # Пересчёт баллов — не решение модератора: onupdate не должен сдвигать дату одобрения,
+                    # по которой считаются периоды дашборда, рейтинги и суточный агрегат
+                    updated_at=Achievement.updated_at
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.commit()
+            processed += len(ids)
+            logger.info("Points recomputed", version=version, processed=processed)
+
+        # Рейтинги строятся из user_scores: после пересчёта они собираются заново
+        await UserScoreRepository(self.db).rebuild()
+        await self.db.commit()
+        await LeaderboardService(self.db, self.redis).invalidate()
+        await DashboardCache(self.redis).invalidate()
+
+        reset_points_rules_cache()
+        return processed
@@ -0,0 +1,132 @@
+import aiofiles.tempfile
+import asyncio
+import fitz
+import io
+import multiprocessing
+import os
+import structlog
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+from PIL import Image, ImageOps
+
+from app.infrastructure.storage import LocalStorage, get_storage
+
+logger = structlog.get_logger()
+
+PREVIEW_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png")
+
+PREVIEW_SIZE = int(os.getenv("PREVIEW_SIZE", "480"))
+PREVIEW_WORKERS = int(os.getenv("PREVIEW_WORKERS", "2"))
+PREVIEW_QUALITY = 80
+
+_pool: Optional[ProcessPoolExecutor] = None
+_tasks = set()
+
+
+def preview_key(file_path: str) -> str:
+    # Превью лежит рядом с оригиналом; имя блоба уникально, так что превью тоже не меняется
+    return f"{os.path.splitext(file_path)[0]}.preview.jpg"
+
+
+def can_preview(file_path: Optional[str]) -> bool:
+    ext = os.path.splitext(file_path or "")[1].lower()
+    return ext in PREVIEW_EXTENSIONS
+
+
+def render_preview(path: str, ext: str, size: int = PREVIEW_SIZE) -> Optional[bytes]:
+    # Выполняется в процессе пула: оригинал читается с диска по частям, на выходе JPEG
+    if ext == "pdf":
+        with fitz.open(path, filetype="pdf") as document:
+            if document.page_count == 0:
+                return None
+            page = document[0]
+            zoom = size / max(page.rect.width, page.rect.height)
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+    else:
+        image = Image.open(path)
+        # JPEG декодируется сразу в уменьшенном масштабе
+        image.draft("RGB", (size, size))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=PREVIEW_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    # spawn, а не fork: воркер не наследует event loop, соединения и потоки веб-процесса
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=PREVIEW_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+@asynccontextmanager
+async def _local_copy(storage, file_path: str):
+    # Воркеру передаётся путь, а не содержимое: локальный файл открывается на месте,
+    # объект из S3 скачивается во временный файл без сборки в памяти
+    if isinstance(storage, LocalStorage):
+        yield storage.path(file_path)
+        return
+
+    async with aiofiles.tempfile.NamedTemporaryFile("wb", suffix=os.path.splitext(file_path)[1]) as spool:
+        async for chunk in storage.open(file_path):
+            await spool.write(chunk)
+        await spool.flush()
+        yield spool.name
+
+
+async def generate_preview(file_path: str, executor: Executor = None) -> Optional[str]:
+    if not can_preview(file_path):
+        return None
+
+    storage = get_storage()
+    key = preview_key(file_path)
+    try:
+        # Дубликат уже загруженного файла получает готовое превью
+        if await storage.exists(key):
+            return key
+
+        ext = os.path.splitext(file_path)[1].lower().lstrip(".")
+        async with _local_copy(storage, file_path) as path:
+            preview = await asyncio.get_running_loop().run_in_executor(
+                executor or _get_pool(), render_preview, path, "jpg" if ext == "jpeg" else ext
+            )
+        if not preview:
+            return None
+
+        async def chunks():
+            yield preview
+
+        await storage.save(key, chunks(), "image/jpeg")
+        return key
+    except Exception as e:
+        logger.warning("Preview generation failed", file_path=file_path, error=str(e))
+        return None
+
+
+def schedule_preview(file_path: Optional[str]):
+    # Превью строится после ответа пользователю; ошибка не влияет на загрузку документа
+    if not can_preview(file_path):
+        return None
+    task = asyncio.create_task(generate_preview(file_path))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+def shutdown_previews():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,188 @@
+import asyncio
+import structlog
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, insert, func, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.database import async_session_maker
+from app.infrastructure.redis_client import get_redis
+from app.models.user import Users
+from app.models.achievement import Achievement
+from app.models.season_job import SeasonJob
+from app.models.season_result import SeasonResult
+from app.models.user_score import UserScore
+from app.models.enums import AchievementStatus, SeasonJobStatus
+from app.repositories.admin.season_job_repository import SeasonJobRepository
+from app.repositories.admin.user_score_repository import UserScoreRepository
+from app.repositories.admin.achievement_stats_repository import AchievementStatsRepository
+from app.services.leaderboard_service import LeaderboardService
+from app.services.dashboard_cache import DashboardCache
+
+logger = structlog.get_logger()
+
+ARCHIVE_CHUNK_SIZE = 1000
+STALE_AFTER = timedelta(minutes=5)
+
+# Ссылки на запущенные задачи, чтобы их не собрал GC
+_tasks = set()
+
+
+class SeasonCloser:
+    def __init__(self, db: AsyncSession, redis):
+        self.db = db
+        self.redis = redis
+
+    @asynccontextmanager
+    async def _hold(self, job_id: int):
+        # Этап итогов — один долгий INSERT, updated_at за это время не меняется, и по нему одному перезапуск
+        # воркера счёл бы живой джоб зависшим. Сессионная advisory-блокировка на отдельном соединении держится,
+        # пока джоб выполняется, и снимается сама, если процесс умер. В SQLite один процесс — блокировка не нужна
+        async with self.db.bind.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                yield True
+                return
+            key = (func.hashtext(SeasonJob.__tablename__), job_id)
+            locked = await conn.scalar(select(func.pg_try_advisory_lock(*key)))
+            await conn.commit()
+            try:
+                yield locked
+            finally:
+                if locked:
+                    await conn.scalar(select(func.pg_advisory_unlock(*key)))
+                    await conn.commit()
+
+    async def run(self, job_id: int):
+        async with self._hold(job_id) as locked:
+            if not locked:
+                logger.info("Season job is running in another process", job_id=job_id)
+                return
+            await self._run(job_id)
+
+    async def _run(self, job_id: int):
+        job = await self.db.get(SeasonJob, job_id)
+        if not job or job.status == SeasonJobStatus.COMPLETED:
+            return
+
+        job.status = SeasonJobStatus.RUNNING
+        job.error = None
+        await self.db.commit()
+
+        try:
+            # Каждый этап фиксирует переход к следующему в той же транзакции, что и свою работу,
+            # поэтому после падения процесса джоб продолжается с незавершённого этапа
+            if job.stage == "results":
+                await self._write_results(job)
+            if job.stage == "archive":
+                await self._archive_achievements(job)
+            if job.stage == "scores":
+                await self._reset_scores(job)
+
+            job.status = SeasonJobStatus.COMPLETED
+            job.lock_key = None
+            job.finished_at = datetime.now(timezone.utc)
+            await self.db.commit()
+
+            await LeaderboardService(self.db, self.redis).invalidate()
+            await DashboardCache(self.redis).invalidate()
+            logger.info("Season closed", job_id=job_id, season=job.season_name)
+        except Exception as e:
+            logger.error("Season job failed", job_id=job_id, stage=job.stage, error=str(e))
+            await self.db.rollback()
+            # lock_key остаётся занятым: незавершённый сезон нужно продолжить, а не начинать новый
+            await self.db.execute(
+                update(SeasonJob).where(SeasonJob.id == job_id).values(status=SeasonJobStatus.FAILED, error=str(e))
+            )
+            await self.db.commit()
+
+    @staticmethod
+    def _in_snapshot(job: SeasonJob):
+        # Одобренные до снимка итогов; одобренное позже остаётся в новом сезоне.
+        # У джобов, начатых до появления snapshot_at, архивируется всё одобренное, как раньше
+        if job.snapshot_at is None:
+            return (Achievement.status == AchievementStatus.APPROVED,)
+        return (
+            Achievement.status == AchievementStatus.APPROVED,
+            func.coalesce(Achievement.updated_at, Achievement.created_at) <= job.snapshot_at
+        )
+
+    async def _write_results(self, job: SeasonJob):
+        # Место — по тому же порядку, что и в живом рейтинге: баллы, затем число документов
+        ranked = (
+            UserScoreRepository(self.db).leaderboard_stmt()
+            .with_only_columns(
+                Users.id,
+                literal(job.season_name),
+                UserScore.total_points,
+                func.rank().over(order_by=(UserScore.total_points.desc(), UserScore.approved_count.desc())),
+                func.now()
+            )
+            .filter(UserScore.total_points > 0)
+        )
+        await self.db.execute(
+            insert(SeasonResult).from_select(["user_id", "season_name", "points", "rank", "created_at"], ranked)
+        )
+
+        # Время транзакции БД, то же, что у строк season_results
+        job.snapshot_at = func.now()
+        await self.db.flush()
+        await self.db.refresh(job, ["snapshot_at"])
+        job.total = (await self.db.execute(
+            select(func.count(Achievement.id)).filter(*self._in_snapshot(job))
+        )).scalar() or 0
+        job.processed = 0
+        job.stage = "archive"
+        await self.db.commit()
+
+    async def _archive_achievements(self, job: SeasonJob):
+        while True:
+            ids = (await self.db.execute(
+                select(Achievement.id)
+                .filter(*self._in_snapshot(job))
+                .order_by(Achievement.id)
+                .limit(ARCHIVE_CHUNK_SIZE)
+            )).scalars().all()
+            if not ids:
+                break
+
+            await self.db.execute(
+                update(Achievement)
+                .where(Achievement.id.in_(ids), *self._in_snapshot(job))
+                .values(status=AchievementStatus.ARCHIVED)
+                .execution_options(synchronize_session=False)
+            )
+            job.processed += len(ids)
+            job.total = max(job.total, job.processed)
+            await self.db.commit()
+
+        job.stage = "scores"
+        await self.db.commit()
+
+    async def _reset_scores(self, job: SeasonJob):
+        # Пересчёт вместо обнуления: одобренное во время закрытия сезона остаётся в новом сезоне
+        await UserScoreRepository(self.db).rebuild()
+        # Архивация меняла статусы пачками в обход инкрементального учёта — суточный агрегат пересобирается
+        await AchievementStatsRepository(self.db).rebuild()
+        job.stage = "done"
+        await self.db.commit()
+
+
+async def run_season_job(job_id: int):
+    async with async_session_maker() as db:
+        await SeasonCloser(db, await get_redis()).run(job_id)
+
+
+def start_season_job(job_id: int):
+    task = asyncio.create_task(run_season_job(job_id))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+async def resume_stale_season_jobs():
+    async with async_session_maker() as db:
+        repo = SeasonJobRepository(db)
+        for job in await repo.find_stale(datetime.now(timezone.utc) - STALE_AFTER):
+            if await repo.claim(job):
+                logger.info("Resuming season job", job_id=job.id, stage=job.stage)
+                start_season_job(job.id)
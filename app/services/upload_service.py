@@ -0,0 +1,119 @@
+import hashlib
+import uuid
+import structlog
+from typing import Callable, Dict, Optional, Tuple
+from fastapi import UploadFile
+
+from app.infrastructure.storage import get_storage
+
+logger = structlog.get_logger()
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+CONTENT_TYPES = {"pdf": "application/pdf", "jpg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+
+DOCUMENT_SIGNATURES = {
+    b'\x25\x50\x44\x46': "pdf",
+    b'\xFF\xD8\xFF': "jpg",
+    b'\x89\x50\x4E\x47\x0D\x0A\x1A\x0A': "png"
+}
+
+IMAGE_SIGNATURES = {
+    b'\xFF\xD8\xFF': "jpg",
+    b'\x89\x50\x4E\x47\x0D\x0A\x1A\x0A': "png",
+    b'RIFF': "webp"
+}
+
+
+def sniff_extension(header: bytes, signatures: Dict[bytes, str]) -> Optional[str]:
+    for signature, ext in signatures.items():
+        if header.startswith(signature):
+            if ext == "webp" and header[8:12] != b'WEBP':
+                continue
+            return ext
+    return None
+
+
+def _too_large(max_size: int) -> ValueError:
+    return ValueError(f"Файл слишком большой. Лимит: {max_size // (1024 * 1024)} МБ.")
+
+
+async def _read_upload(file: UploadFile, max_size: int, signatures: Dict[bytes, str], digest=None):
+    # Файл передаётся в хранилище кусками: подпись проверяется по первому куску, лимит — по мере записи,
+    # так что слишком большой файл отбрасывается, не дочитанный до конца. Хранилище публикует файл
+    # только целиком (переименование или завершение multipart), недописанный документ не виден.
+    if file.size is not None and file.size > max_size:
+        raise _too_large(max_size)
+
+    first = await file.read(UPLOAD_CHUNK_SIZE)
+    ext = sniff_extension(first, signatures)
+    if not ext:
+        raise ValueError("Недопустимый формат файла. Файл не соответствует заявленному типу (проверка подписи).")
+
+    async def chunks():
+        chunk, written = first, 0
+        while chunk:
+            written += len(chunk)
+            if written > max_size:
+                raise _too_large(max_size)
+            if digest is not None:
+                digest.update(chunk)
+            yield chunk
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+
+    return ext, chunks()
+
+
+async def save_upload(file: UploadFile, directory: str, make_name: Callable[[str], str], max_size: int,
+                      signatures: Dict[bytes, str] = DOCUMENT_SIGNATURES) -> str:
+    ext, chunks = await _read_upload(file, max_size, signatures)
+    key = f"{directory}/{make_name(ext)}"
+    await get_storage().save(key, chunks, CONTENT_TYPES[ext])
+    return key
+
+
+def blob_key(directory: str, content_hash: str, ext: str) -> str:
+    return f"{directory}/{content_hash[:2]}/{content_hash}.{ext}"
+
+
+async def stage_blob(file: UploadFile, directory: str, max_size: int,
+                     signatures: Dict[bytes, str] = DOCUMENT_SIGNATURES) -> Tuple[str, str, str]:
+    # Файл пишется во временный ключ, SHA-256 считается во время записи. Возвращает временный ключ,
+    # ключ блоба и хэш; на место блоба файл переносит publish_blob
+    digest = hashlib.sha256()
+    ext, chunks = await _read_upload(file, max_size, signatures, digest)
+
+    staging = f"{directory}/incoming/{uuid.uuid4().hex}.{ext}"
+    await get_storage().save(staging, chunks, CONTENT_TYPES[ext])
+
+    content_hash = digest.hexdigest()
+    return staging, blob_key(directory, content_hash, ext), content_hash
+
+
+async def publish_blob(staging: str, key: str):
+    # Одинаковые загрузки ложатся в один объект: повторная копия удаляется
+    storage = get_storage()
+    try:
+        if await storage.exists(key):
+            await storage.delete([staging])
+        else:
+            await storage.move(staging, key)
+    except BaseException:
+        await remove_upload(staging)
+        raise
+
+
+async def save_blob(file: UploadFile, directory: str, max_size: int,
+                    signatures: Dict[bytes, str] = DOCUMENT_SIGNATURES) -> Tuple[str, str]:
+    # Имя файла — SHA-256 содержимого. Возвращает ключ и хэш
+    staging, key, content_hash = await stage_blob(file, directory, max_size, signatures)
+    await publish_blob(staging, key)
+    return key, content_hash
+
+
+async def remove_upload(*paths: Optional[str]) -> int:
+    try:
+        return await get_storage().delete(paths)
+    except Exception as e:
+        logger.warning("Upload removal failed", paths=paths, error=str(e))
+        return 0
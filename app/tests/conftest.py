@@ -0,0 +1,17 @@
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.infrastructure.database import Base
+
+
+@pytest_asyncio.fixture
+async def sqlite_db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_maker = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    async with session_maker() as session:
+        yield session
+
+    await engine.dispose()
@@ -0,0 +1,192 @@
+import pytest
+from sqlalchemy import select
+from datetime import datetime, timedelta
+
+from app.models.user import Users
+from app.models.achievement import Achievement
+from app.models.enums import UserRole, UserStatus, AchievementStatus, AchievementLevel, AchievementCategory, \
+    EducationLevel
+from app.repositories.admin.achievement_repository import AchievementRepository
+from app.services.admin.achievement_service import AchievementService
+
+
+async def _claim(repo, moderator_id=100, lease=timedelta(minutes=15), *args, **kwargs):
+    ids, _ = await repo.claim_batch(moderator_id, lease, *args, **kwargs)
+    return await repo.find_many(ids)
+
+
+def _get_student(id: int, education_level):
+    return Users(id=id, first_name=f"Student{id}", last_name="Test", email=f"s{id}@example.com",
+                 hashed_password="x", role=UserRole.STUDENT, status=UserStatus.ACTIVE,
+                 education_level=education_level)
+
+
+@pytest.mark.asyncio
+async def test_claim_batch_keyset(sqlite_db):
+    sqlite_db.add_all([_get_student(1, EducationLevel.BACHELOR), _get_student(2, EducationLevel.MASTER)])
+    start = datetime(2025, 1, 1)
+    sqlite_db.add_all([
+        Achievement(id=id, user_id=user_id, title=f"Doc {id}", file_path="x", category=AchievementCategory.SPORT,
+                    level=AchievementLevel.SCHOOL, status=status, created_at=start + timedelta(minutes=minute))
+        for id, user_id, status, minute in [
+            (1, 1, AchievementStatus.PENDING, 0),
+            (2, 1, AchievementStatus.PENDING, 1),
+            (3, 1, AchievementStatus.PENDING, 1),
+            (4, 2, AchievementStatus.PENDING, 2),
+            (5, 1, AchievementStatus.APPROVED, 3),
+            (6, 1, AchievementStatus.PENDING, 4),
+        ]
+    ])
+    await sqlite_db.commit()
+    repo = AchievementRepository(sqlite_db)
+
+    first = await _claim(repo, limit=2)
+    assert [item.id for item in first] == [1, 2]
+
+    second = await _claim(repo, after=(first[-1].created_at, first[-1].id), limit=2)
+    assert [item.id for item in second] == [3, 4]
+
+    zone = await _claim(repo, education_level=EducationLevel.BACHELOR, after=(start, 1), limit=10)
+    assert [item.id for item in zone] == [2, 3, 6]
+
+
+@pytest.mark.asyncio
+async def test_claim_batch_gives_moderators_distinct_documents(sqlite_db):
+    sqlite_db.add_all([_get_student(1, EducationLevel.BACHELOR)])
+    sqlite_db.add_all([
+        Achievement(id=id, user_id=1, title=f"Doc {id}", file_path="x", category=AchievementCategory.SPORT,
+                    level=AchievementLevel.SCHOOL, status=AchievementStatus.PENDING,
+                    created_at=datetime(2025, 1, 1) + timedelta(minutes=id))
+        for id in range(1, 6)
+    ])
+    await sqlite_db.commit()
+    repo = AchievementRepository(sqlite_db)
+    lease = timedelta(minutes=15)
+
+    first = await _claim(repo, 101, lease, limit=2)
+    second = await _claim(repo, 102, lease, limit=2)
+    assert [item.id for item in first] == [1, 2]
+    assert [item.id for item in second] == [3, 4]
+
+    # Повторный заход возвращает модератору его же документы
+    again = await _claim(repo, 101, lease, limit=2)
+    assert [item.id for item in again] == [1, 2]
+    expired = await _claim(repo, 103, timedelta(minutes=-1), limit=1)
+    assert [item.id for item in expired] == [5]
+    assert [item.id for item in await _claim(repo, 104, lease, limit=3)] == [5]
+
+    # Переход дальше по курсору возвращает прежнюю пачку в очередь, повторный — уже ничего не меняет
+    end = (datetime(2025, 1, 1, 0, 5), 5)
+    assert await repo.claim_batch(101, lease, after=end) == ([], True)
+    assert await repo.claim_batch(101, lease, after=end) == ([], False)
+    assert [item.id for item in await _claim(repo, 105, lease, limit=2)] == [1, 2]
+
+    # Выдача и снятие выдачи не трогают updated_at
+    updated = (await sqlite_db.execute(select(Achievement.updated_at))).scalars().all()
+    assert updated == [None] * 5
+
+
+@pytest.mark.asyncio
+async def test_priority_queue_orders_by_stored_priority(sqlite_db):
+    sqlite_db.add(_get_student(1, EducationLevel.BACHELOR))
+    await sqlite_db.commit()
+    repo = AchievementRepository(sqlite_db)
+    service = AchievementService(repo)
+    start = datetime(2025, 1, 1)
+    # Свежий международный документ обгоняет школьный, ждущий меньше 90 часов
+    for id, level, created_at, revision_count in [
+        (1, AchievementLevel.SCHOOL, start, 0),
+        (2, AchievementLevel.INTERNATIONAL, start + timedelta(hours=10), 0),
+        (3, AchievementLevel.SCHOOL, start - timedelta(hours=200), 0),
+        (4, AchievementLevel.SCHOOL, start, 2),
+    ]:
+        await service.create({"id": id, "user_id": 1, "title": f"Doc {id}", "file_path": "x",
+                              "category": AchievementCategory.SPORT, "level": level,
+                              "status": AchievementStatus.PENDING, "created_at": created_at,
+                              "revision_count": revision_count})
+
+    first = await _claim(repo, limit=2, sort="priority")
+    assert [item.id for item in first] == [3, 2]
+    assert first[1].projected_points == 100
+
+    rest = await _claim(repo, after=(first[-1].priority, first[-1].id), limit=10, sort="priority")
+    assert [item.id for item in rest] == [4, 1]
+
+
+@pytest.mark.asyncio
+async def test_search_falls_back_to_ilike_on_sqlite(sqlite_db):
+    sqlite_db.add_all([_get_student(1, EducationLevel.BACHELOR), _get_student(2, EducationLevel.BACHELOR)])
+    sqlite_db.add_all([
+        Achievement(id=1, user_id=1, title="Olympiad diploma", file_path="x", category=AchievementCategory.SCIENCE,
+                    level=AchievementLevel.SCHOOL),
+        Achievement(id=2, user_id=2, title="Marathon", description="City olympiad run", file_path="x",
+                    category=AchievementCategory.SPORT, level=AchievementLevel.SCHOOL),
+        Achievement(id=3, user_id=1, title="Concert", file_path="x", category=AchievementCategory.ART,
+                    level=AchievementLevel.SCHOOL),
+    ])
+    await sqlite_db.commit()
+    repo = AchievementRepository(sqlite_db)
+
+    assert [item.id for item in await repo.search("olympiad")] == [2, 1]
+    assert [item.id for item in await repo.search("olympiad", user_id=1)] == [1]
+
+
+@pytest.mark.asyncio
+async def test_documents_keyset_pages_match_full_order(sqlite_db):
+    sqlite_db.add(_get_student(1, EducationLevel.BACHELOR))
+    start = datetime(2025, 1, 1)
+    levels = [AchievementLevel.SCHOOL, AchievementLevel.FEDERAL, AchievementLevel.REGIONAL]
+    sqlite_db.add_all([
+        Achievement(id=id, user_id=1, title=f"Doc {id}", file_path="x", category=AchievementCategory.SPORT,
+                    level=levels[id % 3], status=AchievementStatus.APPROVED,
+                    created_at=start + timedelta(minutes=id // 2))
+        for id in range(1, 10)
+    ])
+    await sqlite_db.commit()
+    repo = AchievementRepository(sqlite_db)
+
+    for sort_by in ("newest", "oldest", "level"):
+        expected = [item.id for item in await repo.get_all_with_filters(sort_by=sort_by)]
+        keys = repo.document_sort_keys(sort_by)
+
+        pages, after = [], None
+        while True:
+            page = await repo.get_all_with_filters(sort_by=sort_by, after=after, limit=2)
+            pages.extend(item.id for item in page)
+            if len(page) < 2:
+                break
+            after = tuple(getattr(page[-1], column.key) for column, _ in keys)
+
+        assert pages == expected, sort_by
+
+    assert [item.id for item in await repo.get_all_with_filters(sort_by="newest", limit=3)] == [9, 8, 7]
+    assert await repo.estimate_with_filters(search="Doc 1") == 1
+
+
+@pytest.mark.asyncio
+async def test_blob_references_and_duplicates_by_content_hash(sqlite_db):
+    sqlite_db.add_all([_get_student(1, EducationLevel.BACHELOR), _get_student(2, EducationLevel.MASTER)])
+    sqlite_db.add_all([
+        Achievement(id=id, user_id=user_id, title=f"Doc {id}", file_path=path, content_hash=content_hash,
+                    category=AchievementCategory.SPORT, level=AchievementLevel.SCHOOL,
+                    status=AchievementStatus.PENDING, created_at=datetime(2025, 1, 1) + timedelta(minutes=id))
+        for id, user_id, path, content_hash in [
+            (1, 1, "uploads/achievements/ab/ab1.pdf", "ab1"),
+            (2, 2, "uploads/achievements/ab/ab1.pdf", "ab1"),
+            (3, 2, "uploads/achievements/legacy.pdf", "ab1"),
+            (4, 2, "uploads/achievements/other.pdf", None),
+        ]
+    ])
+    await sqlite_db.commit()
+    repo = AchievementRepository(sqlite_db)
+
+    first, second, _, fourth = [await repo.find(id) for id in (1, 2, 3, 4)]
+    duplicates = await repo.duplicates_for([first, fourth])
+    assert {key: [item.id for item in value] for key, value in duplicates.items()} == {1: [2, 3]}
+    assert duplicates[1][0].user.first_name == "Student2"
+
+    await repo.delete(1)
+    files = [(first.file_path, first.content_hash), ("uploads/achievements/gone.pdf", "ab1"), (fourth.file_path, None)]
+    assert await repo.referenced_files(files) == {"uploads/achievements/ab/ab1.pdf"}
+    await repo.delete(2)
+    assert await repo.referenced_files(files) == set()
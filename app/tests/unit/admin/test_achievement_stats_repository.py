@@ -0,0 +1,63 @@
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import select
+
+from app.models.user import Users
+from app.models.achievement import Achievement
+from app.models.daily_achievement_stat import DailyAchievementStat
+from app.models.enums import UserRole, UserStatus, AchievementStatus, AchievementLevel, AchievementCategory, \
+    EducationLevel
+from app.repositories.admin.achievement_stats_repository import AchievementStatsRepository
+
+
+def _get_student(id: int, education_level=EducationLevel.BACHELOR):
+    return Users(id=id, first_name=f"Student{id}", last_name="Test", email=f"s{id}@example.com",
+                 hashed_password="x", role=UserRole.STUDENT, status=UserStatus.ACTIVE,
+                 education_level=education_level)
+
+
+async def _snapshot(db):
+    rows = (await db.execute(select(DailyAchievementStat))).scalars().all()
+    return sorted(
+        (row.day, row.status, row.category, row.education_level, row.created_count, row.changed_count)
+        for row in rows if row.created_count or row.changed_count
+    )
+
+
+@pytest.mark.asyncio
+async def test_incremental_updates_match_rebuild(sqlite_db):
+    sqlite_db.add_all([_get_student(1), _get_student(2, None)])
+    await sqlite_db.commit()
+    stats = AchievementStatsRepository(sqlite_db)
+    week_ago = datetime.now() - timedelta(days=7)
+
+    first = Achievement(id=1, user_id=1, title="A", file_path="x", category=AchievementCategory.SPORT,
+                        level=AchievementLevel.SCHOOL, status=AchievementStatus.PENDING, created_at=week_ago)
+    second = Achievement(id=2, user_id=2, title="B", file_path="x", category=AchievementCategory.SCIENCE,
+                         level=AchievementLevel.SCHOOL, status=AchievementStatus.PENDING)
+    third = Achievement(id=3, user_id=1, title="C", file_path="x", category=AchievementCategory.ART,
+                        level=AchievementLevel.SCHOOL, status=AchievementStatus.PENDING)
+    for item in (first, second, third):
+        await stats.record_created(item.user_id, item.category.value, created_at=item.created_at)
+    sqlite_db.add_all([first, second, third])
+    await sqlite_db.commit()
+
+    await stats.record_transition(first, AchievementStatus.PENDING, 'approved')
+    first.status = AchievementStatus.APPROVED
+    first.updated_at = datetime.now()
+    await stats.record_deleted(third)
+    await sqlite_db.delete(third)
+    await sqlite_db.commit()
+
+    incremental = await _snapshot(sqlite_db)
+    await stats.rebuild()
+    await sqlite_db.commit()
+    assert await _snapshot(sqlite_db) == incremental
+
+    totals = await stats.totals(date.today() - timedelta(days=30))
+    assert (totals.pending, totals.approved, totals.total) == (1, 1, 2)
+    assert (await stats.totals(date.today())).total == 1
+
+    cohorts = await stats.cohorts(date.today() - timedelta(days=30))
+    assert [(c.education_level, c.total_docs, c.pending_docs) for c in cohorts] == [("BACHELOR", 1, 0)]
+    assert [cnt for _, cnt in await stats.daily_created(date.today() - timedelta(days=30))] == [1, 1]
@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+
+from app.infrastructure.redis_client import MemoryRedis
+from app.services.autocomplete_service import AutocompleteService
+
+TITLES = ["Olympiad in math", "Olympiad in physics", "Open championship", "Football cup"]
+
+
+class _Sessions:
+    # Фабрика сессий: запоминает выданные и закрытые, чтобы проверить, чьей сессией пользуется загрузка
+    def __init__(self):
+        self.opened, self.closed = [], []
+
+    @asynccontextmanager
+    async def __call__(self):
+        session = object()
+        self.opened.append(session)
+        try:
+            yield session
+        finally:
+            self.closed.append(session)
+
+
+def _loader(query: str, calls: list, delay: float = 0):
+    async def load(db, limit: int):
+        calls.append((db, limit))
+        await asyncio.sleep(delay)
+        return [{"value": title, "text": title} for title in TITLES if query in title.lower()][:limit]
+
+    return load
+
+
+@pytest.mark.asyncio
+async def test_lookup_caches_exact_query_and_loads_only_limit():
+    sessions = _Sessions()
+    service = AutocompleteService(MemoryRedis(), ttl=30, session_factory=sessions)
+    calls = []
+
+    assert [item["text"] for item in await service.lookup("documents", "O", _loader("o", calls), limit=2)] == TITLES[:2]
+    assert [item["text"] for item in await service.lookup("documents", " o ", _loader("o", calls), limit=2)] == TITLES[:2]
+    assert [limit for _, limit in calls] == [2]
+
+    await service.lookup("users", "o", _loader("o", calls), limit=2)
+    await service.lookup("documents", "olymp", _loader("olymp", calls), limit=2)
+    assert len(calls) == 3
+    assert sessions.closed == sessions.opened == [db for db, _ in calls]
+
+    counters = await service.counters()
+    assert [counters["outcomes"][key]["count"] for key in ("hit", "miss")] == [1, 3]
+    assert counters["hit_rate"] == 0.25
+
+
+@pytest.mark.asyncio
+async def test_identical_queries_coalesce_on_own_session():
+    sessions = _Sessions()
+    service = AutocompleteService(MemoryRedis(), ttl=30, session_factory=sessions)
+    calls = []
+
+    results = await asyncio.gather(*[
+        service.lookup("documents", "olymp", _loader("olymp", calls, delay=0.05), limit=5) for _ in range(3)
+    ])
+
+    assert len(calls) == 1 and calls[0][0] is sessions.opened[0]
+    assert all(result == results[0] for result in results)
+    counters = await service.counters()
+    assert counters["outcomes"]["coalesced"]["count"] == 2
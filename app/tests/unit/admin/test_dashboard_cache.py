@@ -0,0 +1,27 @@
+import pytest
+from datetime import datetime
+
+from app.infrastructure.redis_client import MemoryRedis
+from app.services.dashboard_cache import DashboardCache
+
+
+@pytest.mark.asyncio
+async def test_version_bump_invalidates_and_counters_track_hits():
+    cache = DashboardCache(MemoryRedis(), ttl=60)
+    created_at = datetime(2026, 3, 1, 12, 30)
+    stats = {'total_docs': 3, 'recent_docs': [{'title': 'Doc', 'created_at': created_at}]}
+
+    assert await cache.get('admin', 'week') is None
+    await cache.set('admin', 'week', stats)
+
+    cached = await cache.get('admin', 'week')
+    assert cached['total_docs'] == 3
+    assert cached['recent_docs'][0]['created_at'] == created_at
+    assert await cache.get('admin', 'month') is None
+
+    await cache.invalidate()
+    assert await cache.get('admin', 'week') is None
+
+    counters = await cache.counters()
+    assert (counters['hits'], counters['misses'], counters['version']) == (1, 3, 1)
+    assert counters['hit_rate'] == 0.25
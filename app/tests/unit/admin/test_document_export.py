@@ -0,0 +1,47 @@
+import csv
+import io
+import zipfile
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+from app.models.user import Users
+from app.models.achievement import Achievement
+from app.models.enums import UserRole, UserStatus, AchievementStatus, AchievementLevel, AchievementCategory
+from app.infrastructure.storage import LocalStorage
+from app.services.document_export import iter_documents, stream_documents_zip
+
+
+@pytest.mark.asyncio
+async def test_export_streams_documents_in_batches_with_manifest(sqlite_db, tmp_path):
+    (tmp_path / "uploads").mkdir()
+    for id in (1, 2, 4):
+        (tmp_path / "uploads" / f"{id}.pdf").write_bytes(b"%PDF-" + bytes([id]) * 200_000)
+
+    sqlite_db.add(Users(id=7, first_name="Анна", last_name="Иванова", email="a@example.com", hashed_password="x",
+                        role=UserRole.STUDENT, status=UserStatus.ACTIVE))
+    sqlite_db.add_all([
+        Achievement(id=id, user_id=7, title=f"Doc {id}", file_path=f"uploads/{id}.pdf",
+                    category=AchievementCategory.SPORT, level=AchievementLevel.SCHOOL,
+                    status=AchievementStatus.APPROVED if id != 5 else AchievementStatus.PENDING,
+                    created_at=datetime(2025, 1, 1) + timedelta(minutes=id))
+        for id in range(1, 6)
+    ])
+    await sqlite_db.commit()
+
+    session_factory = async_sessionmaker(bind=sqlite_db.bind, class_=AsyncSession, expire_on_commit=False)
+    batches = iter_documents(session_factory, {"search": "", "status": "approved", "category": "", "level": ""},
+                             "oldest", batch_size=2)
+    chunks = [chunk async for chunk in stream_documents_zip(batches, LocalStorage(root=str(tmp_path)))]
+    assert max(len(chunk) for chunk in chunks) < 200_000
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.namelist() == ["document_1_user_7.pdf", "document_2_user_7.pdf", "document_4_user_7.pdf",
+                                  "manifest.csv"]
+    assert archive.read("document_4_user_7.pdf") == b"%PDF-" + bytes([4]) * 200_000
+
+    rows = list(csv.DictReader(io.StringIO(archive.read("manifest.csv").decode("utf-8-sig"))))
+    assert [(row["id"], row["file"]) for row in rows] == [
+        ("1", "document_1_user_7.pdf"), ("2", "document_2_user_7.pdf"), ("3", ""), ("4", "document_4_user_7.pdf")
+    ]
+    assert rows[2]["note"] and rows[0]["student"] == "Иванова Анна"
@@ -0,0 +1,54 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.infrastructure import file_delivery
+from app.infrastructure.file_delivery import MEDIA_CACHE_CONTROL, file_response
+from app.infrastructure.storage import LocalStorage
+
+
+def _client(tmp_path) -> TestClient:
+    (tmp_path / "uploads").mkdir()
+    (tmp_path / "uploads" / "doc.pdf").write_bytes(b"%PDF-" + b"x" * 95)
+    storage = LocalStorage(root=str(tmp_path))
+    app = FastAPI()
+
+    @app.get("/files/{key:path}")
+    async def show(key: str, request: Request):
+        response = await file_response(request, storage, key, filename="document.pdf",
+                                       media_type="application/pdf", cache_control=MEDIA_CACHE_CONTROL)
+        return response or {"missing": True}
+
+    return TestClient(app)
+
+
+def test_local_delivery_supports_etag_and_range(tmp_path):
+    client = _client(tmp_path)
+
+    response = client.get("/files/uploads/doc.pdf")
+    assert response.status_code == 200 and len(response.content) == 100
+    assert response.headers["cache-control"] == MEDIA_CACHE_CONTROL
+    assert "document.pdf" in response.headers["content-disposition"]
+    etag = response.headers["etag"]
+
+    assert client.get("/files/uploads/doc.pdf", headers={"If-None-Match": f'W/{etag}'}).status_code == 304
+    assert client.get("/files/uploads/doc.pdf", headers={"If-None-Match": '"other"'}).status_code == 200
+    assert client.get("/files/uploads/doc.pdf",
+                      headers={"If-Modified-Since": response.headers["last-modified"]}).status_code == 304
+
+    partial = client.get("/files/uploads/doc.pdf", headers={"Range": "bytes=0-4"})
+    assert partial.status_code == 206 and partial.content == b"%PDF-"
+
+    assert client.get("/files/uploads/missing.pdf").json() == {"missing": True}
+
+
+def test_proxy_delivery_only_sets_headers(tmp_path, monkeypatch):
+    client = _client(tmp_path)
+
+    monkeypatch.setattr(file_delivery, "FILE_DELIVERY", "accel")
+    response = client.get("/files/uploads/doc.pdf")
+    assert response.headers["x-accel-redirect"] == "/protected/uploads/doc.pdf"
+    assert response.content == b""
+
+    monkeypatch.setattr(file_delivery, "FILE_DELIVERY", "sendfile")
+    response = client.get("/files/uploads/doc.pdf")
+    assert response.headers["x-sendfile"] == str(tmp_path / "uploads" / "doc.pdf")
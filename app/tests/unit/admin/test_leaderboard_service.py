@@ -0,0 +1,73 @@
+import pytest
+import pytest_asyncio
+
+from app.infrastructure.redis_client import MemoryRedis
+from app.models.user import Users
+from app.models.user_score import UserScore
+from app.models.enums import UserRole, UserStatus, EducationLevel
+from app.services.leaderboard_service import LeaderboardService, encode_score, decode_score
+
+
+def _get_student(id: int, education_level=EducationLevel.BACHELOR, course: int = 1):
+    return Users(id=id, first_name=f"Student{id}", last_name="Test", email=f"s{id}@example.com",
+                 hashed_password="x", role=UserRole.STUDENT, status=UserStatus.ACTIVE,
+                 education_level=education_level, course=course)
+
+
+@pytest_asyncio.fixture
+async def board(sqlite_db):
+    sqlite_db.add_all([
+        _get_student(1),
+        _get_student(2),
+        _get_student(3, EducationLevel.MASTER, 2),
+        _get_student(4),
+    ])
+    sqlite_db.add_all([
+        UserScore(user_id=1, total_points=40, approved_count=1),
+        UserScore(user_id=2, total_points=100, approved_count=2),
+        UserScore(user_id=3, total_points=75, approved_count=1),
+    ])
+    await sqlite_db.commit()
+    return LeaderboardService(sqlite_db, MemoryRedis())
+
+
+def test_score_encoding_roundtrip():
+    assert decode_score(encode_score(175, 3)) == (175, 3)
+    assert encode_score(40, 2) > encode_score(40, 1)
+
+
+@pytest.mark.asyncio
+async def test_rank_is_built_lazily_per_cohort(board):
+    assert await board.rank(2) == 1
+    assert await board.rank(3) == 2
+    assert await board.rank(4) == 4
+    assert await board.rank(3, EducationLevel.BACHELOR.value, 1) == 0
+    assert await board.rank(1, EducationLevel.BACHELOR.value, 1) == 2
+    assert await board.size(EducationLevel.BACHELOR.value) == 3
+    assert await board.score(2) == (100, 2)
+
+
+@pytest.mark.asyncio
+async def test_window_top_and_users(board):
+    assert [row[0] for row in await board.top(2)] == [2, 3]
+    assert await board.window(2, 3) == [(1, 40, 1, 3), (4, 0, 0, 4)]
+    assert [(user.id, rank) for user, _, _, rank in await board.with_users(await board.around(3, 1))] == \
+        [(2, 1), (3, 2), (1, 3)]
+
+
+@pytest.mark.asyncio
+async def test_sync_user_moves_member(board, sqlite_db):
+    await board.rank(1)
+
+    score = await sqlite_db.get(UserScore, 1)
+    score.total_points = 500
+    await sqlite_db.commit()
+    await board.sync_user(1)
+    assert await board.rank(1) == 1
+
+    user = await sqlite_db.get(Users, 2)
+    user.role = UserRole.MODERATOR
+    await sqlite_db.commit()
+    await board.sync_user(2)
+    assert await board.rank(2) == 0
+    assert await board.size() == 3
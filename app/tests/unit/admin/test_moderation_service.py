@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import select
+
+from app.models.user import Users
+from app.models.achievement import Achievement
+from app.models.notification import Notification
+from app.models.user_score import UserScore
+from app.models.enums import UserRole, UserStatus, AchievementStatus, AchievementLevel, AchievementCategory, \
+    EducationLevel
+from app.schemas.admin.achievements import ModerationDecision
+from app.services.moderation_service import BulkModerationService
+
+
+def _get_user(id: int, role=UserRole.STUDENT, education_level=EducationLevel.BACHELOR):
+    return Users(id=id, first_name=f"User{id}", last_name="Test", email=f"u{id}@example.com",
+                 hashed_password="x", role=role, status=UserStatus.ACTIVE, education_level=education_level)
+
+
+def _get_achievement(id: int, user_id: int, level=AchievementLevel.SCHOOL):
+    return Achievement(id=id, user_id=user_id, title=f"Doc {id}", file_path="x", category=AchievementCategory.SPORT,
+                       level=level, status=AchievementStatus.PENDING)
+
+
+@pytest.mark.asyncio
+async def test_bulk_apply_reports_per_item(sqlite_db):
+    moderator = _get_user(1, UserRole.MODERATOR)
+    sqlite_db.add_all([moderator, _get_user(2), _get_user(3, education_level=EducationLevel.MASTER)])
+    sqlite_db.add_all([
+        _get_achievement(1, 2, AchievementLevel.REGIONAL),
+        _get_achievement(2, 2),
+        _get_achievement(3, 3),
+    ])
+    await sqlite_db.commit()
+
+    results = await BulkModerationService(sqlite_db).apply(moderator, [
+        ModerationDecision(id=1, status=AchievementStatus.APPROVED),
+        ModerationDecision(id=2, status=AchievementStatus.REVISION, reason="Нет печати"),
+        ModerationDecision(id=3, status=AchievementStatus.APPROVED),
+        ModerationDecision(id=4, status=AchievementStatus.REJECTED),
+        ModerationDecision(id=5, status=AchievementStatus.PENDING),
+    ])
+    await sqlite_db.commit()
+
+    assert [(item["id"], item["ok"], item.get("error")) for item in results] == [
+        (1, True, None), (2, True, None), (3, False, "forbidden"), (4, False, "not_found"), (5, False, "invalid_status")
+    ]
+
+    rows = (await sqlite_db.execute(
+        select(Achievement.id, Achievement.status, Achievement.points, Achievement.rejection_reason)
+        .order_by(Achievement.id)
+    )).all()
+    assert [tuple(row) for row in rows] == [
+        (1, AchievementStatus.APPROVED, 40, None),
+        (2, AchievementStatus.REVISION, 0, "Нет печати"),
+        (3, AchievementStatus.PENDING, 0, None),
+    ]
+
+    notifications = (await sqlite_db.execute(select(Notification.user_id))).scalars().all()
+    assert notifications == [2, 2]
+
+    score = await sqlite_db.get(UserScore, 2)
+    assert (score.total_points, score.approved_count) == (40, 1)
+
+
+@pytest.mark.asyncio
+async def test_repeated_decision_is_not_applied_twice(sqlite_db):
+    moderator = _get_user(1, UserRole.MODERATOR)
+    sqlite_db.add_all([moderator, _get_user(2), _get_achievement(1, 2)])
+    await sqlite_db.commit()
+
+    service = BulkModerationService(sqlite_db)
+    for _ in range(2):
+        results = await service.apply(moderator, [ModerationDecision(id=1, status=AchievementStatus.APPROVED)])
+        await sqlite_db.commit()
+
+    assert [(item["ok"], item.get("error")) for item in results] == [(False, "unchanged")]
+    assert len((await sqlite_db.execute(select(Notification.id))).scalars().all()) == 1
+    score = await sqlite_db.get(UserScore, 2)
+    assert (score.total_points, score.approved_count) == (10, 1)
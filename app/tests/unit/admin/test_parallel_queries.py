@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.infrastructure.database import Base
+from app.infrastructure.database.parallel import run_parallel
+from app.models.user import Users
+from app.models.enums import UserRole, UserStatus
+
+
+@pytest_asyncio.fixture
+async def session_maker(tmp_path):
+    # Файловая БД: каждая параллельная сессия открывает своё соединение
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'parallel.sqlite3'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    maker = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    async with maker() as session:
+        session.add_all([
+            Users(id=id, first_name=f"User{id}", last_name="Test", email=f"u{id}@example.com",
+                  hashed_password="x", role=UserRole.STUDENT, status=UserStatus.ACTIVE)
+            for id in range(1, 4)
+        ])
+        await session.commit()
+
+    yield maker
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_results_keep_query_order(session_maker):
+    count, users, one = await run_parallel(
+        lambda session: session.scalar(select(func.count(Users.id))),
+        lambda session: session.scalars(select(Users).order_by(Users.id.desc()).limit(2)),
+        lambda session: session.scalar(text("SELECT 1")),
+        session_maker=session_maker
+    )
+
+    assert count == 3
+    assert [user.id for user in users.all()] == [3, 2]
+    assert one == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_timeout(session_maker):
+    async def slow(session):
+        await asyncio.sleep(1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await run_parallel(slow, lambda session: session.scalar(text("SELECT 1")),
+                           timeout=0.05, session_maker=session_maker)
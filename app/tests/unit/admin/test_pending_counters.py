@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.infrastructure.database import Base
+from app.infrastructure.redis_client import MemoryRedis
+from app.models.user import Users
+from app.models.enums import UserRole, UserStatus, AchievementStatus
+from app.services.pending_counters import PendingCounters, is_pending, is_user_pending
+
+
+@pytest_asyncio.fixture
+async def session_maker(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'counters.sqlite3'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    maker = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    async with maker() as session:
+        session.add_all([
+            Users(id=id, first_name=f"User{id}", last_name="Test", email=f"u{id}@example.com",
+                  hashed_password="x", role=UserRole.STUDENT, status=status)
+            for id, status in [(1, UserStatus.PENDING), (2, UserStatus.PENDING), (3, UserStatus.ACTIVE)]
+        ])
+        await session.commit()
+
+    yield maker
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_recount_runs_once_for_concurrent_readers(session_maker):
+    recounts = 0
+
+    class CountingCounters(PendingCounters):
+        async def recount(self):
+            nonlocal recounts
+            recounts += 1
+            await asyncio.sleep(0.1)
+            return await super().recount()
+
+    counters = CountingCounters(MemoryRedis(), session_maker=session_maker)
+    results = await asyncio.gather(*(counters.get() for _ in range(5)))
+
+    assert recounts == 1
+    assert results == [(2, 0)] * 5
+
+
+@pytest.mark.asyncio
+async def test_adjust_keeps_missing_counters_missing(session_maker):
+    redis = MemoryRedis()
+    counters = PendingCounters(redis, session_maker=session_maker)
+
+    await counters.adjust(users=1)
+    assert await redis.get(PendingCounters.USERS_KEY) is None
+
+    await counters.get()
+    await counters.adjust(users=-1, achievements=2)
+    assert await counters.get() == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_adjust_drops_counter_that_expired_before_increment(session_maker):
+    redis = MemoryRedis()
+    counters = PendingCounters(redis, session_maker=session_maker)
+    await counters.get()
+
+    # Ключ истёк между чтением и INCRBY: пересозданное значение без TTL не должно остаться навсегда
+    redis.expires[PendingCounters.USERS_KEY] = 0
+    await counters.adjust(users=1, achievements=1)
+
+    assert await redis.get(PendingCounters.USERS_KEY) is None
+    assert await redis.get(PendingCounters.ACHIEVEMENTS_KEY) == "1"
+    assert await redis.ttl(PendingCounters.ACHIEVEMENTS_KEY) > 0
+    assert (await counters.get())[0] == 2
+
+
+def test_pending_checks_use_their_own_enum():
+    assert is_user_pending(UserStatus.PENDING) and is_user_pending("PENDING")
+    assert not is_user_pending(UserStatus.ACTIVE)
+    assert is_pending(AchievementStatus.PENDING) and not is_pending(AchievementStatus.APPROVED)
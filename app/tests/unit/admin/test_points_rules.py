@@ -0,0 +1,76 @@
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import select
+
+from app.infrastructure.redis_client import MemoryRedis
+from app.models.user import Users
+from app.models.achievement import Achievement
+from app.models.user_score import UserScore
+from app.models.enums import UserRole, UserStatus, AchievementStatus, AchievementLevel, AchievementCategory
+from app.repositories.admin.points_rules_repository import PointsRulesRepository
+from app.services.points_calculator import DEFAULT_RULES
+from app.services.points_rules_service import PointsRecalculator, load_points_rules, reset_points_rules_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_rules_cache():
+    reset_points_rules_cache()
+    yield
+    reset_points_rules_cache()
+
+
+@pytest.mark.asyncio
+async def test_active_version_respects_effective_from(sqlite_db):
+    repo = PointsRulesRepository(sqlite_db)
+    assert await load_points_rules(sqlite_db) is DEFAULT_RULES
+
+    await repo.create_version({"SCHOOL": 12}, {"SCIENCE": 1.5})
+    await repo.create_version({"SCHOOL": 50}, {}, date.today() + timedelta(days=30))
+    await sqlite_db.commit()
+
+    reset_points_rules_cache()
+    rules = await load_points_rules(sqlite_db)
+    assert rules.version == 1
+    assert rules.points(AchievementLevel.SCHOOL, AchievementCategory.SCIENCE) == 18
+    assert rules.points("Школьный", "Спорт") == 12
+    assert rules.points(AchievementLevel.REGIONAL, AchievementCategory.SPORT) == 40
+
+
+@pytest.mark.asyncio
+async def test_recompute_rescores_and_rebuilds_scores(sqlite_db):
+    sqlite_db.add(Users(id=1, first_name="Student", last_name="Test", email="s1@example.com", hashed_password="x",
+                        role=UserRole.STUDENT, status=UserStatus.ACTIVE))
+    sqlite_db.add_all([
+        Achievement(id=1, user_id=1, title="A", file_path="x", category=AchievementCategory.SCIENCE,
+                    level=AchievementLevel.REGIONAL, status=AchievementStatus.APPROVED, points=40,
+                    updated_at=datetime(2024, 1, 1)),
+        Achievement(id=2, user_id=1, title="B", file_path="x", category=AchievementCategory.SCIENCE,
+                    level=AchievementLevel.SCHOOL, status=AchievementStatus.PENDING, projected_points=10,
+                    priority=-5.0),
+        Achievement(id=3, user_id=1, title="C", file_path="x", category=AchievementCategory.SCIENCE,
+                    level=AchievementLevel.SCHOOL, status=AchievementStatus.ARCHIVED, points=10,
+                    projected_points=10),
+    ])
+    await sqlite_db.commit()
+
+    version = await PointsRulesRepository(sqlite_db).create_version({}, {"SCIENCE": 2})
+    await sqlite_db.commit()
+
+    processed = await PointsRecalculator(sqlite_db, MemoryRedis(), chunk_size=1).run(version)
+    assert processed == 2
+
+    rows = (await sqlite_db.execute(
+        select(Achievement.id, Achievement.points, Achievement.projected_points, Achievement.priority,
+               Achievement.updated_at)
+        .order_by(Achievement.id)
+        .execution_options(populate_existing=True)
+    )).all()
+    assert [(row.id, row.points, row.projected_points) for row in rows] == [(1, 80, 80), (2, 0, 20), (3, 10, 10)]
+    assert rows[1].priority == pytest.approx(5.0)
+    # Дата одобрения не сдвигается пересчётом
+    assert rows[0].updated_at.replace(tzinfo=None) == datetime(2024, 1, 1)
+
+    score = await sqlite_db.get(UserScore, 1, populate_existing=True)
+    assert score.total_points == 80
+
+    assert await PointsRecalculator(sqlite_db, MemoryRedis()).run(version) == 0
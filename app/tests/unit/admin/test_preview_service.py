@@ -0,0 +1,59 @@
+import fitz
+import io
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+from app.infrastructure import storage
+from app.infrastructure.storage import LocalStorage
+from app.services import preview_service
+from app.services.preview_service import generate_preview, preview_key, render_preview
+
+
+@pytest.fixture
+def upload_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_storage", LocalStorage(root=str(tmp_path)))
+    (tmp_path / "uploads" / "achievements").mkdir(parents=True)
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_preview_is_stored_next_to_original_once(upload_root, monkeypatch):
+    (upload_root / "uploads/achievements/ab.pdf").write_bytes(b"%PDF-1.7")
+    calls = []
+
+    def fake_render(path, ext, size=480):
+        with open(path, "rb") as source:
+            calls.append((source.read(), ext))
+        return b"jpeg"
+
+    monkeypatch.setattr(preview_service, "render_preview", fake_render)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert await generate_preview("uploads/achievements/ab.pdf", executor) == "uploads/achievements/ab.preview.jpg"
+        assert await generate_preview("uploads/achievements/ab.pdf", executor) == "uploads/achievements/ab.preview.jpg"
+        assert await generate_preview("uploads/achievements/missing.pdf", executor) is None
+
+    assert calls == [(b"%PDF-1.7", "pdf")]
+    assert (upload_root / "uploads/achievements/ab.preview.jpg").read_bytes() == b"jpeg"
+    assert await generate_preview("uploads/achievements/ab.docx") is None
+
+
+def test_render_image_preview_is_downscaled_jpeg(tmp_path):
+    source = tmp_path / "source.png"
+    Image.new("RGBA", (2000, 1000), (255, 0, 0, 128)).save(source, "PNG")
+
+    preview = Image.open(io.BytesIO(render_preview(str(source), "png", size=200)))
+    assert preview.format == "JPEG" and preview.size == (200, 100)
+    assert preview_key("uploads/achievements/ab/abc.png") == "uploads/achievements/ab/abc.preview.jpg"
+
+
+def test_render_pdf_preview_from_first_page(tmp_path):
+    source = tmp_path / "source.pdf"
+    document = fitz.open()
+    document.new_page(width=600, height=800).insert_text((72, 72), "Диплом")
+    document.new_page(width=800, height=600)
+    document.save(source)
+
+    preview = Image.open(io.BytesIO(render_preview(str(source), "pdf", size=200)))
+    assert preview.format == "JPEG" and preview.size == (150, 200)
@@ -0,0 +1,64 @@
+import pytest
+from datetime import datetime, timedelta
+
+from app.infrastructure.redis_client import MemoryRedis
+from app.models.user import Users
+from app.models.achievement import Achievement
+from app.models.user_score import UserScore
+from app.models.enums import UserRole, UserStatus, AchievementStatus, AchievementLevel, AchievementCategory
+from app.repositories.admin.ranking_repository import RankingRepository
+from app.services.leaderboard_service import LeaderboardService
+
+
+def _get_student(id: int):
+    return Users(id=id, first_name=f"Student{id}", last_name="Test", email=f"s{id}@example.com",
+                 hashed_password="x", role=UserRole.STUDENT, status=UserStatus.ACTIVE)
+
+
+@pytest.mark.asyncio
+async def test_engine_window_and_around_ranks_agree_on_ties(sqlite_db):
+    sqlite_db.add_all([_get_student(id) for id in range(1, 7)])
+    sqlite_db.add_all([
+        UserScore(user_id=1, total_points=70, approved_count=1),
+        UserScore(user_id=2, total_points=50, approved_count=2),
+        UserScore(user_id=3, total_points=50, approved_count=2),
+        UserScore(user_id=4, total_points=50, approved_count=1),
+        UserScore(user_id=5, total_points=10, approved_count=1),
+    ])
+    await sqlite_db.commit()
+
+    board = LeaderboardService(sqlite_db, MemoryRedis())
+    around = {row[0]: row[3] for row in await board.around(3, 10)}
+    # Окно, начатое посреди группы равных, получает место первого из них
+    page = {row[0]: row[3] for row in await board.window(2, 5)}
+
+    expected = {1: 1, 2: 2, 3: 2, 4: 4, 5: 5, 6: 6}
+    for user_id, rank in expected.items():
+        assert await board.rank(user_id) == rank
+        assert around[user_id] == rank
+        if user_id in page:
+            assert page[user_id] == rank
+
+    assert await board.rank(999) == 0
+
+
+@pytest.mark.asyncio
+async def test_period_rank(sqlite_db):
+    sqlite_db.add_all([_get_student(1), _get_student(2)])
+    old = datetime.now() - timedelta(days=60)
+    sqlite_db.add_all([
+        Achievement(id=1, user_id=1, title="A", file_path="x", category=AchievementCategory.SPORT,
+                    level=AchievementLevel.SCHOOL, status=AchievementStatus.APPROVED, points=10,
+                    updated_at=datetime.now()),
+        Achievement(id=2, user_id=2, title="B", file_path="x", category=AchievementCategory.SPORT,
+                    level=AchievementLevel.SCHOOL, status=AchievementStatus.APPROVED, points=100, updated_at=old),
+        Achievement(id=3, user_id=2, title="C", file_path="x", category=AchievementCategory.SPORT,
+                    level=AchievementLevel.SCHOOL, status=AchievementStatus.APPROVED, points=5,
+                    updated_at=datetime.now()),
+    ])
+    await sqlite_db.commit()
+
+    ranking = RankingRepository(sqlite_db)
+    since = datetime.now() - timedelta(days=7)
+    assert await ranking.period_rank(1, since) == 1
+    assert await ranking.period_rank(2, since) == 2
@@ -0,0 +1,68 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from app.infrastructure.redis_client import MemoryRedis
+from app.models.user import Users
+from app.models.achievement import Achievement
+from app.models.season_result import SeasonResult
+from app.models.user_score import UserScore
+from app.models.enums import UserRole, UserStatus, AchievementStatus, AchievementLevel, AchievementCategory, \
+    SeasonJobStatus
+from app.repositories.admin.season_job_repository import SeasonJobRepository
+from app.services import season_service
+from app.services.season_service import SeasonCloser
+from sqlalchemy import select
+
+
+def _get_student(id: int):
+    return Users(id=id, first_name=f"Student{id}", last_name="Test", email=f"s{id}@example.com",
+                 hashed_password="x", role=UserRole.STUDENT, status=UserStatus.ACTIVE)
+
+
+def _get_achievement(id: int, user_id: int, status: AchievementStatus, points: int):
+    return Achievement(id=id, user_id=user_id, title=f"Doc {id}", file_path="uploads/achievements/x.pdf",
+                       category=AchievementCategory.SPORT, level=AchievementLevel.SCHOOL,
+                       status=status, points=points)
+
+
+@pytest.mark.asyncio
+async def test_close_season_ranks_archives_and_releases_lock(sqlite_db, monkeypatch):
+    monkeypatch.setattr(season_service, "ARCHIVE_CHUNK_SIZE", 2)
+    sqlite_db.add_all([_get_student(1), _get_student(2), _get_student(3)])
+    sqlite_db.add_all([
+        _get_achievement(1, 1, AchievementStatus.APPROVED, 50),
+        _get_achievement(2, 2, AchievementStatus.APPROVED, 30),
+        _get_achievement(3, 2, AchievementStatus.APPROVED, 20),
+        _get_achievement(4, 3, AchievementStatus.PENDING, 0),
+    ])
+    # Одобрен уже после снимка итогов
+    late = _get_achievement(5, 3, AchievementStatus.APPROVED, 10)
+    late.updated_at = datetime.now(timezone.utc) + timedelta(hours=1)
+    sqlite_db.add(late)
+    sqlite_db.add_all([
+        UserScore(user_id=1, total_points=50, approved_count=1),
+        UserScore(user_id=2, total_points=50, approved_count=2),
+    ])
+    await sqlite_db.commit()
+
+    jobs = SeasonJobRepository(sqlite_db)
+    job_id = (await jobs.create("Осень", 1)).id
+    assert await jobs.create("Осень", 1) is None
+
+    await SeasonCloser(sqlite_db, MemoryRedis()).run(job_id)
+
+    job = await jobs.find(job_id)
+    await sqlite_db.refresh(job)
+    assert job.status == SeasonJobStatus.COMPLETED
+    assert (job.processed, job.total, job.lock_key) == (3, 3, None)
+
+    results = (await sqlite_db.execute(select(SeasonResult.user_id, SeasonResult.rank).order_by(SeasonResult.user_id))).all()
+    # При равных баллах выше тот, у кого больше документов, как в живом рейтинге
+    assert results == [(1, 2), (2, 1)]
+
+    statuses = (await sqlite_db.execute(select(Achievement.status).order_by(Achievement.id))).scalars().all()
+    assert statuses == [AchievementStatus.ARCHIVED] * 3 + [AchievementStatus.PENDING, AchievementStatus.APPROVED]
+    scores = (await sqlite_db.execute(select(UserScore.user_id, UserScore.total_points))).all()
+    assert scores == [(3, 10)]
+
+    assert await jobs.create("Весна", 1) is not None
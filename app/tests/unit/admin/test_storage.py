@@ -0,0 +1,75 @@
+import pytest
+
+from app.infrastructure import storage
+from app.infrastructure.storage import S3Storage
+
+
+class FakeS3Client:
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.calls = []
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.calls.append("put_object")
+        self.objects[Key] = Body
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        self.calls.append("create_multipart_upload")
+        self.uploads["u1"] = {}
+        return {"UploadId": "u1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.calls.append("upload_part")
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": f"e{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append("complete_multipart_upload")
+        parts = self.uploads.pop(UploadId)
+        self.objects[Key] = b"".join(parts[part["PartNumber"]] for part in MultipartUpload["Parts"])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append("abort_multipart_upload")
+        self.uploads.pop(UploadId)
+
+    def delete_objects(self, Bucket, Delete):
+        self.calls.append(("delete_objects", len(Delete["Objects"])))
+        for item in Delete["Objects"]:
+            self.objects.pop(item["Key"], None)
+        return {}
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+async def _failing_chunks():
+    yield b"a" * 8
+    yield b"b" * 8
+    raise ValueError("too large")
+
+
+@pytest.mark.asyncio
+async def test_s3_multipart_upload_abort_and_batch_delete(monkeypatch):
+    monkeypatch.setattr(storage, "S3_PART_SIZE", 10)
+    monkeypatch.setattr(storage, "S3_DELETE_BATCH", 2)
+    client = FakeS3Client()
+    s3 = S3Storage(bucket="docs", client=client)
+
+    await s3.save("small.pdf", _chunks(b"abc"))
+    assert client.objects["small.pdf"] == b"abc"
+
+    await s3.save("big.pdf", _chunks(b"a" * 6, b"b" * 6, b"c" * 6, b"d" * 3))
+    assert client.objects["big.pdf"] == b"a" * 6 + b"b" * 6 + b"c" * 6 + b"d" * 3
+    assert client.calls.count("upload_part") == 2
+
+    with pytest.raises(ValueError):
+        await s3.save("broken.pdf", _failing_chunks())
+    assert "abort_multipart_upload" in client.calls
+    assert "broken.pdf" not in client.objects and client.uploads == {}
+
+    assert await s3.delete(["small.pdf", None, "big.pdf", "missing.pdf"]) == 3
+    assert [call for call in client.calls if isinstance(call, tuple)] == [("delete_objects", 2), ("delete_objects", 1)]
+    assert client.objects == {}
@@ -0,0 +1,90 @@
+import hashlib
+import io
+import os
+import pytest
+from fastapi import UploadFile
+
+from app.infrastructure import storage
+from app.infrastructure.storage import LocalStorage
+from app.models.user import Users
+from app.models.enums import UserRole, UserStatus, AchievementStatus
+from app.repositories.admin.achievement_repository import AchievementRepository
+from app.services.admin.achievement_service import AchievementService
+from app.services.upload_service import save_upload, save_blob, remove_upload, IMAGE_SIGNATURES
+
+PDF = b'%PDF-1.7\n' + b'x' * 200_000
+
+
+@pytest.fixture
+def upload_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_storage", LocalStorage(root=str(tmp_path)))
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_save_upload_streams_and_renames(upload_root):
+    path = await save_upload(UploadFile(io.BytesIO(PDF)), "uploads/achievements", lambda ext: f"doc.{ext}", 1024 * 1024)
+
+    assert path == "uploads/achievements/doc.pdf"
+    assert (upload_root / path).read_bytes() == PDF
+    assert os.listdir(upload_root / "uploads/achievements") == ["doc.pdf"]
+
+    assert await remove_upload(path, None) == 1
+    assert await remove_upload(path) == 0
+
+
+@pytest.mark.asyncio
+async def test_save_upload_rejects_signature_and_size_without_leftovers(upload_root):
+    with pytest.raises(ValueError, match="подписи"):
+        await save_upload(UploadFile(io.BytesIO(b'GIF89a' + b'x' * 100)), "uploads/avatars", lambda ext: f"a.{ext}",
+                          1024, signatures=IMAGE_SIGNATURES)
+
+    # Размер заранее неизвестен: лимит срабатывает во время записи
+    with pytest.raises(ValueError, match="слишком большой"):
+        await save_upload(UploadFile(io.BytesIO(PDF)), "uploads/achievements", lambda ext: f"doc.{ext}", 100_000)
+    assert os.listdir(upload_root / "uploads/achievements") == []
+
+    webp = b'RIFF\x00\x00\x00\x00WEBPVP8 ' + b'x' * 10
+    assert await save_upload(UploadFile(io.BytesIO(webp)), "uploads/avatars", lambda ext: f"a.{ext}", 1024,
+                             signatures=IMAGE_SIGNATURES) == "uploads/avatars/a.webp"
+
+
+@pytest.mark.asyncio
+async def test_save_blob_names_file_by_content_and_stores_duplicates_once(upload_root):
+    digest = hashlib.sha256(PDF).hexdigest()
+
+    first = await save_blob(UploadFile(io.BytesIO(PDF)), "uploads/achievements", 1024 * 1024)
+    second = await save_blob(UploadFile(io.BytesIO(PDF)), "uploads/achievements", 1024 * 1024)
+
+    assert first == second == (f"uploads/achievements/{digest[:2]}/{digest}.pdf", digest)
+    assert (upload_root / first[0]).read_bytes() == PDF
+    assert os.listdir(upload_root / "uploads/achievements" / digest[:2]) == [f"{digest}.pdf"]
+    assert os.listdir(upload_root / "uploads/achievements/incoming") == []
+
+
+@pytest.mark.asyncio
+async def test_failed_create_removes_unreferenced_blob(upload_root, sqlite_db):
+    sqlite_db.add(Users(id=1, first_name="Student", last_name="Test", email="s1@example.com", hashed_password="x",
+                        role=UserRole.STUDENT, status=UserStatus.ACTIVE))
+    await sqlite_db.commit()
+    service = AchievementService(AchievementRepository(sqlite_db))
+
+    staging, file_path, content_hash = await service.stage_file(UploadFile(io.BytesIO(PDF)))
+    assert not (upload_root / file_path).exists()
+    with pytest.raises(Exception):
+        try:
+            # title NOT NULL: строка не вставляется уже после публикации блоба
+            await service.create({"user_id": 1, "title": None, "file_path": file_path, "content_hash": content_hash,
+                                  "status": AchievementStatus.PENDING}, staging=staging)
+        except Exception:
+            await service.discard_file(staging, file_path, content_hash)
+            raise
+
+    assert not (upload_root / file_path).exists()
+    assert os.listdir(upload_root / "uploads/achievements/incoming") == []
+
+    staging, file_path, content_hash = await service.stage_file(UploadFile(io.BytesIO(PDF)))
+    await service.create({"user_id": 1, "title": "Doc", "file_path": file_path, "content_hash": content_hash,
+                          "status": AchievementStatus.PENDING}, staging=staging)
+    await service.release_files([(file_path, content_hash)])
+    assert (upload_root / file_path).read_bytes() == PDF
@@ -0,0 +1,36 @@
+import pytest
+
+from app.models.user import Users
+from app.models.enums import UserRole, UserStatus
+from app.repositories.admin.user_repository import UserRepository
+
+
+def _get_user(id: int, first_name: str, last_name: str, email: str, phone_number: str = None):
+    return Users(id=id, first_name=first_name, last_name=last_name, email=email, phone_number=phone_number,
+                 hashed_password="x", role=UserRole.STUDENT, status=UserStatus.ACTIVE)
+
+
+@pytest.mark.asyncio
+async def test_suggest_matches_any_field_on_sqlite(sqlite_db):
+    sqlite_db.add_all([
+        _get_user(1, "Ivan", "Petrov", "ivan@example.com", "+79990001122"),
+        _get_user(2, "Anna", "Ivanova", "anna@example.com"),
+        _get_user(3, "Oleg", "Sidorov", "o_leg@example.com"),
+    ])
+    await sqlite_db.commit()
+    repo = UserRepository(sqlite_db)
+
+    assert [user.id for user in await repo.suggest("IVAN")] == [2, 1]
+    assert [user.id for user in await repo.suggest("0001122")] == [1]
+    assert [user.id for user in await repo.suggest("ivan petrov")] == [1]
+    # % и _ ищутся как обычные символы
+    assert [user.id for user in await repo.suggest("o_l")] == [3]
+    assert await repo.suggest("%") == []
+    assert [user.id for user in await repo.get({"query": "sidorov"})] == [3]
+
+
+def test_search_expression_matches_trigram_index():
+    from app.migrations.versions.add_users_trigram_search import SEARCH_TEXT_SQL
+    from app.models.user import search_text_sql
+
+    assert search_text_sql() == SEARCH_TEXT_SQL
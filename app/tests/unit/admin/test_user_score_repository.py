@@ -0,0 +1,62 @@
+import pytest
+
+from app.models.user import Users
+from app.models.achievement import Achievement
+from app.models.user_score import UserScore
+from app.models.enums import UserRole, UserStatus, AchievementStatus, AchievementLevel, AchievementCategory
+from app.repositories.admin.user_score_repository import UserScoreRepository
+
+
+def _get_student(id: int):
+    return Users(id=id, first_name=f"Student{id}", last_name="Test", email=f"s{id}@example.com",
+                 hashed_password="x", role=UserRole.STUDENT, status=UserStatus.ACTIVE)
+
+
+def _get_achievement(id: int, user_id: int, status: AchievementStatus, points: int):
+    return Achievement(id=id, user_id=user_id, title=f"Doc {id}", file_path="uploads/achievements/x.pdf",
+                       category=AchievementCategory.SPORT, level=AchievementLevel.SCHOOL,
+                       status=status, points=points)
+
+
+@pytest.mark.asyncio
+async def test_apply_transition_counts_only_approved(sqlite_db):
+    sqlite_db.add(_get_student(1))
+    await sqlite_db.commit()
+    repo = UserScoreRepository(sqlite_db)
+
+    await repo.apply_transition(1, AchievementStatus.PENDING, 0, AchievementStatus.APPROVED, 40)
+    await repo.apply_transition(1, AchievementStatus.PENDING, 0, 'approved', 10)
+    await repo.apply_transition(1, AchievementStatus.PENDING, 0, AchievementStatus.REJECTED, 0)
+    await sqlite_db.commit()
+
+    score = await sqlite_db.get(UserScore, 1, populate_existing=True)
+    assert score.total_points == 50
+    assert score.approved_count == 2
+
+    await repo.apply_transition(1, AchievementStatus.APPROVED, 40, None, 0)
+    await sqlite_db.commit()
+
+    score = await sqlite_db.get(UserScore, 1, populate_existing=True)
+    assert score.total_points == 10
+    assert score.approved_count == 1
+
+
+@pytest.mark.asyncio
+async def test_find_drift_and_rebuild(sqlite_db):
+    sqlite_db.add_all([_get_student(1), _get_student(2)])
+    sqlite_db.add_all([
+        _get_achievement(1, 1, AchievementStatus.APPROVED, 40),
+        _get_achievement(2, 1, AchievementStatus.PENDING, 0),
+        _get_achievement(3, 2, AchievementStatus.APPROVED, 20),
+    ])
+    sqlite_db.add(UserScore(user_id=1, total_points=40, approved_count=1))
+    await sqlite_db.commit()
+    repo = UserScoreRepository(sqlite_db)
+
+    drift = await repo.find_drift()
+    assert [(row.user_id, row.stored_points, row.actual_points) for row in drift] == [(2, 0, 20)]
+
+    await repo.rebuild()
+    await sqlite_db.commit()
+
+    assert await repo.find_drift() == []
@@ -12,6 +12,9 @@ import secrets
 from dotenv import load_dotenv
 
 from app.infrastructure.database import engine, Base
+from app.services.season_service import resume_stale_season_jobs
+from app.services.preview_service import shutdown_previews
+from app.middlewares.admin_middleware import GlobalContextMiddleware
 
 from app.routers.admin.auth import router as admin_auth_router
 from app.routers.admin.dashboard import router as admin_dashboard_router
@@ -22,6 +25,7 @@ from app.routers.admin.moderation import router as admin_moderation_router
 from app.routers.admin.documents import router as admin_documents_router
 from app.routers.admin.notifications import router as admin_notifications_router
 from app.routers.admin.leaderboard import router as admin_leaderboard_router
+from app.routers.admin.media import router as admin_media_router
 from app.routers.admin.admin import public_router as admin_common_router
 from app.routers.admin.admin import templates
 
@@ -44,6 +48,16 @@ async def init_tables():
         await conn.run_sync(Base.metadata.create_all)
 
 
+@app.on_event("startup")
+async def resume_season_jobs():
+    await resume_stale_season_jobs()
+
+
+@app.on_event("shutdown")
+async def stop_preview_workers():
+    shutdown_previews()
+
+
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 ENV = os.getenv("ENV", "development")
@@ -62,6 +76,8 @@ if not SECRET_KEY or SECRET_KEY == "supersecretkey123":
 
 app.add_middleware(CSRFContextMiddleware)
 
+app.add_middleware(GlobalContextMiddleware)
+
 app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
 
 ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "localhost,127.0.0.1").split(",")
@@ -77,6 +93,7 @@ app.include_router(admin_moderation_router)
 app.include_router(admin_documents_router)
 app.include_router(admin_notifications_router)
 app.include_router(admin_leaderboard_router)
+app.include_router(admin_media_router)
 
 
 
@@ -46,6 +46,36 @@ def execute_seeder():
     run_command("source venv/bin/activate && python -m app.seeders.main")
 
 
+def rebuild_scores():
+    print("Rebuilding user scores...")
+    run_command("source venv/bin/activate && python -m app.commands.user_scores")
+
+
+def verify_scores():
+    print("Verifying user scores...")
+    run_command("source venv/bin/activate && python -m app.commands.user_scores --verify")
+
+
+def rebuild_stats():
+    print("Rebuilding daily achievement stats...")
+    run_command("source venv/bin/activate && python -m app.commands.achievement_stats")
+
+
+def recompute_points():
+    print("Recomputing achievement points with the active rules version...")
+    run_command("source venv/bin/activate && python -m app.commands.points_rules recompute")
+
+
+def backfill_hashes():
+    print("Hashing documents uploaded before content addressing...")
+    run_command("source venv/bin/activate && python -m app.commands.content_hashes")
+
+
+def generate_previews():
+    print("Rendering document previews...")
+    run_command("source venv/bin/activate && python -m app.commands.previews")
+
+
 def update_project():
     print("⬆Checking for updates...")
     run_command("git fetch")
@@ -63,6 +93,12 @@ def main():
     subparsers.add_parser("migrate", help="Apply database migrations")
     subparsers.add_parser("rollback", help="Rollback last migration")
     subparsers.add_parser("seed", help="Execute seeders")
+    subparsers.add_parser("rebuild-scores", help="Recompute user_scores from approved achievements")
+    subparsers.add_parser("verify-scores", help="Report drift between user_scores and achievements")
+    subparsers.add_parser("rebuild-stats", help="Backfill daily_achievement_stats from achievements")
+    subparsers.add_parser("recompute-points", help="Re-score achievements with the active points rules")
+    subparsers.add_parser("backfill-hashes", help="Fill achievements.content_hash for existing files")
+    subparsers.add_parser("generate-previews", help="Render missing document thumbnails")
     subparsers.add_parser("update", help="Pull latest version from git")
 
     args = parser.parse_args()
@@ -79,6 +115,18 @@ def main():
         rollback_migration()
     elif args.command == "seed":
         execute_seeder()
+    elif args.command == "rebuild-scores":
+        rebuild_scores()
+    elif args.command == "verify-scores":
+        verify_scores()
+    elif args.command == "rebuild-stats":
+        rebuild_stats()
+    elif args.command == "recompute-points":
+        recompute_points()
+    elif args.command == "backfill-hashes":
+        backfill_hashes()
+    elif args.command == "generate-previews":
+        generate_previews()
     elif args.command == "update":
         update_project()
     else: